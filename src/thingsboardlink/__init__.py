@@ -10,6 +10,7 @@ __description__ = "一个专为 Python 开发者设计的高级 IoT 平台交互
 
 # 导入核心类
 from .client import ThingsBoardClient
+from .aio import AsyncThingsBoardClient
 from .exceptions import (
     ThingsBoardError,
     AuthenticationError,
@@ -20,6 +21,7 @@ from .exceptions import (
     TimeoutError,
     ConfigurationError,
     RateLimitError,
+    PartialTelemetryError,
     DeviceError,
     TelemetryError,
     AlarmError,
@@ -29,6 +31,8 @@ from .models import (
     Device,
     DeviceCredentials,
     TelemetryData,
+    BulkTelemetryResult,
+    ChunkedTelemetryResult,
     Attribute,
     RpcPersistentStatus,
     Alarm,
@@ -38,19 +42,40 @@ from .models import (
     EntityId,
     PageData,
     TimeseriesData,
+    ColumnarTimeseriesData,
     EntityType,
     AlarmSeverity,
     AlarmStatus,
     AttributeScope
 )
 
+from .cache import TTLCache, CacheStats
+from .auth import TokenStore, FileTokenStore, decode_token_expiry
+from .ratelimit import RateLimiter, TokenBucket, parse_retry_after
+from .instrumentation import RequestHook, RequestEvent, RequestMetrics, LatencyHistogram, templatize_endpoint
+from .exporter import MetricsExporter
+from .tracing import enable_tracing, disable_tracing, set_tracer, get_tracer, trace_service, traced, untraced
+from .subscriptions import TelemetrySubscriber, Subscription, SubscriptionUpdate
+from .frames import align_timeseries, timeseries_to_dataframe
+from .codec import TimeseriesBlockWriter, TimeseriesBlockReader, write_timeseries_file, read_timeseries_file
+
 from .services import (
     DeviceService,
     TelemetryService,
     AttributeService,
     AlarmService,
     RpcService,
-    RelationService
+    RelationService,
+    TelemetryBatcher,
+    TimeseriesFetcher,
+    TimeseriesFetchResult,
+    TelemetryOutbox,
+    MqttGatewayPublisher,
+    MqttDevicePublisher,
+    DeadbandFilter,
+    TimeseriesCache,
+    ConcurrencyController,
+    AsyncConcurrencyController
 )
 
 # 公开API
@@ -63,6 +88,7 @@ __all__ = [
 
     # 核心客户端
     "ThingsBoardClient",
+    "AsyncThingsBoardClient",
 
     # 异常类
     "ThingsBoardError",
@@ -74,6 +100,7 @@ __all__ = [
     "TimeoutError",
     "ConfigurationError",
     "RateLimitError",
+    "PartialTelemetryError",
     "DeviceError",
     "TelemetryError",
     "AlarmError",
@@ -83,6 +110,8 @@ __all__ = [
     "Device",
     "DeviceCredentials",
     "TelemetryData",
+    "BulkTelemetryResult",
+    "ChunkedTelemetryResult",
     "Attribute",
     "RpcPersistentStatus",
     "Alarm",
@@ -92,16 +121,75 @@ __all__ = [
     "EntityId",
     "PageData",
     "TimeseriesData",
+    "ColumnarTimeseriesData",
     "EntityType",
     "AlarmSeverity",
     "AlarmStatus",
     "AttributeScope",
 
+    # 表格数据 | Tabular data
+    "align_timeseries",
+    "timeseries_to_dataframe",
+
+    # 压缩存储 | Compressed storage
+    "TimeseriesBlockWriter",
+    "TimeseriesBlockReader",
+    "write_timeseries_file",
+    "read_timeseries_file",
+
+    # 缓存 | Cache
+    "TTLCache",
+    "CacheStats",
+
+    # 认证 | Authentication
+    "TokenStore",
+    "FileTokenStore",
+    "decode_token_expiry",
+
+    # 限流 | Rate limiting
+    "RateLimiter",
+    "TokenBucket",
+    "parse_retry_after",
+
+    # 请求监测 | Instrumentation
+    "RequestHook",
+    "RequestEvent",
+    "RequestMetrics",
+    "LatencyHistogram",
+    "templatize_endpoint",
+
+    # 指标导出 | Metrics export
+    "MetricsExporter",
+
+    # 链路追踪 | Tracing
+    "enable_tracing",
+    "disable_tracing",
+    "set_tracer",
+    "get_tracer",
+    "trace_service",
+    "traced",
+    "untraced",
+
+    # 实时订阅 | Subscriptions
+    "TelemetrySubscriber",
+    "Subscription",
+    "SubscriptionUpdate",
+
     # 服务类 | Service classes
     "DeviceService",
     "TelemetryService",
     "AttributeService",
     "AlarmService",
     "RpcService",
-    "RelationService"
+    "RelationService",
+    "TelemetryBatcher",
+    "TimeseriesFetcher",
+    "TimeseriesFetchResult",
+    "TelemetryOutbox",
+    "MqttGatewayPublisher",
+    "MqttDevicePublisher",
+    "DeadbandFilter",
+    "TimeseriesCache",
+    "ConcurrencyController",
+    "AsyncConcurrencyController"
 ]
@@ -0,0 +1,27 @@
+"""
+thingsboardlink 异步接口包
+
+本包提供基于 asyncio 的 ThingsBoard 客户端及其服务模块。
+需要安装可选依赖 aiohttp：pip install thingsboardlink[async]
+"""
+
+from .client import AsyncThingsBoardClient, AsyncResponse
+from .services import (
+    AsyncDeviceService,
+    AsyncTelemetryService,
+    AsyncAttributeService,
+    AsyncAlarmService,
+    AsyncRpcService,
+    AsyncRelationService
+)
+
+__all__ = [
+    "AsyncThingsBoardClient",
+    "AsyncResponse",
+    "AsyncDeviceService",
+    "AsyncTelemetryService",
+    "AsyncAttributeService",
+    "AsyncAlarmService",
+    "AsyncRpcService",
+    "AsyncRelationService"
+]
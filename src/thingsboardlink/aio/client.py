@@ -0,0 +1,659 @@
+"""
+thingsboardlink 异步客户端模块
+
+本模块提供基于 asyncio 和 aiohttp 的 ThingsBoard 异步客户端。
+异步客户端与同步客户端共享数据模型和异常类型，在单个事件循环上通过连接池处理大量并发请求。
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - 可选依赖
+    aiohttp = None
+
+from ..auth import decode_token_expiry
+from ..exceptions import AuthenticationError, APIError, ConnectionError, TimeoutError, ConfigurationError, RateLimitError
+from ..ratelimit import RateLimiter
+from ..instrumentation import RequestHook, RequestEvent, RequestMetrics, templatize_endpoint, dispatch_hooks, body_size
+from ..tracing import get_tracer, request_span, record_response
+
+
+class AsyncResponse:
+    """
+    异步 HTTP 响应
+
+    在连接释放前读取完整响应体，提供与 requests.Response 相同的常用接口，
+    使服务层和 APIError.from_response 可以直接复用。
+    """
+
+    def __init__(self,
+                 status_code: int,
+                 content: bytes,
+                 headers: Dict[str, str],
+                 url: str,
+                 method: str):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+        self.request = SimpleNamespace(method=method, url=url)
+        # 连接错误和 5xx 时自动重试的次数
+        self.retries = 0
+
+    @property
+    def text(self) -> str:
+        """响应文本"""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """解析 JSON 响应体"""
+        return json.loads(self.content)
+
+
+class AsyncThingsBoardClient:
+    """
+    ThingsBoard 异步客户端类
+
+    提供与 ThingsBoardClient 相同的认证管理和 HTTP 请求接口，所有网络操作均为协程。
+    需要安装可选依赖 aiohttp：pip install thingsboardlink[async]
+    """
+
+    # 与同步客户端保持一致的重试状态码和幂等方法（429 由 request() 按 Retry-After 处理）
+    RETRY_STATUS_CODES = (500, 502, 503, 504)
+    RETRY_METHODS = ("HEAD", "GET", "OPTIONS")
+
+    def __init__(self,
+                 base_url: str,
+                 username: Optional[str] = None,
+                 password: Optional[str] = None,
+                 timeout: float = 30.0,
+                 max_retries: int = 3,
+                 retry_backoff_factor: float = 0.3,
+                 verify_ssl: bool = True,
+                 connection_limit: int = 100,
+                 connection_limit_per_host: int = 0,
+                 credentials_cache_size: int = 10000,
+                 credentials_cache_ttl: float = 300.0,
+                 max_payload_bytes: Optional[int] = 65536,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 rate_limit_retries: int = 0,
+                 max_retry_after: float = 60.0):
+        """
+        初始化 ThingsBoard 异步客户端
+
+        Args:
+            base_url: ThingsBoard 服务器基础 URL
+            username: 用户名（可选）
+            password: 密码（可选）
+            timeout: 请求超时时间（秒）
+            max_retries: 最大重试次数
+            retry_backoff_factor: 重试退避因子
+            verify_ssl: 是否验证 SSL 证书
+            connection_limit: 连接池最大连接数
+            connection_limit_per_host: 单个主机最大连接数，为 0 时不限制
+            credentials_cache_size: 设备凭证缓存的最大条目数，为 0 时禁用缓存
+            credentials_cache_ttl: 设备凭证缓存的存活时间（秒）
+            max_payload_bytes: 设备遥测上传的最大负载字节数，超过时自动拆分为多个请求；为空时不拆分
+            rate_limiter: 客户端限流器（可选），按租户和设备令牌限制请求速率
+            rate_limit_retries: 服务器返回 429 后按 Retry-After 等待并重试的次数，为 0 时直接抛出 RateLimitError
+            max_retry_after: 允许等待重试的最长 Retry-After（秒），超过时直接抛出 RateLimitError
+
+        Raises:
+            ConfigurationError: 未安装 aiohttp 时抛出
+        """
+        if aiohttp is None:
+            raise ConfigurationError(
+                message="异步客户端需要安装 aiohttp: pip install thingsboardlink[async]",
+                config_key="aiohttp",
+                expected_value="aiohttp>=3.8.0"
+            )
+
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff_factor = retry_backoff_factor
+        self.verify_ssl = verify_ssl
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.credentials_cache_size = credentials_cache_size
+        self.credentials_cache_ttl = credentials_cache_ttl
+        self.max_payload_bytes = max_payload_bytes
+        self.rate_limiter = rate_limiter
+        self.rate_limit_retries = rate_limit_retries
+        self.max_retry_after = max_retry_after
+
+        # 认证相关属性
+        self._jwt_token: Optional[str] = None
+        self._refresh_token: Optional[str] = None
+        self._token_expires_at: Optional[float] = None
+
+        # aiohttp 会话必须在事件循环中创建，首次请求时延迟初始化
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+
+        # 请求钩子和内置请求统计
+        self._hooks: List[RequestHook] = []
+        self.metrics: Optional[RequestMetrics] = None
+
+        # 延迟导入服务模块以避免循环导入
+        self._device_service = None
+        self._telemetry_service = None
+        self._attribute_service = None
+        self._alarm_service = None
+        self._rpc_service = None
+        self._relation_service = None
+
+    @property
+    def device_service(self):
+        """获取异步设备服务实例"""
+        if self._device_service is None:
+            from .services.device_service import AsyncDeviceService
+            self._device_service = AsyncDeviceService(self)
+        return self._device_service
+
+    @property
+    def telemetry_service(self):
+        """获取异步遥测服务实例"""
+        if self._telemetry_service is None:
+            from .services.telemetry_service import AsyncTelemetryService
+            self._telemetry_service = AsyncTelemetryService(self)
+        return self._telemetry_service
+
+    @property
+    def attribute_service(self):
+        """获取异步属性服务实例"""
+        if self._attribute_service is None:
+            from .services.attribute_service import AsyncAttributeService
+            self._attribute_service = AsyncAttributeService(self)
+        return self._attribute_service
+
+    @property
+    def alarm_service(self):
+        """获取异步警报服务实例"""
+        if self._alarm_service is None:
+            from .services.alarm_service import AsyncAlarmService
+            self._alarm_service = AsyncAlarmService(self)
+        return self._alarm_service
+
+    @property
+    def rpc_service(self):
+        """获取异步 RPC 服务实例"""
+        if self._rpc_service is None:
+            from .services.rpc_service import AsyncRpcService
+            self._rpc_service = AsyncRpcService(self)
+        return self._rpc_service
+
+    @property
+    def relation_service(self):
+        """获取异步关系服务实例"""
+        if self._relation_service is None:
+            from .services.relation_service import AsyncRelationService
+            self._relation_service = AsyncRelationService(self)
+        return self._relation_service
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """获取（必要时创建）共享的 aiohttp 会话"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                ssl=None if self.verify_ssl else False
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                }
+            )
+        return self._session
+
+    def _get_auth_lock(self) -> asyncio.Lock:
+        """获取认证锁，保证同一时刻只有一个协程执行登录或刷新"""
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        return self._auth_lock
+
+    def _auth_headers(self) -> Dict[str, str]:
+        """构建认证请求头"""
+        if self._jwt_token:
+            return {'X-Authorization': f'Bearer {self._jwt_token}'}
+        return {}
+
+    async def login(self,
+                    username: Optional[str] = None,
+                    password: Optional[str] = None) -> bool:
+        """
+        用户登录
+
+        Args:
+            username: 用户名（可选，使用初始化时的用户名）
+            password: 密码（可选，使用初始化时的密码）
+
+        Returns:
+            bool: 登录是否成功
+
+        Raises:
+            AuthenticationError: 认证失败时抛出
+            ConfigurationError: 配置错误时抛出
+        """
+        auth_username = username or self.username
+        auth_password = password or self.password
+
+        if not auth_username or not auth_password:
+            raise ConfigurationError(
+                message="用户名和密码不能为空",
+                config_key="username/password",
+                expected_value="非空字符串"
+            )
+
+        login_data = {
+            "username": auth_username,
+            "password": auth_password
+        }
+
+        response = await self._send(
+            "POST", "/api/auth/login", json_data=login_data, operation="login"
+        )
+
+        if response.status_code == 200:
+            auth_data = response.json()
+            self._jwt_token = auth_data.get("token")
+            self._refresh_token = auth_data.get("refreshToken")
+
+            # 根据 JWT 的 exp 声明设置令牌过期时间，无法解析时假设有效期为 1 小时
+            self._token_expires_at = decode_token_expiry(self._jwt_token) or time.time() + 3600
+
+            # 更新客户端凭据
+            self.username = auth_username
+            self.password = auth_password
+
+            return True
+
+        error_data = {}
+        try:
+            error_data = response.json()
+        except (ValueError, json.JSONDecodeError):
+            pass
+
+        raise AuthenticationError(
+            message=f"登录失败，状态码: {response.status_code}",
+            details={
+                "status_code": response.status_code,
+                "response_data": error_data,
+                "username": auth_username
+            }
+        )
+
+    @property
+    def is_authenticated(self) -> bool:
+        """检查是否已认证"""
+        return (self._jwt_token is not None and
+                self._token_expires_at is not None and
+                time.time() < self._token_expires_at)
+
+    async def logout(self) -> bool:
+        """
+        用户登出
+
+        Returns:
+            bool: 登出是否成功
+        """
+        if not self.is_authenticated:
+            return True
+
+        try:
+            response = await self._send(
+                "POST", "/api/auth/logout", headers=self._auth_headers(), operation="logout"
+            )
+            return response.status_code == 200
+
+        except (ConnectionError, TimeoutError):
+            # 即使网络错误，也清除本地认证信息
+            return True
+
+        finally:
+            self._jwt_token = None
+            self._refresh_token = None
+            self._token_expires_at = None
+
+    async def refresh_token(self) -> bool:
+        """
+        刷新访问令牌
+
+        Returns:
+            bool: 刷新是否成功
+        """
+        if not self._refresh_token:
+            return False
+
+        try:
+            response = await self._send(
+                "POST", "/api/auth/token",
+                json_data={"refreshToken": self._refresh_token},
+                operation="refresh_token"
+            )
+
+            if response.status_code == 200:
+                auth_data = response.json()
+                self._jwt_token = auth_data.get("token")
+                self._refresh_token = auth_data.get("refreshToken")
+                self._token_expires_at = decode_token_expiry(self._jwt_token) or time.time() + 3600
+                return True
+
+        except (ConnectionError, TimeoutError):
+            pass
+
+        return False
+
+    async def _ensure_authenticated(self):
+        """
+        确保客户端已认证
+
+        多个协程同时发现令牌过期时，只有一个协程执行刷新或登录，其余协程等待其结果。
+
+        Raises:
+            AuthenticationError: 未认证时抛出
+        """
+        if self.is_authenticated:
+            return
+
+        async with self._get_auth_lock():
+            # 等待期间其他协程可能已完成认证
+            if self.is_authenticated:
+                return
+
+            # 尝试刷新令牌
+            if not await self.refresh_token():
+                # 尝试重新登录
+                if self.username and self.password:
+                    if not await self.login():
+                        raise AuthenticationError("认证失败，请重新登录")
+                else:
+                    raise AuthenticationError("未认证，请先登录")
+
+    async def _send(self,
+                    method: str,
+                    endpoint: str,
+                    json_data: Any = None,
+                    raw_data: Optional[str] = None,
+                    params: Optional[Dict[str, Any]] = None,
+                    headers: Optional[Dict[str, str]] = None,
+                    timeout: Optional[float] = None,
+                    operation: Optional[str] = None) -> AsyncResponse:
+        """
+        发送单次 HTTP 请求并读取完整响应，对幂等请求按退避策略重试
+
+        Raises:
+            ConnectionError: 连接失败时抛出
+            TimeoutError: 请求超时时抛出
+        """
+        session = self._get_session()
+        url = urljoin(self.base_url, endpoint.lstrip('/'))
+        request_timeout = timeout or self.timeout
+
+        request_kwargs: Dict[str, Any] = {
+            'timeout': aiohttp.ClientTimeout(total=request_timeout)
+        }
+        if params:
+            # aiohttp 只接受字符串查询参数
+            request_kwargs['params'] = {
+                k: (str(v).lower() if isinstance(v, bool) else str(v))
+                for k, v in params.items()
+            }
+        if headers:
+            request_kwargs['headers'] = headers
+        if json_data is not None:
+            # 会话默认 Content-Type 为 application/json，预先序列化以便统计请求字节数
+            request_kwargs['data'] = json.dumps(json_data)
+        elif raw_data is not None:
+            request_kwargs['data'] = raw_data
+
+        retries = self.max_retries if method.upper() in self.RETRY_METHODS else 0
+        attempt = 0
+
+        while True:
+            hooks = self._hooks
+            event = None
+            if hooks:
+                event = RequestEvent(
+                    method=method.upper(),
+                    endpoint=templatize_endpoint(endpoint),
+                    path=endpoint,
+                    request_bytes=body_size(request_kwargs.get('data')),
+                    started_at=time.time()
+                )
+                dispatch_hooks(hooks, "pre_request", event)
+            started = time.monotonic()
+
+            try:
+                async with session.request(method, url, **request_kwargs) as resp:
+                    content = await resp.read()
+                    response = AsyncResponse(
+                        status_code=resp.status,
+                        content=content,
+                        headers=dict(resp.headers),
+                        url=str(resp.url),
+                        method=method
+                    )
+
+                if event is not None:
+                    event.duration = time.monotonic() - started
+                    event.status = response.status_code
+                    event.response_bytes = len(content)
+                    dispatch_hooks(hooks, "post_response", event)
+
+                if response.status_code in self.RETRY_STATUS_CODES and attempt < retries:
+                    attempt += 1
+                    await asyncio.sleep(self.retry_backoff_factor * (2 ** (attempt - 1)))
+                    continue
+
+                response.retries = attempt
+                return response
+
+            except asyncio.TimeoutError as e:
+                # 需先于连接错误处理：aiohttp 的 ServerTimeoutError 同时是连接错误的子类
+                raise self._request_failed(hooks, event, started, TimeoutError(
+                    message=f"请求超时: {str(e)}",
+                    timeout_seconds=request_timeout,
+                    operation=operation or f"{method} {endpoint}"
+                ))
+            except aiohttp.ClientConnectionError as e:
+                error = self._request_failed(hooks, event, started, ConnectionError(
+                    message=f"连接失败: {str(e)}",
+                    server_url=self.base_url
+                ))
+                if attempt < retries:
+                    attempt += 1
+                    await asyncio.sleep(self.retry_backoff_factor * (2 ** (attempt - 1)))
+                    continue
+                raise error
+
+    @staticmethod
+    def _request_failed(hooks: List[RequestHook],
+                        event: Optional[RequestEvent],
+                        started: float,
+                        error: Exception) -> Exception:
+        """通知钩子请求失败，返回需要抛出的异常"""
+        if event is not None:
+            event.duration = time.monotonic() - started
+            event.error = error
+            dispatch_hooks(hooks, "on_error", event)
+        return error
+
+    def add_hook(self, hook: RequestHook) -> RequestHook:
+        """
+        注册请求钩子
+
+        Args:
+            hook: RequestHook 实例（或实现了 pre_request、post_response、on_error 方法的对象）
+
+        Returns:
+            RequestHook: 注册的钩子
+        """
+        self._hooks = self._hooks + [hook]
+        return hook
+
+    def remove_hook(self, hook: RequestHook):
+        """注销请求钩子"""
+        self._hooks = [h for h in self._hooks if h is not hook]
+
+    def enable_metrics(self, significant_bits: int = 7) -> RequestMetrics:
+        """
+        启用内置请求统计（按端点模板记录延迟直方图、状态码和字节数）
+
+        Args:
+            significant_bits: 延迟直方图的有效二进制位数
+
+        Returns:
+            RequestMetrics: 请求统计实例，通过 snapshot() 获取统计数据
+        """
+        if self.metrics is None:
+            self.metrics = self.add_hook(RequestMetrics(significant_bits))
+        return self.metrics
+
+    def disable_metrics(self):
+        """停用内置请求统计"""
+        if self.metrics is not None:
+            self.remove_hook(self.metrics)
+            self.metrics = None
+
+    async def request(self,
+                      method: str,
+                      endpoint: str,
+                      data: Optional[Union[Dict[str, Any], str]] = None,
+                      params: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      require_auth: bool = True,
+                      timeout: Optional[float] = None) -> AsyncResponse:
+        """
+        发送 HTTP 请求
+
+        Args:
+            method: HTTP 方法
+            endpoint: API 端点
+            data: 请求数据
+            params: 查询参数
+            headers: 请求头部
+            require_auth: 是否需要认证
+            timeout: 请求超时时间
+
+        Returns:
+            AsyncResponse: HTTP 响应对象
+
+        Raises:
+            AuthenticationError: 认证失败时抛出
+            APIError: API 调用失败时抛出
+            ConnectionError: 连接失败时抛出
+            TimeoutError: 请求超时时抛出
+            RateLimitError: 请求速率超限（客户端限流或服务器返回 429）时抛出
+        """
+        tracer = get_tracer()
+        if tracer is None:
+            return await self._request(method, endpoint, data, params, headers, require_auth, timeout)
+
+        with request_span(tracer, method, endpoint, self.base_url) as span:
+            return await self._request(method, endpoint, data, params, headers, require_auth, timeout, span)
+
+    async def _request(self,
+                       method: str,
+                       endpoint: str,
+                       data: Optional[Union[Dict[str, Any], str]],
+                       params: Optional[Dict[str, Any]],
+                       headers: Optional[Dict[str, str]],
+                       require_auth: bool,
+                       timeout: Optional[float],
+                       span: Any = None) -> AsyncResponse:
+        """发送 HTTP 请求（request() 的实现，span 为启用追踪时的请求 span）"""
+        request_headers: Dict[str, str] = {}
+        if require_auth:
+            await self._ensure_authenticated()
+            request_headers.update(self._auth_headers())
+        if headers:
+            request_headers.update(headers)
+
+        scope = RateLimiter.scope_for(endpoint, require_auth)
+        limited = self.rate_limiter is not None and scope is not None
+        device_token = scope[1] if scope is not None else None
+
+        attempt = 0
+        while True:
+            if limited:
+                wait = self.rate_limiter.reserve(device_token)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            response = await self._send(
+                method,
+                endpoint,
+                json_data=data if data is not None and not isinstance(data, str) else None,
+                raw_data=data if isinstance(data, str) else None,
+                params=params,
+                headers=request_headers or None,
+                timeout=timeout
+            )
+            if span is not None:
+                record_response(span, response.status_code, attempt + response.retries)
+            if response.status_code != 429:
+                break
+
+            error = RateLimitError.from_response(response, limit_type=scope[0] if scope else None)
+            if span is not None:
+                span.add_event("rate_limited", {"retry_after": error.retry_after or 0.0})
+            if limited:
+                self.rate_limiter.penalize(device_token, error.retry_after)
+
+            wait = error.retry_after
+            if wait is None:
+                wait = self.retry_backoff_factor * (2 ** attempt)
+            if attempt >= self.rate_limit_retries or wait > self.max_retry_after:
+                raise error
+
+            attempt += 1
+            # 使用限流器时由 reserve() 计算 Retry-After 之后的发送时间
+            if not limited:
+                await asyncio.sleep(wait)
+
+        # 检查响应状态
+        if response.status_code >= 400:
+            raise APIError.from_response(response)
+
+        return response
+
+    async def get(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """发送 GET 请求"""
+        return await self.request('GET', endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """发送 POST 请求"""
+        return await self.request('POST', endpoint, **kwargs)
+
+    async def put(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """发送 PUT 请求"""
+        return await self.request('PUT', endpoint, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """发送 DELETE 请求"""
+        return await self.request('DELETE', endpoint, **kwargs)
+
+    async def close(self):
+        """关闭客户端连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器退出"""
+        await self.logout()
+        await self.close()
@@ -0,0 +1,22 @@
+"""
+thingsboardlink 异步服务模块包
+
+本包包含了与同步服务一一对应的异步服务模块。
+每个异步服务与同步版本共享数据模型和异常类型。
+"""
+
+from .device_service import AsyncDeviceService
+from .telemetry_service import AsyncTelemetryService
+from .attribute_service import AsyncAttributeService
+from .alarm_service import AsyncAlarmService
+from .rpc_service import AsyncRpcService
+from .relation_service import AsyncRelationService
+
+__all__ = [
+    "AsyncDeviceService",
+    "AsyncTelemetryService",
+    "AsyncAttributeService",
+    "AsyncAlarmService",
+    "AsyncRpcService",
+    "AsyncRelationService"
+]
@@ -0,0 +1,454 @@
+"""
+thingsboardlink 异步 RPC 服务模块
+
+本模块提供 RpcService 的异步版本。
+包括单向和双向 RPC 调用以及持久化 RPC 管理。
+"""
+
+import asyncio
+import time
+from typing import Optional, Dict, Any
+
+from ...models import RPCRequest, RPCResponse, PersistentRPCRequest
+from ...exceptions import ValidationError, RPCError, TimeoutError
+from ...tracing import trace_service
+
+
+@trace_service
+class AsyncRpcService:
+    """
+    异步 RPC 服务类
+
+    提供与 RpcService 相同的 RPC 调用操作，所有网络操作和等待均为协程。
+    """
+
+    def __init__(self, client):
+        """
+        初始化异步 RPC 服务
+
+        Args:
+            client: AsyncThingsBoardClient 实例
+        """
+        self.client = client
+
+    async def send_one_way_rpc(self,
+                               device_id: str,
+                               method: str,
+                               params: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        发送单向 RPC 请求
+
+        Args:
+            device_id: 设备 ID
+            method: RPC 方法名
+            params: RPC 参数
+
+        Returns:
+            bool: 发送是否成功
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            RPCError: RPC 调用失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not method or not method.strip():
+            raise ValidationError(
+                field_name="method",
+                expected_type="非空字符串",
+                actual_value=method,
+                message="RPC 方法名不能为空"
+            )
+
+        rpc_request = RPCRequest(
+            method=method.strip(),
+            params=params or {},
+            persistent=False
+        )
+
+        try:
+            response = await self.client.post(
+                f"/api/plugins/rpc/oneway/{device_id}",
+                data=rpc_request.to_dict()
+            )
+
+            return response.status_code == 200
+
+        except Exception as e:
+            raise RPCError(
+                message=f"发送单向 RPC 请求失败: {str(e)}",
+                method_name=method,
+                device_id=device_id
+            )
+
+    async def send_two_way_rpc(self,
+                               device_id: str,
+                               method: str,
+                               params: Optional[Dict[str, Any]] = None,
+                               timeout_seconds: float = 30.0) -> RPCResponse:
+        """
+        发送双向 RPC 请求
+
+        Args:
+            device_id: 设备 ID
+            method: RPC 方法名
+            params: RPC 参数
+            timeout_seconds: 超时时间（秒）
+
+        Returns:
+            RPCResponse: RPC 响应对象
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            RPCError: RPC 调用失败时抛出
+            TimeoutError: RPC 调用超时时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not method or not method.strip():
+            raise ValidationError(
+                field_name="method",
+                expected_type="非空字符串",
+                actual_value=method,
+                message="RPC 方法名不能为空"
+            )
+
+        if timeout_seconds <= 0:
+            raise ValidationError(
+                field_name="timeout_seconds",
+                expected_type="正数",
+                actual_value=timeout_seconds,
+                message="超时时间必须大于 0"
+            )
+
+        rpc_request = RPCRequest(
+            method=method.strip(),
+            params=params or {},
+            timeout=int(timeout_seconds * 1000),
+            persistent=False
+        )
+
+        try:
+            response = await self.client.post(
+                f"/api/plugins/rpc/twoway/{device_id}",
+                data=rpc_request.to_dict(),
+                timeout=timeout_seconds + 5  # 给网络请求额外的缓冲时间
+            )
+
+            if response.status_code == 200:
+                response_data = response.json()
+                return RPCResponse(
+                    id=response_data.get("id", ""),
+                    method=method,
+                    response=response_data,
+                    timestamp=int(time.time() * 1000)
+                )
+            else:
+                raise RPCError(
+                    message=f"双向 RPC 调用失败，状态码: {response.status_code}",
+                    method_name=method,
+                    device_id=device_id
+                )
+
+        except TimeoutError:
+            raise TimeoutError(
+                message="双向 RPC 调用超时",
+                timeout_seconds=timeout_seconds,
+                operation=f"RPC {method}"
+            )
+        except Exception as e:
+            if isinstance(e, (ValidationError, RPCError, TimeoutError)):
+                raise
+            raise RPCError(
+                message=f"发送双向 RPC 请求失败: {str(e)}",
+                method_name=method,
+                device_id=device_id,
+                timeout_seconds=timeout_seconds
+            )
+
+    async def send_rpc_with_retry(self,
+                                  device_id: str,
+                                  method: str,
+                                  params: Optional[Dict[str, Any]] = None,
+                                  max_retries: int = 3,
+                                  timeout_seconds: float = 30.0,
+                                  retry_delay: float = 1.0) -> RPCResponse:
+        """
+        发送带重试的双向 RPC 请求
+
+        Args:
+            device_id: 设备 ID
+            method: RPC 方法名
+            params: RPC 参数
+            max_retries: 最大重试次数
+            timeout_seconds: 每次请求的超时时间（秒）
+            retry_delay: 重试延迟（秒）
+
+        Returns:
+            RPCResponse: RPC 响应对象
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            RPCError: 所有重试都失败时抛出
+        """
+        if max_retries < 0:
+            raise ValidationError(
+                field_name="max_retries",
+                expected_type="非负整数",
+                actual_value=max_retries,
+                message="最大重试次数不能小于 0"
+            )
+
+        last_error = None
+
+        for attempt in range(max_retries + 1):
+            try:
+                return await self.send_two_way_rpc(
+                    device_id=device_id,
+                    method=method,
+                    params=params,
+                    timeout_seconds=timeout_seconds
+                )
+
+            except (RPCError, TimeoutError) as e:
+                last_error = e
+                if attempt < max_retries:
+                    await asyncio.sleep(retry_delay)
+
+        if last_error:
+            raise last_error
+        raise RPCError(
+            message=f"发送 RPC 请求失败，已重试 {max_retries} 次",
+            method_name=method,
+            device_id=device_id
+        )
+
+    async def send_persistent_rpc(self,
+                                  device_id: str,
+                                  method: str,
+                                  params: Optional[Dict[str, Any]] = None,
+                                  expiration_time: Optional[int] = None) -> str:
+        """
+        发送持久化 RPC 请求
+
+        Args:
+            device_id: 设备 ID
+            method: RPC 方法名
+            params: RPC 参数
+            expiration_time: 过期时间（毫秒时间戳），可选
+
+        Returns:
+            str: 持久化 RPC 请求的 ID
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            RPCError: RPC 调用失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not method or not method.strip():
+            raise ValidationError(
+                field_name="method",
+                expected_type="非空字符串",
+                actual_value=method,
+                message="RPC 方法名不能为空"
+            )
+
+        rpc_request = {
+            "method": method.strip(),
+            "params": params or {},
+            "persistent": True
+        }
+
+        if expiration_time is not None:
+            rpc_request["expirationTime"] = expiration_time
+
+        try:
+            response = await self.client.post(
+                f"/api/rpc/twoway/{device_id}",
+                data=rpc_request
+            )
+
+            if response.status_code == 200:
+                return response.json().get("rpcId", "")
+            else:
+                raise RPCError(
+                    message=f"发送持久化 RPC 请求失败，状态码: {response.status_code}",
+                    method_name=method,
+                    device_id=device_id
+                )
+
+        except Exception as e:
+            if isinstance(e, (ValidationError, RPCError)):
+                raise
+            raise RPCError(
+                message=f"发送持久化 RPC 请求失败: {str(e)}",
+                method_name=method,
+                device_id=device_id
+            )
+
+    async def get_persistent_rpc_response(self,
+                                          rpc_id: str) -> Optional[PersistentRPCRequest]:
+        """
+        获取持久化 RPC 响应
+
+        Args:
+            rpc_id: 持久化 RPC 请求的 ID
+
+        Returns:
+            Optional[PersistentRPCRequest]: 持久化 RPC 请求对象，如果不存在则返回 None
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            RPCError: RPC 调用失败时抛出
+        """
+        if not rpc_id or not rpc_id.strip():
+            raise ValidationError(
+                field_name="rpc_id",
+                expected_type="非空字符串",
+                actual_value=rpc_id,
+                message="RPC 请求 ID 不能为空"
+            )
+
+        try:
+            response = await self.client.get(f"/api/rpc/persistent/{rpc_id.strip()}")
+
+            if response.status_code == 200:
+                return PersistentRPCRequest.from_dict(response.json())
+            elif response.status_code == 404:
+                return None
+            else:
+                raise RPCError(
+                    message=f"获取持久化 RPC 响应失败，状态码: {response.status_code}",
+                    method_name="get_persistent_rpc_response"
+                )
+
+        except Exception as e:
+            if isinstance(e, (ValidationError, RPCError)):
+                raise
+            raise RPCError(
+                message=f"获取持久化 RPC 响应失败: {str(e)}"
+            )
+
+    async def delete_persistent_rpc(self, rpc_id: str) -> bool:
+        """
+        删除持久化 RPC 请求
+
+        Args:
+            rpc_id: 持久化 RPC 请求的 ID
+
+        Returns:
+            bool: 删除是否成功
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            RPCError: RPC 调用失败时抛出
+        """
+        if not rpc_id or not rpc_id.strip():
+            raise ValidationError(
+                field_name="rpc_id",
+                expected_type="非空字符串",
+                actual_value=rpc_id,
+                message="RPC 请求 ID 不能为空"
+            )
+
+        try:
+            response = await self.client.delete(f"/api/rpc/persistent/{rpc_id.strip()}")
+            return response.status_code == 200
+
+        except Exception as e:
+            raise RPCError(
+                message=f"删除持久化 RPC 请求失败: {str(e)}"
+            )
+
+    async def wait_for_persistent_rpc_response(self,
+                                               rpc_id: str,
+                                               timeout_seconds: float = 60.0,
+                                               poll_interval: float = 2.0) -> Optional[PersistentRPCRequest]:
+        """
+        等待持久化 RPC 响应
+
+        Args:
+            rpc_id: 持久化 RPC 请求的 ID
+            timeout_seconds: 最大等待时间（秒）
+            poll_interval: 轮询间隔（秒）
+
+        Returns:
+            Optional[PersistentRPCRequest]: 完成的持久化 RPC 请求对象
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            RPCError: RPC 调用失败时抛出
+            TimeoutError: 等待超时时抛出
+        """
+        if not rpc_id or not rpc_id.strip():
+            raise ValidationError(
+                field_name="rpc_id",
+                expected_type="非空字符串",
+                actual_value=rpc_id,
+                message="RPC 请求 ID 不能为空"
+            )
+
+        if timeout_seconds <= 0:
+            raise ValidationError(
+                field_name="timeout_seconds",
+                expected_type="正数",
+                actual_value=timeout_seconds,
+                message="超时时间必须大于 0"
+            )
+
+        if poll_interval <= 0:
+            raise ValidationError(
+                field_name="poll_interval",
+                expected_type="正数",
+                actual_value=poll_interval,
+                message="轮询间隔必须大于 0"
+            )
+
+        start_time = time.time()
+        rpc_id = rpc_id.strip()
+
+        try:
+            while time.time() - start_time < timeout_seconds:
+                rpc_request = await self.get_persistent_rpc_response(rpc_id)
+
+                if rpc_request is None:
+                    raise RPCError(
+                        message=f"持久化 RPC 请求 {rpc_id} 不存在"
+                    )
+
+                if rpc_request.is_completed or rpc_request.is_expired:
+                    return rpc_request
+
+                await asyncio.sleep(poll_interval)
+
+            raise TimeoutError(
+                message="等待持久化 RPC 响应超时",
+                timeout_seconds=timeout_seconds,
+                operation=f"等待 RPC {rpc_id}"
+            )
+
+        except Exception as e:
+            if isinstance(e, (ValidationError, RPCError, TimeoutError)):
+                raise
+            raise RPCError(
+                message=f"等待持久化 RPC 响应失败: {str(e)}"
+            )
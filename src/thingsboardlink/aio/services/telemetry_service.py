@@ -0,0 +1,486 @@
+"""
+thingsboardlink 异步遥测服务模块
+
+本模块提供 TelemetryService 的异步版本。
+包括遥测数据的上传、查询、历史数据获取等操作。
+"""
+
+import asyncio
+import time
+from typing import List, Optional, Dict, Any, Union, Tuple
+
+from ...models import TelemetryData, TimeseriesData, ChunkedTelemetryResult
+from ...exceptions import ValidationError, TelemetryError, NotFoundError, PartialTelemetryError
+from ...services.telemetry_service import TelemetryService
+from ...services.telemetry_payload import build_payloads
+from ...frames import is_columnar_input
+from ...tracing import trace_service
+
+
+@trace_service
+class AsyncTelemetryService:
+    """
+    异步遥测服务类
+
+    提供与 TelemetryService 相同的遥测数据操作，所有网络操作均为协程。
+    """
+
+    def __init__(self, client):
+        """
+        初始化异步遥测服务
+
+        Args:
+            client: AsyncThingsBoardClient 实例
+        """
+        self.client = client
+
+        # 死区过滤器（DeadbandFilter），为空时上传所有数据点
+        self.deadband = None
+
+        # 自适应并发控制器（AsyncConcurrencyController），为空时按 max_in_flight 固定并发
+        self.concurrency = None
+
+    async def post_telemetry(self,
+                             device_id: str,
+                             telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+                             timestamp: Optional[int] = None,
+                             ts_column: str = "ts") -> bool:
+        """
+        上传遥测数据
+
+        Args:
+            device_id: 设备 ID
+            telemetry_data: 遥测数据
+            timestamp: 时间戳（毫秒），可选
+            ts_column: 表格数据的时间戳列名
+
+        Returns:
+            bool: 上传是否成功
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 遥测数据上传失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not is_columnar_input(telemetry_data, ts_column) and not telemetry_data:
+            raise ValidationError(
+                field_name="telemetry_data",
+                expected_type="非空数据",
+                actual_value=telemetry_data,
+                message="遥测数据不能为空"
+            )
+
+        device_service = self.client.device_service
+
+        try:
+            cache = device_service.credentials_cache
+            credentials = cache.get(device_id) if cache is not None else None
+            from_cache = credentials is not None
+            if credentials is None:
+                credentials = await device_service.get_device_credentials(device_id, use_cache=False)
+
+            if not credentials or not credentials.credentials_value:
+                raise TelemetryError(
+                    "无法获取设备访问令牌"
+                )
+
+            try:
+                return await self.post_telemetry_with_device_token(
+                    device_token=credentials.credentials_value,
+                    telemetry_data=telemetry_data,
+                    timestamp=timestamp,
+                    ts_column=ts_column
+                )
+            except TelemetryError as e:
+                # 缓存的令牌被拒绝说明凭证已失效，刷新凭证后重试一次（刚获取的令牌被拒绝时不重试）
+                if not (from_cache and TelemetryService._is_unauthorized(e)
+                        and device_service.invalidate_credentials(device_id)):
+                    raise
+                rejected = e
+
+            rejected_token = credentials.credentials_value
+            credentials = await device_service.get_device_credentials(device_id, use_cache=False)
+
+            if not credentials or not credentials.credentials_value:
+                raise TelemetryError(
+                    "无法获取设备访问令牌"
+                )
+
+            if credentials.credentials_value == rejected_token:
+                # 服务器上的令牌未变化，重试同样会被拒绝
+                raise rejected
+
+            return await self.post_telemetry_with_device_token(
+                device_token=credentials.credentials_value,
+                telemetry_data=telemetry_data,
+                timestamp=timestamp,
+                ts_column=ts_column
+            )
+
+        except Exception as e:
+            if isinstance(e, (ValidationError, TelemetryError)):
+                raise
+            raise TelemetryError(
+                f"上传遥测数据失败: {str(e)}"
+            )
+
+    async def post_telemetry_with_device_token(self,
+                                               device_token: str,
+                                               telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+                                               timestamp: Optional[int] = None,
+                                               ts_column: str = "ts") -> bool:
+        """
+        使用设备令牌上传遥测数据
+
+        支持与 TelemetryService.post_telemetry_with_device_token 相同的表格数据输入。
+        设置了死区过滤器（deadband 属性）时先过滤数据点，全部被过滤时不发送请求。
+        负载超过客户端的 max_payload_bytes 时自动拆分为多个负载按顺序并发发送，
+        部分负载上传失败时抛出 PartialTelemetryError。
+
+        Args:
+            device_token: 设备访问令牌
+            telemetry_data: 遥测数据
+            timestamp: 时间戳（毫秒），可选，表格数据使用时间戳列
+            ts_column: 表格数据的时间戳列名（毫秒整数或 datetime 类型）
+
+        Returns:
+            bool: 上传是否成功
+        """
+        if not device_token or not device_token.strip():
+            raise ValidationError(
+                field_name="device_token",
+                expected_type="非空字符串",
+                actual_value=device_token,
+                message="设备令牌不能为空"
+            )
+
+        try:
+            entries = TelemetryService._group_telemetry(telemetry_data, timestamp, ts_column)
+
+            deadband = self.deadband
+            if deadband is not None:
+                entries = deadband.filter_entries(device_token, entries)
+                if not entries:
+                    return True
+                try:
+                    return await self._send_entries(device_token, entries)
+                except Exception:
+                    deadband.forget_entries(device_token, entries)
+                    raise
+
+            return await self._send_entries(device_token, entries)
+
+        except Exception as e:
+            if isinstance(e, (ValidationError, TelemetryError)):
+                raise
+            raise TelemetryError(
+                f"上传遥测数据失败: {str(e)}"
+            ) from e
+
+    async def _send_entries(self, device_token: str, entries: List[Dict[str, Any]]) -> bool:
+        """发送遥测条目，超过 max_payload_bytes 时拆分为多个负载"""
+        max_payload_bytes = getattr(self.client, "max_payload_bytes", None)
+        if not max_payload_bytes:
+            return await self._post_payload(device_token, TelemetryService._entries_payload(entries))
+
+        payloads = build_payloads(entries, max_payload_bytes)
+        if len(payloads) == 1:
+            return await self._post_payload(device_token, payloads[0][0])
+
+        if self.concurrency is not None:
+            max_in_flight = self.concurrency.max_limit
+        else:
+            max_in_flight = TelemetryService.DEFAULT_MAX_IN_FLIGHT
+        result = await self._send_payloads(device_token, payloads, max_in_flight)
+        if not result.all_succeeded:
+            first_error = result.failed[min(result.failed)]
+            raise PartialTelemetryError(
+                f"遥测数据部分上传失败: {result.failure_count}/{result.chunks} 个负载失败",
+                result=result
+            ) from first_error
+        return True
+
+    async def _post_payload(self, device_token: str, payload: Any) -> bool:
+        """发送单个遥测负载，启用自适应并发时在控制器的并发许可内发送"""
+        endpoint = f"/api/v1/{device_token}/telemetry"
+        if self.concurrency is None:
+            response = await self.client.post(endpoint, data=payload, require_auth=False)
+        else:
+            response = await self.concurrency.run(self.client.post, endpoint, data=payload, require_auth=False)
+
+        if response.status_code == 200:
+            return True
+        else:
+            raise TelemetryError(
+                f"遥测数据上传失败，状态码: {response.status_code}"
+            )
+
+    async def _send_payloads(self,
+                             device_token: str,
+                             payloads: List[Tuple[str, List[Dict[str, Any]]]],
+                             max_in_flight: int) -> ChunkedTelemetryResult:
+        """按顺序并发发送多个负载，最多 max_in_flight 个请求同时在途"""
+        result = ChunkedTelemetryResult(chunks=len(payloads))
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def _send(body: str) -> bool:
+            async with semaphore:
+                return await self._post_payload(device_token, body)
+
+        # 任务按创建顺序获取信号量，保证负载按顺序发出
+        outcomes = await asyncio.gather(*(_send(body) for body, _ in payloads), return_exceptions=True)
+
+        for index, ((body, chunk), outcome) in enumerate(zip(payloads, outcomes)):
+            if isinstance(outcome, BaseException):
+                error = outcome
+                if not isinstance(error, TelemetryError):
+                    error = TelemetryError(f"上传遥测数据失败: {str(outcome)}")
+                    error.__cause__ = outcome
+                result.failed[index] = error
+                result.failed_entries[index] = chunk
+            else:
+                result.succeeded.append(index)
+                result.bytes_sent += len(body)
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def get_latest_telemetry(self,
+                                   device_id: str,
+                                   keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        获取最新遥测数据
+
+        Args:
+            device_id: 设备 ID
+            keys: 要获取的数据键列表，为空则获取所有
+
+        Returns:
+            Dict[str, Any]: 最新遥测数据
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            NotFoundError: 设备不存在时抛出
+            TelemetryError: 获取数据失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        try:
+            endpoint = f"/api/plugins/telemetry/DEVICE/{device_id}/values/timeseries"
+
+            params = {}
+            if keys:
+                params["keys"] = ",".join(keys)
+
+            response = await self.client.get(endpoint, params=params)
+
+            result = {}
+            for key, values in response.json().items():
+                if values and len(values) > 0:
+                    latest_value = values[0]  # 第一个值是最新的
+                    result[key] = {
+                        "value": latest_value.get("value"),
+                        "timestamp": latest_value.get("ts")
+                    }
+
+            return result
+
+        except Exception as e:
+            if "404" in str(e) or "Not Found" in str(e):
+                raise NotFoundError(
+                    resource_type="设备",
+                    resource_id=device_id
+                )
+            raise TelemetryError(
+                f"获取最新遥测数据失败: {str(e)}"
+            )
+
+    async def get_timeseries_telemetry(self,
+                                       device_id: str,
+                                       keys: List[str],
+                                       start_ts: int,
+                                       end_ts: int,
+                                       interval: Optional[int] = None,
+                                       limit: Optional[int] = None,
+                                       agg: Optional[str] = None) -> Dict[str, TimeseriesData]:
+        """
+        获取时间序列遥测数据
+
+        Args:
+            device_id: 设备 ID
+            keys: 数据键列表
+            start_ts: 开始时间戳（毫秒）
+            end_ts: 结束时间戳（毫秒）
+            interval: 聚合间隔（毫秒），可选
+            limit: 数据点数量限制，可选
+            agg: 聚合方式（MIN, MAX, AVG, SUM, COUNT），可选
+
+        Returns:
+            Dict[str, TimeseriesData]: 时间序列数据字典
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 获取数据失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not keys:
+            raise ValidationError(
+                field_name="keys",
+                expected_type="非空列表",
+                actual_value=keys,
+                message="数据键列表不能为空"
+            )
+
+        if start_ts >= end_ts:
+            raise ValidationError(
+                field_name="start_ts/end_ts",
+                message="开始时间必须小于结束时间"
+            )
+
+        try:
+            endpoint = f"/api/plugins/telemetry/DEVICE/{device_id}/values/timeseries"
+
+            params = {
+                "keys": ",".join(keys),
+                "startTs": start_ts,
+                "endTs": end_ts
+            }
+
+            if interval is not None:
+                params["interval"] = interval
+            if limit is not None:
+                params["limit"] = limit
+            if agg is not None:
+                params["agg"] = agg.upper()
+
+            response = await self.client.get(endpoint, params=params)
+
+            return {
+                key: TimeseriesData.from_dict(key, values)
+                for key, values in response.json().items()
+            }
+
+        except Exception as e:
+            if isinstance(e, ValidationError):
+                raise
+            raise TelemetryError(
+                f"获取时间序列遥测数据失败: {str(e)}"
+            )
+
+    async def delete_telemetry(self,
+                               device_id: str,
+                               keys: List[str],
+                               delete_all_data_for_keys: bool = True,
+                               start_ts: Optional[int] = None,
+                               end_ts: Optional[int] = None) -> bool:
+        """
+        删除遥测数据
+
+        Args:
+            device_id: 设备 ID
+            keys: 要删除的数据键列表
+            delete_all_data_for_keys: 是否删除键的所有数据，默认为 True
+            start_ts: 开始时间戳（毫秒），可选
+            end_ts: 结束时间戳（毫秒），可选
+
+        Returns:
+            bool: 删除是否成功
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 删除数据失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not keys:
+            raise ValidationError(
+                field_name="keys",
+                expected_type="非空列表",
+                actual_value=keys,
+                message="数据键列表不能为空"
+            )
+
+        try:
+            endpoint = f"/api/plugins/telemetry/DEVICE/{device_id}/timeseries/delete"
+
+            params = {
+                "keys": ",".join(keys),
+                "deleteAllDataForKeys": str(delete_all_data_for_keys).lower()
+            }
+
+            # 当不删除所有数据时，必须提供时间范围
+            if not delete_all_data_for_keys:
+                if start_ts is None or end_ts is None:
+                    params["deleteAllDataForKeys"] = "true"
+                else:
+                    params["startTs"] = start_ts
+                    params["endTs"] = end_ts
+
+            response = await self.client.delete(endpoint, params=params)
+            return response.status_code == 200
+
+        except Exception as e:
+            raise TelemetryError(
+                f"删除遥测数据失败: {str(e)}"
+            )
+
+    async def get_telemetry_keys(self, device_id: str) -> List[str]:
+        """
+        获取设备的所有遥测数据键
+
+        Args:
+            device_id: 设备 ID
+
+        Returns:
+            List[str]: 遥测数据键列表
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 获取数据键失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        try:
+            endpoint = f"/api/plugins/telemetry/DEVICE/{device_id}/keys/timeseries"
+            response = await self.client.get(endpoint)
+
+            keys_data = response.json()
+            return keys_data if isinstance(keys_data, list) else []
+
+        except Exception as e:
+            raise TelemetryError(
+                f"获取遥测数据键失败: {str(e)}"
+            )
@@ -0,0 +1,249 @@
+"""
+thingsboardlink 认证辅助模块
+
+本模块提供 JWT 令牌解析和令牌持久化存储功能。
+令牌存储可在进程重启后复用登录结果，并通过文件锁在多个工作进程间共享同一组令牌。
+"""
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # pragma: no cover - POSIX
+    msvcrt = None
+
+
+def _decode_token_claim(token: Optional[str], claim: str) -> Optional[float]:
+    """解码 JWT 负载中的数值声明（不校验签名），无法解析时返回 None"""
+    if not token:
+        return None
+
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+
+    try:
+        payload_segment = parts[1]
+        payload_segment += "=" * (-len(payload_segment) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(payload_segment.encode("ascii")))
+        value = payload.get(claim)
+        return float(value) if value is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def decode_token_expiry(token: Optional[str]) -> Optional[float]:
+    """
+    从 JWT 令牌中解析过期时间
+
+    仅解码负载中的 exp 声明，不校验签名。
+
+    Args:
+        token: JWT 访问令牌
+
+    Returns:
+        Optional[float]: 过期时间（Unix 时间戳，秒），无法解析时返回 None
+    """
+    return _decode_token_claim(token, "exp")
+
+
+def decode_token_issued_at(token: Optional[str]) -> Optional[float]:
+    """
+    从 JWT 令牌中解析签发时间（iat 声明，不校验签名）
+
+    Args:
+        token: JWT 访问令牌
+
+    Returns:
+        Optional[float]: 签发时间（Unix 时间戳，秒），无法解析时返回 None
+    """
+    return _decode_token_claim(token, "iat")
+
+
+class TokenStore:
+    """
+    令牌存储基类
+
+    定义令牌持久化的统一接口。默认实现不保存任何内容。
+    """
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        获取存储的独占锁
+
+        在锁内完成“读取—刷新—写回”可避免多个进程同时登录或刷新。
+        """
+        yield
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取令牌
+
+        Args:
+            key: 存储键（通常由服务器地址和用户名组成）
+
+        Returns:
+            Optional[Dict[str, Any]]: 包含 token、refreshToken、expiresAt 的字典
+        """
+        return None
+
+    def save(self, key: str, token: str, refresh_token: Optional[str], expires_at: float):
+        """
+        保存令牌
+
+        Args:
+            key: 存储键
+            token: 访问令牌
+            refresh_token: 刷新令牌
+            expires_at: 过期时间（Unix 时间戳，秒）
+        """
+
+    def clear(self, key: str):
+        """
+        删除令牌
+
+        Args:
+            key: 存储键
+        """
+
+
+class FileTokenStore(TokenStore):
+    """
+    基于文件的令牌存储
+
+    令牌以 JSON 格式保存在本地文件中（权限 0600），写入采用临时文件加原子替换。
+    跨进程互斥通过同目录下的 .lock 文件加锁实现（POSIX 使用 flock，Windows 使用 msvcrt）。
+    同一进程内的锁可重入。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化文件令牌存储
+
+        Args:
+            path: 令牌文件路径
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.lock_path = self.path + ".lock"
+
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = None
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """获取跨进程独占锁"""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self._acquire_file_lock()
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    self._release_file_lock()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取令牌"""
+        with self.lock():
+            entry = self._read_all().get(key)
+
+        if not isinstance(entry, dict) or not entry.get("token"):
+            return None
+        return entry
+
+    def save(self, key: str, token: str, refresh_token: Optional[str], expires_at: float):
+        """保存令牌"""
+        with self.lock():
+            data = self._read_all()
+            data[key] = {
+                "token": token,
+                "refreshToken": refresh_token,
+                "expiresAt": expires_at,
+                "savedAt": time.time()
+            }
+            self._write_all(data)
+
+    def clear(self, key: str):
+        """删除令牌"""
+        with self.lock():
+            data = self._read_all()
+            if data.pop(key, None) is not None:
+                self._write_all(data)
+
+    def _acquire_file_lock(self):
+        """打开锁文件并加独占锁（阻塞等待）"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        lock_file = open(self.lock_path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK 最多重试 10 秒，超时后继续等待
+                        continue
+        except Exception:
+            lock_file.close()
+            raise
+
+        self._lock_file = lock_file
+
+    def _release_file_lock(self):
+        """释放并关闭锁文件"""
+        lock_file = self._lock_file
+        self._lock_file = None
+        if lock_file is None:
+            return
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            lock_file.close()
+
+    def _read_all(self) -> Dict[str, Any]:
+        """读取整个令牌文件，文件不存在或损坏时返回空字典"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_all(self, data: Dict[str, Any]):
+        """原子写入整个令牌文件"""
+        directory = os.path.dirname(self.path) or "."
+        fd, temp_path = tempfile.mkstemp(prefix=".tokens-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
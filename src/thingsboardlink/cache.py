@@ -0,0 +1,170 @@
+"""
+thingsboardlink 缓存模块
+
+本模块提供客户端内部使用的轻量级缓存实现。
+缓存为有界的 LRU 结构，并支持基于 TTL 的过期和命中率统计。
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """缓存统计信息模型"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+    max_size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """缓存命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "size": self.size,
+            "maxSize": self.max_size,
+            "hitRatio": self.hit_ratio
+        }
+
+
+class TTLCache:
+    """
+    有界 TTL 缓存
+
+    按最近最少使用（LRU）策略淘汰条目，每个条目在 TTL 到期后失效。
+    所有操作均为线程安全。
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        """
+        初始化缓存
+
+        Args:
+            max_size: 最大条目数
+            ttl: 条目存活时间（秒）
+        """
+        if max_size <= 0:
+            raise ValueError("max_size 必须大于 0")
+        if ttl <= 0:
+            raise ValueError("ttl 必须大于 0")
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_size=max_size)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        获取缓存值
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Any]: 缓存值，未命中或已过期时返回 None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        写入缓存值
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 条目存活时间（秒），为空则使用默认值
+        """
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, expires_at)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        使指定缓存条目失效
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            bool: 条目是否存在
+        """
+        with self._lock:
+            if self._data.pop(key, None) is None:
+                return False
+            self._stats.invalidations += 1
+            return True
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._stats.invalidations += len(self._data)
+            self._data.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """获取缓存统计信息快照"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                invalidations=self._stats.invalidations,
+                size=len(self._data),
+                max_size=self.max_size
+            )
+
+    def reset_stats(self):
+        """重置统计计数器"""
+        with self._lock:
+            self._stats = CacheStats(max_size=self.max_size)
+
+    def __len__(self) -> int:
+        """返回当前条目数（可能包含尚未清理的过期条目）"""
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """检查键是否存在且未过期，不影响统计信息"""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and time.monotonic() < entry[1]
@@ -5,15 +5,21 @@ thingsboardlink 核心客户端模块
 客户端负责认证管理、HTTP 请求处理和服务模块的统一访问。
 """
 import json
+import threading
 import time
-from typing import Any, Dict, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urljoin
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3 import Retry
 
-from .exceptions import AuthenticationError, APIError, ConnectionError, TimeoutError, ConfigurationError
+from .auth import TokenStore, decode_token_expiry, decode_token_issued_at
+from .exceptions import AuthenticationError, APIError, ConnectionError, TimeoutError, ConfigurationError, RateLimitError
+from .ratelimit import RateLimiter
+from .instrumentation import RequestHook, RequestEvent, RequestMetrics, templatize_endpoint, dispatch_hooks, body_size
+from .tracing import get_tracer, request_span, record_response
 
 
 class ThingsBoardClient:
@@ -23,6 +29,9 @@ class ThingsBoardClient:
     负责认证管理、HTTP 请求处理和错误处理。
     """
 
+    # 后台线程两次成功刷新令牌之间的最短间隔（秒）
+    MIN_REFRESH_INTERVAL = 5.0
+
     def __init__(self,
                  base_url: str,
                  username: Optional[str] = None,
@@ -30,7 +39,21 @@ class ThingsBoardClient:
                  timeout: float = 30.0,
                  max_retries: int = 3,
                  retry_backoff_factor: float = 0.3,
-                 verify_ssl: bool = True):
+                 verify_ssl: bool = True,
+                 credentials_cache_size: int = 10000,
+                 credentials_cache_ttl: float = 300.0,
+                 auto_refresh: bool = False,
+                 refresh_margin: float = 60.0,
+                 token_store: Optional[TokenStore] = None,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 connect_timeout: Optional[float] = None,
+                 prewarm_connections: int = 0,
+                 max_payload_bytes: Optional[int] = 65536,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 rate_limit_retries: int = 0,
+                 max_retry_after: float = 60.0):
         """
         初始化 ThingsBoard 客户端
 
@@ -42,32 +65,86 @@ class ThingsBoardClient:
             max_retries: 最大重试次数
             retry_backoff_factor: 重试退避因子
             verify_ssl: 是否验证 SSL 证书
+            credentials_cache_size: 设备凭证缓存的最大条目数，为 0 时禁用缓存
+            credentials_cache_ttl: 设备凭证缓存的存活时间（秒）
+            auto_refresh: 是否在后台线程中于令牌过期前主动刷新
+            refresh_margin: 主动刷新距离令牌过期的提前量（秒），最多为令牌有效期的一半
+            token_store: 令牌存储（可选），用于在进程重启后及多个进程之间复用令牌
+            pool_connections: 连接池管理器缓存的主机连接池数量
+            pool_maxsize: 每个主机连接池保留的最大连接数，应不小于并发请求的线程数
+            pool_block: 连接池耗尽时是否阻塞等待空闲连接（否则新建连接并在归还时丢弃）
+            connect_timeout: 建立连接的超时时间（秒），为空时与 timeout 相同；timeout 用作读取超时
+            prewarm_connections: 初始化时预先建立的长连接数量，为 0 时不预热
+            max_payload_bytes: 设备遥测上传的最大负载字节数，超过时自动拆分为多个请求；为空时不拆分
+            rate_limiter: 客户端限流器（可选），按租户和设备令牌限制请求速率
+            rate_limit_retries: 服务器返回 429 后按 Retry-After 等待并重试的次数，为 0 时直接抛出 RateLimitError
+            max_retry_after: 允许等待重试的最长 Retry-After（秒），超过时直接抛出 RateLimitError
         """
         self.base_url = base_url.rstrip("/")
         self.username = username
         self.password = password
         self.timeout = timeout
         self.verify_ssl = verify_ssl
+        self.credentials_cache_size = credentials_cache_size
+        self.credentials_cache_ttl = credentials_cache_ttl
+        self.auto_refresh = auto_refresh
+        self.refresh_margin = refresh_margin
+        self.token_store = token_store
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.connect_timeout = connect_timeout
+        self.max_payload_bytes = max_payload_bytes
+        self.retry_backoff_factor = retry_backoff_factor
+        self.rate_limiter = rate_limiter
+        self.rate_limit_retries = rate_limit_retries
+        self.max_retry_after = max_retry_after
 
         # 认证相关属性
         self._jwt_token: Optional[str] = None
         self._refresh_token: Optional[str] = None
         self._token_expires_at: Optional[float] = None
+        self._token_issued_at: Optional[float] = None
+
+        # 认证锁：保证同一时刻只有一个线程执行登录或刷新，其余线程等待结果
+        self._auth_lock = threading.RLock()
+
+        # 后台主动刷新线程
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_stop = threading.Event()
+        self._refresh_wakeup = threading.Event()
 
         # 创建 HTTP 会话
         self._session = requests.Session()
 
-        # 配置重试策略
+        # 配置重试策略（429 由 request() 按 Retry-After 处理）
         retry_strategy = Retry(
             total=max_retries,
             backoff_factor=retry_backoff_factor,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"]
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["HEAD", "GET", "OPTIONS"],
+            # 重试用尽后返回最后一次的 5xx 响应，由 APIError 携带状态码（而不是抛出 requests 的 RetryError）
+            raise_on_status=False
+        )
+
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry_strategy,
+            pool_block=pool_block
         )
+        self._session.mount("http://", self._adapter)
+        self._session.mount("https://", self._adapter)
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self._session.mount("http://", adapter)
-        self._session.mount("https://", adapter)
+        # 连接池使用统计
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._total_requests = 0
+
+        # 请求钩子（写时复制，发送请求时无需加锁）和内置请求统计
+        self._hooks: List[RequestHook] = []
+        self.metrics: Optional[RequestMetrics] = None
 
         # 设置默认请求头
         self._session.headers.update({
@@ -83,6 +160,9 @@ class ThingsBoardClient:
         self._rpc_service = None
         self._relation_service = None
 
+        if prewarm_connections > 0:
+            self.prewarm(prewarm_connections)
+
     @property
     def device_service(self):
         """获取设备服务实例"""
@@ -167,22 +247,13 @@ class ThingsBoardClient:
             response = self._session.post(
                 urljoin(self.base_url, "/api/auth/login"),
                 json=login_data,
-                timeout=self.timeout,
+                timeout=self._request_timeout(),
                 verify=self.verify_ssl
             )
 
             if response.status_code == 200:
                 auth_data = response.json()
-                self._jwt_token = auth_data.get("token")
-                self._refresh_token = auth_data.get("refreshToken")
-
-                # 设置令牌过期时间（假设令牌有效期为 1 小时）
-                self._token_expires_at = time.time() + 3600
-
-                # 更新会话头部
-                self._session.headers.update({
-                    'X-Authorization': f'Bearer {self._jwt_token}'
-                })
+                self._set_tokens(auth_data.get("token"), auth_data.get("refreshToken"))
 
                 # 更新客户端凭据
                 self.username = auth_username
@@ -231,35 +302,26 @@ class ThingsBoardClient:
         Returns:
             bool: 登出是否成功
         """
+        self._stop_refresh_thread()
+
         if not self.is_authenticated:
             return True
 
         try:
             response = self._session.post(
                 urljoin(self.base_url, "/api/auth/logout"),
-                timeout=self.timeout,
+                timeout=self._request_timeout(),
                 verify=self.verify_ssl
             )
 
             # 清除认证信息
-            self._jwt_token = None
-            self._refresh_token = None
-            self._token_expires_at = None
-
-            # 移除认证头部
-            if 'X-Authorization' in self._session.headers:
-                del self._session.headers['X-Authorization']
+            self._clear_tokens(forget_stored=True)
 
             return response.status_code == 200
 
         except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             # 即使网络错误，也清除本地认证信息
-            self._jwt_token = None
-            self._refresh_token = None
-            self._token_expires_at = None
-
-            if 'X-Authorization' in self._session.headers:
-                del self._session.headers['X-Authorization']
+            self._clear_tokens(forget_stored=True)
 
             return True
 
@@ -277,20 +339,13 @@ class ThingsBoardClient:
             response = self._session.post(
                 urljoin(self.base_url, "/api/auth/token"),
                 json={"refreshToken": self._refresh_token},
-                timeout=self.timeout,
+                timeout=self._request_timeout(),
                 verify=self.verify_ssl
             )
 
             if response.status_code == 200:
                 auth_data = response.json()
-                self._jwt_token = auth_data.get("token")
-                self._refresh_token = auth_data.get("refreshToken")
-                self._token_expires_at = time.time() + 3600
-
-                # 更新会话头部 | Update session headers
-                self._session.headers.update({
-                    'X-Authorization': f'Bearer {self._jwt_token}'
-                })
+                self._set_tokens(auth_data.get("token"), auth_data.get("refreshToken"))
 
                 return True
 
@@ -299,22 +354,231 @@ class ThingsBoardClient:
 
         return False
 
+    def _set_tokens(self,
+                    jwt_token: Optional[str],
+                    refresh_token: Optional[str],
+                    expires_at: Optional[float] = None,
+                    persist: bool = True):
+        """
+        保存新令牌并更新会话头部
+
+        Args:
+            jwt_token: 访问令牌
+            refresh_token: 刷新令牌
+            expires_at: 令牌过期时间（Unix 时间戳，秒），为空时从 JWT 的 exp 声明解析
+            persist: 是否写入令牌存储
+        """
+        with self._auth_lock:
+            self._jwt_token = jwt_token
+            self._refresh_token = refresh_token
+
+            # 根据 JWT 的 exp 声明设置令牌过期时间，无法解析时假设有效期为 1 小时
+            if expires_at is None:
+                expires_at = decode_token_expiry(jwt_token) or time.time() + 3600
+            self._token_expires_at = expires_at
+            # 签发时间用于计算令牌有效期，无法解析时以收到令牌的时间代替
+            self._token_issued_at = decode_token_issued_at(jwt_token) or time.time()
+
+            # 更新会话头部
+            self._session.headers.update({
+                'X-Authorization': f'Bearer {self._jwt_token}'
+            })
+
+            if persist and self.token_store is not None and jwt_token:
+                try:
+                    self.token_store.save(self._token_store_key, jwt_token, refresh_token, expires_at)
+                except OSError:
+                    # 令牌持久化失败不影响当前进程使用令牌
+                    pass
+
+        if self.auto_refresh:
+            self._start_refresh_thread()
+
+    def _clear_tokens(self, forget_stored: bool = False):
+        """
+        清除本地认证信息并移除认证头部
+
+        Args:
+            forget_stored: 是否同时删除令牌存储中的令牌
+        """
+        with self._auth_lock:
+            self._jwt_token = None
+            self._refresh_token = None
+            self._token_expires_at = None
+            self._token_issued_at = None
+
+            if 'X-Authorization' in self._session.headers:
+                del self._session.headers['X-Authorization']
+
+            if forget_stored and self.token_store is not None:
+                try:
+                    self.token_store.clear(self._token_store_key)
+                except OSError:
+                    pass
+
+    @property
+    def _token_store_key(self) -> str:
+        """令牌存储键：同一服务器上的同一用户共享令牌"""
+        return f"{self.base_url}|{self.username or ''}"
+
+    def _load_stored_tokens(self) -> bool:
+        """
+        从令牌存储中加载令牌
+
+        存储中的访问令牌尚未到主动刷新时间（见 _refresh_due_at）时直接使用；
+        否则仅采用其中的刷新令牌（可能已被其他进程轮换），由调用方继续刷新或登录。
+
+        Returns:
+            bool: 是否已加载可用的访问令牌
+        """
+        entry = self.token_store.load(self._token_store_key)
+        if not entry:
+            return False
+
+        token = entry.get("token")
+        expires_at = entry.get("expiresAt") or decode_token_expiry(token)
+        if (token and expires_at is not None and
+                self._refresh_due_at(float(expires_at), decode_token_issued_at(token)) > time.time()):
+            if token != self._jwt_token:
+                self._set_tokens(token, entry.get("refreshToken"), float(expires_at), persist=False)
+            return True
+
+        if entry.get("refreshToken"):
+            self._refresh_token = entry["refreshToken"]
+        return False
+
     def _ensure_authenticated(self):
         """
         确保客户端已认证
 
+        多个线程同时发现令牌过期时，只有一个线程执行刷新或登录，其余线程等待其结果。
+
         Raises:
             AuthenticationError: 未认证时抛出
         """
-        if not self.is_authenticated:
-            # 尝试刷新令牌
-            if not self.refresh_token():
-                # 尝试重新登录
-                if self.username and self.password:
-                    if not self.login():
-                        raise AuthenticationError("认证失败，请重新登录")
-                else:
-                    raise AuthenticationError("未认证，请先登录")
+        if self.is_authenticated:
+            return
+
+        with self._auth_lock:
+            # 等待锁期间其他线程可能已完成认证
+            if self.is_authenticated:
+                return
+
+            self._authenticate()
+
+    def _authenticate(self):
+        """
+        在持有认证锁的情况下刷新令牌，失败时重新登录
+
+        配置了令牌存储时，先在存储锁内读取其他进程保存的令牌，
+        只有存储中没有可用令牌时才刷新或登录，并在锁内写回结果。
+
+        Raises:
+            AuthenticationError: 认证失败时抛出
+        """
+        if self.token_store is None:
+            self._refresh_or_login()
+            return
+
+        with self.token_store.lock():
+            if self._load_stored_tokens():
+                return
+            self._refresh_or_login()
+
+    def _refresh_or_login(self):
+        """
+        刷新令牌，失败时重新登录
+
+        Raises:
+            AuthenticationError: 认证失败时抛出
+        """
+        # 尝试刷新令牌
+        if not self.refresh_token():
+            # 尝试重新登录
+            if self.username and self.password:
+                if not self.login():
+                    raise AuthenticationError("认证失败，请重新登录")
+            else:
+                raise AuthenticationError("未认证，请先登录")
+
+    def _start_refresh_thread(self):
+        """启动后台令牌刷新线程（已运行时仅唤醒它重新计算刷新时间）"""
+        with self._auth_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                self._refresh_wakeup.set()
+                return
+
+            self._refresh_stop.clear()
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop,
+                name="thingsboardlink-token-refresh",
+                daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _stop_refresh_thread(self):
+        """停止后台令牌刷新线程"""
+        self._refresh_stop.set()
+        self._refresh_wakeup.set()
+
+        thread = self._refresh_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.timeout)
+        self._refresh_thread = None
+
+    def _refresh_due_at(self, expires_at: float, issued_at: Optional[float]) -> float:
+        """
+        计算令牌应主动刷新的时间
+
+        提前量为 refresh_margin，但不超过令牌有效期的一半，
+        避免有效期短于 refresh_margin 的令牌刚签发就需要刷新。
+
+        Args:
+            expires_at: 过期时间（Unix 时间戳，秒）
+            issued_at: 签发时间（Unix 时间戳，秒），未知时为空
+
+        Returns:
+            float: 主动刷新时间（Unix 时间戳，秒）
+        """
+        margin = self.refresh_margin
+        if issued_at is not None:
+            margin = min(margin, 0.5 * max(expires_at - issued_at, 0.0))
+        return expires_at - margin
+
+    def _refresh_loop(self):
+        """后台线程：在令牌过期前（见 _refresh_due_at）主动刷新，使请求线程无需承担认证延迟"""
+        retry_delay = 1.0
+        last_refresh = None
+
+        while not self._refresh_stop.is_set():
+            expires_at = self._token_expires_at
+            if expires_at is None:
+                return
+
+            delay = self._refresh_due_at(expires_at, self._token_issued_at) - time.time()
+            if last_refresh is not None:
+                # 服务器签发的令牌有效期异常短时，限制刷新频率
+                delay = max(delay, last_refresh + self.MIN_REFRESH_INTERVAL - time.monotonic())
+            if delay > 0:
+                self._refresh_wakeup.wait(delay)
+                self._refresh_wakeup.clear()
+                continue
+
+            try:
+                with self._auth_lock:
+                    if self._refresh_stop.is_set():
+                        return
+                    # 其他线程可能已刷新，重新检查刷新时间
+                    expires_at = self._token_expires_at
+                    if (expires_at is not None and
+                            self._refresh_due_at(expires_at, self._token_issued_at) <= time.time()):
+                        self._authenticate()
+                last_refresh = time.monotonic()
+                retry_delay = 1.0
+            except Exception:
+                # 刷新失败时退避重试，令牌真正过期后请求线程仍会自行认证
+                self._refresh_stop.wait(retry_delay)
+                retry_delay = min(retry_delay * 2, max(self.refresh_margin / 2, 1.0))
 
     def request(self,
                 method: str,
@@ -344,16 +608,38 @@ class ThingsBoardClient:
             APIError: API 调用失败时抛出
             ConnectionError: 连接失败时抛出
             TimeoutError: 请求超时时抛出
+            RateLimitError: 请求速率超限（客户端限流或服务器返回 429）时抛出
         """
+        tracer = get_tracer()
+        if tracer is None:
+            return self._request(method, endpoint, data, params, headers, require_auth, timeout)
+
+        with request_span(tracer, method, endpoint, self.base_url) as span:
+            return self._request(method, endpoint, data, params, headers, require_auth, timeout, span)
+
+    def _request(self,
+                 method: str,
+                 endpoint: str,
+                 data: Optional[Union[Dict[str, Any], str]],
+                 params: Optional[Dict[str, Any]],
+                 headers: Optional[Dict[str, str]],
+                 require_auth: bool,
+                 timeout: Optional[float],
+                 span: Any = None) -> requests.Response:
+        """发送 HTTP 请求（request() 的实现，span 为启用追踪时的请求 span）"""
         if require_auth:
             self._ensure_authenticated()
 
+        scope = RateLimiter.scope_for(endpoint, require_auth)
+        limited = self.rate_limiter is not None and scope is not None
+        device_token = scope[1] if scope is not None else None
+
         # 构建完整 URL
         url = urljoin(self.base_url, endpoint.lstrip('/'))
 
         # 准备请求参数
         request_kwargs = {
-            'timeout': timeout or self.timeout,
+            'timeout': self._request_timeout(timeout),
             'verify': self.verify_ssl
         }
 
@@ -369,26 +655,250 @@ class ThingsBoardClient:
             else:
                 request_kwargs['json'] = data
 
+        attempt = 0
+        while True:
+            if limited:
+                self.rate_limiter.acquire(device_token)
+
+            response = self._send(method, endpoint, url, request_kwargs, timeout)
+            if span is not None:
+                # urllib3 在连接错误和 5xx 时自动重试的次数
+                retries = getattr(response.raw, "retries", None)
+                record_response(span, response.status_code, attempt + len(getattr(retries, "history", ())))
+            if response.status_code != 429:
+                break
+
+            error = RateLimitError.from_response(response, limit_type=scope[0] if scope else None)
+            if span is not None:
+                span.add_event("rate_limited", {"retry_after": error.retry_after or 0.0})
+            if limited:
+                self.rate_limiter.penalize(device_token, error.retry_after)
+
+            wait = error.retry_after
+            if wait is None:
+                wait = self.retry_backoff_factor * (2 ** attempt)
+            if attempt >= self.rate_limit_retries or wait > self.max_retry_after:
+                raise error
+
+            attempt += 1
+            # 使用限流器时由 acquire() 等待到 Retry-After 之后
+            if not limited:
+                time.sleep(wait)
+
+        # 检查响应状态
+        if response.status_code >= 400:
+            raise APIError.from_response(response)
+
+        return response
+
+    def _send(self,
+              method: str,
+              endpoint: str,
+              url: str,
+              request_kwargs: Dict[str, Any],
+              timeout: Optional[float] = None) -> requests.Response:
+        """
+        发送单次 HTTP 请求
+
+        Raises:
+            ConnectionError: 连接失败时抛出
+            TimeoutError: 请求超时时抛出
+        """
+        hooks = self._hooks
+        event = None
+        if hooks:
+            event = RequestEvent(
+                method=method.upper(),
+                endpoint=templatize_endpoint(endpoint),
+                path=endpoint,
+                request_bytes=body_size(request_kwargs.get('data')),
+                started_at=time.time()
+            )
+            dispatch_hooks(hooks, "pre_request", event)
+
+        with self._stats_lock:
+            self._in_flight += 1
+            self._total_requests += 1
+            if self._in_flight > self._peak_in_flight:
+                self._peak_in_flight = self._in_flight
+
+        started = time.monotonic()
         try:
             response = self._session.request(method, url, **request_kwargs)
 
-            # 检查响应状态
-            if response.status_code >= 400:
-                raise APIError.from_response(response)
-
+            if event is not None:
+                event.duration = time.monotonic() - started
+                event.status = response.status_code
+                event.request_bytes = body_size(response.request.body)
+                event.response_bytes = len(response.content)
+                dispatch_hooks(hooks, "post_response", event)
             return response
 
         except requests.exceptions.ConnectionError as e:
-            raise ConnectionError(
+            raise self._request_failed(hooks, event, started, ConnectionError(
                 message=f"连接失败: {str(e)}",
                 server_url=self.base_url
-            )
+            ))
         except requests.exceptions.Timeout as e:
-            raise TimeoutError(
+            raise self._request_failed(hooks, event, started, TimeoutError(
                 message=f"请求超时: {str(e)}",
                 timeout_seconds=timeout or self.timeout,
                 operation=f"{method} {endpoint}"
-            )
+            ))
+        finally:
+            with self._stats_lock:
+                self._in_flight -= 1
+
+    @staticmethod
+    def _request_failed(hooks: List[RequestHook],
+                        event: Optional[RequestEvent],
+                        started: float,
+                        error: Exception) -> Exception:
+        """通知钩子请求失败，返回需要抛出的异常"""
+        if event is not None:
+            event.duration = time.monotonic() - started
+            event.error = error
+            dispatch_hooks(hooks, "on_error", event)
+        return error
+
+    def add_hook(self, hook: RequestHook) -> RequestHook:
+        """
+        注册请求钩子
+
+        Args:
+            hook: RequestHook 实例（或实现了 pre_request、post_response、on_error 方法的对象）
+
+        Returns:
+            RequestHook: 注册的钩子
+        """
+        with self._stats_lock:
+            self._hooks = self._hooks + [hook]
+        return hook
+
+    def remove_hook(self, hook: RequestHook):
+        """注销请求钩子"""
+        with self._stats_lock:
+            self._hooks = [h for h in self._hooks if h is not hook]
+
+    def enable_metrics(self, significant_bits: int = 7) -> RequestMetrics:
+        """
+        启用内置请求统计（按端点模板记录延迟直方图、状态码和字节数）
+
+        Args:
+            significant_bits: 延迟直方图的有效二进制位数
+
+        Returns:
+            RequestMetrics: 请求统计实例，通过 snapshot() 获取统计数据
+        """
+        if self.metrics is None:
+            self.metrics = self.add_hook(RequestMetrics(significant_bits))
+        return self.metrics
+
+    def disable_metrics(self):
+        """停用内置请求统计"""
+        if self.metrics is not None:
+            self.remove_hook(self.metrics)
+            self.metrics = None
+
+    def _request_timeout(self, timeout: Optional[float] = None) -> Union[float, Tuple[float, float]]:
+        """
+        构建 requests 使用的超时参数
+
+        Args:
+            timeout: 读取超时时间（秒），为空时使用客户端默认值
+
+        Returns:
+            Union[float, Tuple[float, float]]: 未配置连接超时时返回单一超时，否则返回 (连接超时, 读取超时)
+        """
+        read_timeout = timeout or self.timeout
+        if self.connect_timeout is None:
+            return read_timeout
+        return self.connect_timeout, read_timeout
+
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """
+        预先建立长连接
+
+        并发向服务器发送 HEAD 请求，使连接池中保留若干已完成 TCP/TLS 握手的空闲连接，
+        避免首批请求承担建连延迟。预热失败不会抛出异常。
+
+        Args:
+            count: 预热的连接数量，为空时使用 pool_maxsize，且不超过 pool_maxsize
+
+        Returns:
+            int: 成功完成的预热请求数量
+        """
+        count = min(count or self.pool_maxsize, self.pool_maxsize)
+        if count <= 0:
+            return 0
+
+        def _open_connection() -> bool:
+            try:
+                self._session.head(
+                    self.base_url + "/",
+                    timeout=self._request_timeout(),
+                    verify=self.verify_ssl,
+                    allow_redirects=False
+                )
+                return True
+            except requests.exceptions.RequestException:
+                return False
+
+        with ThreadPoolExecutor(max_workers=count, thread_name_prefix="thingsboardlink-prewarm") as executor:
+            results = list(executor.map(lambda _: _open_connection(), range(count)))
+
+        return sum(1 for ok in results if ok)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        获取连接池使用统计
+
+        每个主机连接池的 num_connections 为累计新建连接数，num_requests 为累计请求数，
+        两者接近说明连接几乎没有复用；peak_in_flight 持续达到 pool_maxsize 说明连接池偏小。
+
+        Returns:
+            Dict[str, Any]: 连接池配置、并发请求数及各主机连接池的统计信息
+        """
+        pools = []
+        pool_manager = self._adapter.poolmanager
+        if pool_manager is not None:
+            for key in pool_manager.pools.keys():
+                pool = pool_manager.pools.get(key)
+                if pool is None:
+                    continue
+
+                num_connections = getattr(pool, "num_connections", 0)
+                num_requests = getattr(pool, "num_requests", 0)
+                idle_queue = getattr(pool, "pool", None)
+
+                pools.append({
+                    "scheme": pool.scheme,
+                    "host": pool.host,
+                    "port": pool.port,
+                    "num_connections": num_connections,
+                    "num_requests": num_requests,
+                    # 空闲队列以 None 占位，只有非 None 项才是可复用的已建立连接
+                    "idle_connections": sum(
+                        1 for conn in list(getattr(idle_queue, "queue", [])) if conn is not None
+                    ),
+                    "maxsize": idle_queue.maxsize if idle_queue is not None else self.pool_maxsize,
+                    "reuse_ratio": (1 - num_connections / num_requests) if num_requests else 0.0
+                })
+
+        with self._stats_lock:
+            in_flight = self._in_flight
+            peak_in_flight = self._peak_in_flight
+            total_requests = self._total_requests
+
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+            "in_flight": in_flight,
+            "peak_in_flight": peak_in_flight,
+            "total_requests": total_requests,
+            "pools": pools
+        }
 
     def get(self, endpoint: str, **kwargs) -> requests.Response:
         """发送 GET 请求"""
@@ -408,6 +918,12 @@ class ThingsBoardClient:
 
     def close(self):
         """关闭客户端连接"""
+        self._stop_refresh_thread()
+
+        if self._telemetry_service is not None:
+            # 发送遥测批处理器中的剩余数据
+            self._telemetry_service.close()
+
         if self._session:
             self._session.close()
 
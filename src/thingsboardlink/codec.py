@@ -0,0 +1,618 @@
+"""
+thingsboardlink 时间序列压缩存储模块
+
+本模块提供时间序列数据的紧凑分块文件格式，用于本地历史数据的长期保存和导出：
+
+- 时间戳使用二阶差分（delta-of-delta）变长编码，固定采样间隔的数据每个时间戳只占 1 位；
+- 浮点数值使用 Gorilla 风格的 XOR 编码，变化缓慢的数值通常只需十几位；
+- 非数值数据（字符串、布尔值等）使用 zlib 压缩的 JSON 作为后备编码。
+
+文件由若干数据块和末尾的索引组成，读取器通过内存映射打开文件，
+按索引中的时间范围只解码与查询区间相交的数据块。
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .models import TimeseriesData, ColumnarTimeseriesData
+from .exceptions import ValidationError, ConfigurationError
+
+# 文件头和文件尾标识
+_MAGIC = b"TBTSBLK1"
+
+# 数据块编码方式
+BLOCK_FLOAT = 0
+BLOCK_PLAIN = 1
+
+# 数据块头：编码方式、数据点数量、时间戳编码长度
+_BLOCK_HEADER = struct.Struct("<BII")
+_FOOTER = struct.Struct("<Q")
+_DOUBLE = struct.Struct(">d")
+_UINT64 = struct.Struct(">Q")
+
+_MASK64 = (1 << 64) - 1
+
+# 二阶差分编码区间：(前缀, 前缀位数, 值位数)
+_DOD_BUCKETS = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+    (0b11110, 5, 32),
+)
+
+
+class _BitWriter:
+    """按位写入器，累积满 64 位后以整字节输出"""
+
+    __slots__ = ("_buffer", "_acc", "_bits")
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, bits: int):
+        self._acc = (self._acc << bits) | (value & ((1 << bits) - 1))
+        self._bits += bits
+        if self._bits >= 64:
+            whole = self._bits >> 3
+            remainder = self._bits & 7
+            self._buffer += (self._acc >> remainder).to_bytes(whole, "big")
+            self._acc &= (1 << remainder) - 1
+            self._bits = remainder
+
+    def getvalue(self) -> bytes:
+        """返回写入的字节（末尾不足一个字节的部分补 0）"""
+        data = bytes(self._buffer)
+        if self._bits:
+            padding = (8 - self._bits % 8) % 8
+            data += (self._acc << padding).to_bytes((self._bits + padding) >> 3, "big")
+        return data
+
+
+class _BitReader:
+    """按位读取器"""
+
+    __slots__ = ("_data", "_pos", "_acc", "_bits")
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+        self._acc = 0
+        self._bits = 0
+
+    def read(self, bits: int) -> int:
+        while self._bits < bits:
+            if self._pos >= len(self._data):
+                raise ValueError("数据块已损坏：位流提前结束")
+            self._acc = (self._acc << 8) | self._data[self._pos]
+            self._pos += 1
+            self._bits += 8
+        self._bits -= bits
+        value = self._acc >> self._bits
+        self._acc &= (1 << self._bits) - 1
+        return value
+
+    def read_bit(self) -> int:
+        return self.read(1)
+
+
+def _signed(value: int, bits: int) -> int:
+    """将 bits 位补码转换为有符号整数"""
+    if value >= 1 << (bits - 1):
+        value -= 1 << bits
+    return value
+
+
+def encode_timestamps(timestamps: List[int]) -> bytes:
+    """
+    使用二阶差分编码时间戳
+
+    首个时间戳和首个差值各占 64 位，之后的二阶差分按大小使用 1、9、12、16、37 或 69 位。
+
+    Args:
+        timestamps: 升序排列的时间戳列表（毫秒）
+
+    Returns:
+        bytes: 编码后的字节
+    """
+    writer = _BitWriter()
+    if not timestamps:
+        return b""
+
+    writer.write(timestamps[0] & _MASK64, 64)
+    if len(timestamps) == 1:
+        return writer.getvalue()
+
+    previous_delta = timestamps[1] - timestamps[0]
+    writer.write(previous_delta & _MASK64, 64)
+
+    for index in range(2, len(timestamps)):
+        delta = timestamps[index] - timestamps[index - 1]
+        dod = delta - previous_delta
+        previous_delta = delta
+
+        if dod == 0:
+            writer.write(0, 1)
+            continue
+
+        for prefix, prefix_bits, value_bits in _DOD_BUCKETS:
+            if -(1 << (value_bits - 1)) <= dod < (1 << (value_bits - 1)):
+                writer.write(prefix, prefix_bits)
+                writer.write(dod, value_bits)
+                break
+        else:
+            writer.write(0b11111, 5)
+            writer.write(dod & _MASK64, 64)
+
+    return writer.getvalue()
+
+
+def decode_timestamps(data: bytes, count: int) -> List[int]:
+    """
+    解码二阶差分编码的时间戳
+
+    Args:
+        data: 编码后的字节
+        count: 时间戳数量
+
+    Returns:
+        List[int]: 时间戳列表
+    """
+    if count == 0:
+        return []
+
+    reader = _BitReader(data)
+    timestamps = [_signed(reader.read(64), 64)]
+    if count == 1:
+        return timestamps
+
+    delta = _signed(reader.read(64), 64)
+    timestamps.append(timestamps[0] + delta)
+
+    for _ in range(count - 2):
+        if reader.read_bit() == 0:
+            dod = 0
+        else:
+            # 前缀为若干个 1 后接一个 0（最长的 11111 没有结尾的 0），首位 1 已读取
+            for _, _, value_bits in _DOD_BUCKETS:
+                if reader.read_bit() == 0:
+                    dod = _signed(reader.read(value_bits), value_bits)
+                    break
+            else:
+                dod = _signed(reader.read(64), 64)
+        delta += dod
+        timestamps.append(timestamps[-1] + delta)
+
+    return timestamps
+
+
+def encode_floats(values: List[float]) -> bytes:
+    """
+    使用 Gorilla XOR 编码浮点数
+
+    与前一个值相同时占 1 位；有效位落在前一个值的有效位窗口内时只写有效位，
+    否则写入前导零个数（5 位）、有效位长度（6 位）和有效位。
+
+    Args:
+        values: 浮点数列表
+
+    Returns:
+        bytes: 编码后的字节
+    """
+    writer = _BitWriter()
+    if not values:
+        return b""
+
+    pack, unpack = _DOUBLE.pack, _UINT64.unpack
+    previous = unpack(pack(values[0]))[0]
+    writer.write(previous, 64)
+
+    window_leading = -1
+    window_trailing = 0
+
+    for value in values[1:]:
+        current = unpack(pack(value))[0]
+        xor = current ^ previous
+        previous = current
+
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+
+        if window_leading >= 0 and leading >= window_leading and trailing >= window_trailing:
+            # 控制位 10：沿用前一个有效位窗口
+            writer.write(0b10, 2)
+            meaningful = 64 - window_leading - window_trailing
+            writer.write(xor >> window_trailing, meaningful)
+        else:
+            # 控制位 11：新的有效位窗口
+            meaningful = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(meaningful & 0x3F, 6)  # 64 记为 0
+            writer.write(xor >> trailing, meaningful)
+            window_leading, window_trailing = leading, trailing
+
+    return writer.getvalue()
+
+
+def decode_floats(data: bytes, count: int) -> List[float]:
+    """
+    解码 Gorilla XOR 编码的浮点数
+
+    Args:
+        data: 编码后的字节
+        count: 数值数量
+
+    Returns:
+        List[float]: 浮点数列表
+    """
+    if count == 0:
+        return []
+
+    pack, unpack = _UINT64.pack, _DOUBLE.unpack
+    reader = _BitReader(data)
+    previous = reader.read(64)
+    values = [unpack(pack(previous))[0]]
+
+    window_leading = 0
+    window_trailing = 0
+
+    for _ in range(count - 1):
+        if reader.read_bit() == 0:
+            values.append(values[-1])
+            continue
+
+        if reader.read_bit() == 1:
+            window_leading = reader.read(5)
+            meaningful = reader.read(6) or 64
+            window_trailing = 64 - window_leading - meaningful
+
+        meaningful = 64 - window_leading - window_trailing
+        previous ^= reader.read(meaningful) << window_trailing
+        values.append(unpack(pack(previous))[0])
+
+    return values
+
+
+def encode_block(timestamps: List[int], values: List[Any], numeric: bool) -> bytes:
+    """
+    编码单个数据块
+
+    Args:
+        timestamps: 升序排列的时间戳
+        values: 与时间戳对应的值
+        numeric: 是否使用浮点数 XOR 编码，否则使用 zlib 压缩的 JSON
+
+    Returns:
+        bytes: 数据块字节
+    """
+    ts_data = encode_timestamps(timestamps)
+    if numeric:
+        value_data = encode_floats([float(value) for value in values])
+        encoding = BLOCK_FLOAT
+    else:
+        value_data = zlib.compress(json.dumps(values, separators=(",", ":")).encode("utf-8"))
+        encoding = BLOCK_PLAIN
+    return _BLOCK_HEADER.pack(encoding, len(timestamps), len(ts_data)) + ts_data + value_data
+
+
+def decode_block(data: bytes) -> Tuple[List[int], List[Any]]:
+    """
+    解码单个数据块
+
+    Args:
+        data: 数据块字节
+
+    Returns:
+        Tuple[List[int], List[Any]]: (时间戳列表, 值列表)
+    """
+    encoding, count, ts_length = _BLOCK_HEADER.unpack_from(data, 0)
+    offset = _BLOCK_HEADER.size
+    timestamps = decode_timestamps(data[offset:offset + ts_length], count)
+    value_data = data[offset + ts_length:]
+
+    if encoding == BLOCK_FLOAT:
+        values = decode_floats(value_data, count)
+    elif encoding == BLOCK_PLAIN:
+        values = json.loads(zlib.decompress(value_data))
+    else:
+        raise ValueError(f"未知的数据块编码方式: {encoding}")
+    return timestamps, values
+
+
+class TimeseriesBlockWriter:
+    """
+    时间序列分块文件写入器
+
+    每个键的数据按时间升序切分为不超过 block_size 个数据点的数据块依次写入，
+    close() 时在文件末尾写入索引。数值序列使用 XOR 编码（解码后为浮点数），
+    其他序列使用 zlib 压缩的 JSON。
+
+    用法：
+        with TimeseriesBlockWriter("history.tbts") as writer:
+            writer.write(timeseries_data)
+    """
+
+    def __init__(self, path: str, block_size: int = 1024, coerce_numeric: bool = True):
+        """
+        初始化写入器
+
+        Args:
+            path: 文件路径（已存在时覆盖）
+            block_size: 每个数据块的最大数据点数量
+            coerce_numeric: 是否将字符串形式的数值（REST API 的返回格式）按浮点数编码
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if block_size <= 0:
+            raise ValidationError(
+                field_name="block_size",
+                expected_type="正整数",
+                actual_value=block_size,
+                message="数据块大小必须大于 0"
+            )
+
+        self.path = path
+        self.block_size = block_size
+        self.coerce_numeric = coerce_numeric
+
+        self._file = open(path, "wb")
+        self._file.write(_MAGIC)
+        self._index: Dict[str, List[List[int]]] = {}
+
+    def write(self, data: Union[TimeseriesData, ColumnarTimeseriesData]) -> int:
+        """
+        写入一个键的时间序列数据（同一个键可以多次写入，应按时间先后顺序写入）
+
+        Args:
+            data: 时间序列数据
+
+        Returns:
+            int: 写入的数据块数量
+        """
+        if self._file is None:
+            raise ValueError("写入器已关闭")
+
+        if isinstance(data, TimeseriesData):
+            data = data.to_columnar(coerce_numeric=self.coerce_numeric)
+
+        timestamps = [int(ts) for ts in data.timestamps]
+        values = data.values.tolist() if hasattr(data.values, "tolist") else list(data.values)
+        numeric = data.is_numeric
+
+        blocks = self._index.setdefault(data.key, [])
+        written = 0
+        for start in range(0, len(timestamps), self.block_size):
+            block_ts = timestamps[start:start + self.block_size]
+            block = encode_block(block_ts, values[start:start + self.block_size], numeric)
+            offset = self._file.tell()
+            self._file.write(block)
+            # 索引项：[最小时间戳, 最大时间戳, 数据点数量, 偏移量, 长度]
+            blocks.append([block_ts[0], block_ts[-1], len(block_ts), offset, len(block)])
+            written += 1
+        return written
+
+    def close(self):
+        """写入索引并关闭文件"""
+        if self._file is None:
+            return
+
+        index_offset = self._file.tell()
+        self._file.write(zlib.compress(json.dumps(self._index, separators=(",", ":")).encode("utf-8")))
+        self._file.write(_FOOTER.pack(index_offset))
+        self._file.write(_MAGIC)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.close()
+
+
+class TimeseriesBlockReader:
+    """
+    时间序列分块文件读取器
+
+    通过内存映射打开文件，只解码与查询区间相交的数据块。
+    """
+
+    def __init__(self, path: str):
+        """
+        打开分块文件
+
+        Args:
+            path: 文件路径
+
+        Raises:
+            ConfigurationError: 文件格式不正确时抛出
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            trailer = len(_MAGIC) + _FOOTER.size
+            if size < len(_MAGIC) + trailer:
+                raise ConfigurationError(
+                    message=f"不是有效的时间序列分块文件: {path}",
+                    config_key="path",
+                    expected_value="TimeseriesBlockWriter 生成的文件"
+                )
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mmap[:len(_MAGIC)] != _MAGIC or self._mmap[size - len(_MAGIC):] != _MAGIC:
+                raise ConfigurationError(
+                    message=f"不是有效的时间序列分块文件: {path}",
+                    config_key="path",
+                    expected_value="TimeseriesBlockWriter 生成的文件"
+                )
+
+            index_offset = _FOOTER.unpack_from(self._mmap, size - trailer)[0]
+            index_data = zlib.decompress(self._mmap[index_offset:size - trailer])
+            self._index: Dict[str, List[List[int]]] = {
+                key: sorted(blocks) for key, blocks in json.loads(index_data).items()
+            }
+        except BaseException:
+            self.close()
+            raise
+
+        self.decoded_blocks = 0
+
+    def keys(self) -> List[str]:
+        """文件中包含的数据键"""
+        return list(self._index)
+
+    def blocks(self, key: str) -> List[Dict[str, int]]:
+        """
+        数据块索引
+
+        Args:
+            key: 数据键
+
+        Returns:
+            List[Dict[str, int]]: [{"min_ts", "max_ts", "count", "offset", "length"}, ...]
+        """
+        return [
+            {"min_ts": min_ts, "max_ts": max_ts, "count": count, "offset": offset, "length": length}
+            for min_ts, max_ts, count, offset, length in self._index.get(key, [])
+        ]
+
+    def _iter_blocks(self, key: str, start_ts: Optional[int], end_ts: Optional[int]) -> Iterator[Tuple[List[int], List[Any]]]:
+        for min_ts, max_ts, _, offset, length in self._index.get(key, []):
+            if start_ts is not None and max_ts < start_ts:
+                continue
+            if end_ts is not None and min_ts >= end_ts:
+                break
+            self.decoded_blocks += 1
+            yield decode_block(self._mmap[offset:offset + length])
+
+    def read_columns(self,
+                     key: str,
+                     start_ts: Optional[int] = None,
+                     end_ts: Optional[int] = None) -> Tuple[List[int], List[Any]]:
+        """
+        读取 [start_ts, end_ts) 内的数据（与 fetch_timeseries 和 TimeseriesCache 一致）
+
+        Args:
+            key: 数据键
+            start_ts: 开始时间戳（毫秒），为空时不限制
+            end_ts: 结束时间戳（毫秒，不包含），为空时不限制
+
+        Returns:
+            Tuple[List[int], List[Any]]: (时间戳列表, 值列表)
+        """
+        timestamps: List[int] = []
+        values: List[Any] = []
+        for block_ts, block_values in self._iter_blocks(key, start_ts, end_ts):
+            if (start_ts is None or block_ts[0] >= start_ts) and (end_ts is None or block_ts[-1] < end_ts):
+                timestamps.extend(block_ts)
+                values.extend(block_values)
+                continue
+            for ts, value in zip(block_ts, block_values):
+                if (start_ts is None or ts >= start_ts) and (end_ts is None or ts < end_ts):
+                    timestamps.append(ts)
+                    values.append(value)
+        return timestamps, values
+
+    def read(self,
+             key: str,
+             start_ts: Optional[int] = None,
+             end_ts: Optional[int] = None) -> TimeseriesData:
+        """
+        读取时间序列数据
+
+        Args:
+            key: 数据键
+            start_ts: 开始时间戳（毫秒），为空时不限制
+            end_ts: 结束时间戳（毫秒，不包含），为空时不限制
+
+        Returns:
+            TimeseriesData: 按时间升序排列的时间序列数据
+        """
+        timestamps, values = self.read_columns(key, start_ts, end_ts)
+        return TimeseriesData(key=key, values=[{"ts": ts, "value": value} for ts, value in zip(timestamps, values)])
+
+    def read_columnar(self,
+                      key: str,
+                      start_ts: Optional[int] = None,
+                      end_ts: Optional[int] = None) -> ColumnarTimeseriesData:
+        """读取为列式时间序列数据"""
+        timestamps, values = self.read_columns(key, start_ts, end_ts)
+        return ColumnarTimeseriesData.from_values(
+            key, [{"ts": ts, "value": value} for ts, value in zip(timestamps, values)],
+            coerce_numeric=False
+        )
+
+    def close(self):
+        """关闭文件"""
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.close()
+
+
+def write_timeseries_file(path: str,
+                          data: Dict[str, Union[TimeseriesData, ColumnarTimeseriesData]],
+                          block_size: int = 1024,
+                          coerce_numeric: bool = True) -> int:
+    """
+    将多个键的时间序列写入分块文件
+
+    Args:
+        path: 文件路径
+        data: {键: 时间序列数据}，如 get_timeseries_telemetry 的返回值
+        block_size: 每个数据块的最大数据点数量
+        coerce_numeric: 是否将字符串形式的数值按浮点数编码
+
+    Returns:
+        int: 写入的数据块数量
+    """
+    with TimeseriesBlockWriter(path, block_size=block_size, coerce_numeric=coerce_numeric) as writer:
+        return sum(writer.write(series) for series in data.values())
+
+
+def read_timeseries_file(path: str,
+                         keys: Optional[List[str]] = None,
+                         start_ts: Optional[int] = None,
+                         end_ts: Optional[int] = None) -> Dict[str, TimeseriesData]:
+    """
+    从分块文件读取时间序列数据
+
+    Args:
+        path: 文件路径
+        keys: 数据键列表，为空时读取所有键
+        start_ts: 开始时间戳（毫秒），为空时不限制
+        end_ts: 结束时间戳（毫秒，不包含），为空时不限制
+
+    Returns:
+        Dict[str, TimeseriesData]: 按键组织的时间序列数据
+    """
+    with TimeseriesBlockReader(path) as reader:
+        return {
+            key: reader.read(key, start_ts, end_ts)
+            for key in (keys if keys is not None else reader.keys())
+            if key in reader.keys()
+        }
@@ -167,6 +167,9 @@ class APIError(ThingsBoardError):
         Return:
             API 调用错误异常
         """
+        if cls is APIError and getattr(response, 'status_code', None) == 429:
+            return RateLimitError.from_response(response, message)
+
         if message is None:
             message = f"API 调用失败，状态码: {response.status_code}"
 
@@ -266,26 +269,73 @@ class RateLimitError(APIError):
     """
     速率限制错误
 
-    当 API 调用超过速率限制时抛出此异常。
+    当 API 调用超过速率限制时抛出此异常（服务器返回 429，或客户端限流器拒绝请求）。
     包含重试建议和限制信息。
     """
 
     def __init__(self, message: str = "API 调用速率超限",
-                 retry_after: Optional[int] = None,
-                 limit_type: Optional[str] = None):
+                 retry_after: Optional[float] = None,
+                 limit_type: Optional[str] = None,
+                 response_data: Optional[Dict[str, Any]] = None,
+                 request_url: Optional[str] = None,
+                 request_method: Optional[str] = None):
         """
         初始化速率限制错误异常
 
         Args:
             message: 错误消息
-            retry_after: 重试
+            retry_after: 建议的重试等待时间（秒），未知时为空
+            limit_type: 限制类型（tenant 或 device）
+            response_data: 响应数据
+            request_url: 请求地址
+            request_method: 请求方法
+        """
+        details = dict(response_data or {})
+        details["retry_after"] = retry_after
+        details["limit_type"] = limit_type
+        super().__init__(message, status_code=429, response_data=details,
+                         request_url=request_url, request_method=request_method)
+        self.retry_after = retry_after
+        self.limit_type = limit_type
+
+    @classmethod
+    def from_response(cls, response, message: Optional[str] = None, limit_type: Optional[str] = None):
+        """
+        从 429 响应创建速率限制错误异常，重试等待时间取自 Retry-After 响应头
+
+        Args:
+            response: HTTP 响应对象
+            message: 错误消息
             limit_type: 限制类型
+
+        Return:
+            速率限制错误异常
         """
-        details = {
-            "retry_after": retry_after,
-            "limit_type": limit_type
-        }
-        super().__init__(message, status_code=429, response_data=details)
+        from .ratelimit import parse_retry_after
+
+        headers = getattr(response, "headers", None) or {}
+        retry_after = parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+
+        try:
+            response_data = response.json()
+        except (ValueError, AttributeError):
+            response_data = {"raw_response": response.text if hasattr(response, 'text') else str(response)}
+        if not isinstance(response_data, dict):
+            response_data = {"response": response_data}
+
+        if message is None:
+            message = response_data.get("message") or "API 调用速率超限"
+            if retry_after is not None:
+                message = f"{message}，建议 {retry_after:g} 秒后重试"
+
+        return cls(
+            message=message,
+            retry_after=retry_after,
+            limit_type=limit_type,
+            response_data=response_data,
+            request_url=getattr(response, 'url', None),
+            request_method=getattr(response.request, 'method', None) if hasattr(response, 'request') else None
+        )
 
 
 class DeviceError(ThingsBoardError):
@@ -340,6 +390,31 @@ class TelemetryError(ThingsBoardError):
         super().__init__(message, details)
 
 
+class PartialTelemetryError(TelemetryError):
+    """
+    遥测数据部分上传失败
+
+    拆分为多个负载上传时，部分负载上传失败时抛出此异常。
+    result 属性包含每个负载的上传结果及失败负载的数据，可用于重试。
+    """
+
+    def __init__(self, message: str, result: Any = None):
+        """
+        初始化部分上传失败异常
+
+        Args:
+            message: 错误消息
+            result: 分块上传结果（ChunkedTelemetryResult）
+        """
+        super().__init__(message)
+        self.result = result
+        if result is not None:
+            self.details = {
+                "chunks": result.chunks,
+                "failed_chunks": sorted(result.failed)
+            }
+
+
 class AlarmError(ThingsBoardError):
     """
     警报相关错误
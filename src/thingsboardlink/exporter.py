@@ -0,0 +1,366 @@
+"""
+thingsboardlink 指标导出模块
+
+本模块将客户端的运行指标渲染为 OpenMetrics 文本格式（Prometheus 可直接抓取）：
+
+- 按方法和端点模板统计的请求数、按异常类型统计的错误数、延迟直方图和收发字节数；
+- HTTP 连接池的在途请求数和连接复用情况；
+- 设备凭证缓存和时间序列缓存的命中情况；
+- 遥测批处理器和发件箱的队列深度，以及死区过滤、客户端限流和自适应并发的状态。
+
+可以通过 render() 获取文本，也可以用 serve() 启动一个内置的 HTTP 端点。
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 延迟直方图的默认导出上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: Any) -> str:
+    """转义标签值"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class _MetricFamily:
+    """单个指标族：TYPE、HELP 和若干样本"""
+
+    __slots__ = ("name", "type", "help", "samples")
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.samples: List[Tuple[str, Dict[str, Any], Any]] = []
+
+    def add(self, value: Any, labels: Optional[Dict[str, Any]] = None, suffix: str = ""):
+        if value is None:
+            return
+        self.samples.append((suffix, labels or {}, value))
+
+    def render(self, lines: List[str]):
+        if not self.samples:
+            return
+        lines.append(f"# TYPE {self.name} {self.type}")
+        lines.append(f"# HELP {self.name} {self.help}")
+        for suffix, labels, value in self.samples:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{self.name}{suffix}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{self.name}{suffix} {_format_value(value)}")
+
+
+class MetricsExporter:
+    """
+    OpenMetrics 指标导出器
+
+    创建时自动启用客户端的请求统计（client.enable_metrics()）。
+
+    用法：
+        exporter = MetricsExporter(client)
+        port = exporter.serve(port=9464)   # http://host:9464/metrics
+        text = exporter.render()
+    """
+
+    def __init__(self,
+                 client,
+                 namespace: str = "thingsboardlink",
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        初始化指标导出器
+
+        Args:
+            client: ThingsBoardClient 或 AsyncThingsBoardClient 实例
+            namespace: 指标名称前缀
+            buckets: 延迟直方图的导出上界（秒）
+        """
+        self.client = client
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+
+        self.metrics = client.enable_metrics()
+
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _family(self, families: Dict[str, _MetricFamily], name: str, metric_type: str, help_text: str) -> _MetricFamily:
+        full_name = f"{self.namespace}_{name}"
+        family = families.get(full_name)
+        if family is None:
+            family = families[full_name] = _MetricFamily(full_name, metric_type, help_text)
+        return family
+
+    def render(self) -> str:
+        """
+        渲染所有指标
+
+        Returns:
+            str: OpenMetrics 文本（以 "# EOF" 结尾）
+        """
+        families: Dict[str, _MetricFamily] = {}
+
+        self._collect_requests(families)
+        self._collect_pool(families)
+        self._collect_caches(families)
+        self._collect_telemetry(families)
+        self._collect_rate_limiter(families)
+
+        lines: List[str] = []
+        for family in families.values():
+            family.render(lines)
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _collect_requests(self, families: Dict[str, _MetricFamily]):
+        """请求数、错误数、延迟直方图和字节数"""
+        snapshot = self.metrics.snapshot(buckets=self.buckets)
+
+        requests = self._family(families, "requests", "counter", "HTTP requests by method, endpoint template and status.")
+        errors = self._family(families, "request_errors", "counter",
+                              "Failed HTTP requests by method, endpoint template and exception class.")
+        duration = self._family(families, "request_duration_seconds", "histogram",
+                                "HTTP request latency by method and endpoint template.")
+        sent = self._family(families, "request_sent_bytes", "counter", "Request body bytes sent.")
+        received = self._family(families, "request_received_bytes", "counter", "Response body bytes received.")
+
+        for key, stats in snapshot["endpoints"].items():
+            method, _, endpoint = key.partition(" ")
+            labels = {"method": method, "endpoint": endpoint}
+
+            for status, count in stats["statuses"].items():
+                requests.add(count, dict(labels, status=status), "_total")
+            for exception, count in stats["exceptions"].items():
+                errors.add(count, dict(labels, exception=exception), "_total")
+
+            latency = stats["latency"]
+            for bound, count in latency.get("buckets", []):
+                duration.add(count, dict(labels, le=_format_value(float(bound))), "_bucket")
+            duration.add(latency["count"], dict(labels, le="+Inf"), "_bucket")
+            duration.add(latency["sum"], labels, "_sum")
+            duration.add(latency["count"], labels, "_count")
+
+            sent.add(stats["request_bytes"], labels, "_total")
+            received.add(stats["response_bytes"], labels, "_total")
+
+    def _collect_pool(self, families: Dict[str, _MetricFamily]):
+        """连接池使用情况（仅同步客户端）"""
+        get_pool_stats = getattr(self.client, "get_pool_stats", None)
+        if get_pool_stats is None:
+            return
+        stats = get_pool_stats()
+
+        self._family(families, "pool_in_flight", "gauge", "HTTP requests currently in flight.").add(stats["in_flight"])
+        self._family(families, "pool_peak_in_flight", "gauge",
+                     "Highest number of concurrent HTTP requests.").add(stats["peak_in_flight"])
+        self._family(families, "pool_maxsize", "gauge",
+                     "Connections kept per host pool.").add(stats["pool_maxsize"])
+        self._family(families, "pool_requests", "counter",
+                     "HTTP requests sent by the client.").add(stats["total_requests"], suffix="_total")
+
+        created = self._family(families, "pool_connections_created", "counter", "Connections opened per host.")
+        idle = self._family(families, "pool_idle_connections", "gauge", "Idle reusable connections per host.")
+        for pool in stats["pools"]:
+            labels = {"host": f"{pool['scheme']}://{pool['host']}:{pool['port']}"}
+            created.add(pool["num_connections"], labels, "_total")
+            idle.add(pool["idle_connections"], labels)
+
+    def _collect_caches(self, families: Dict[str, _MetricFamily]):
+        """设备凭证缓存和时间序列缓存"""
+        hits = self._family(families, "cache_hits", "counter", "Cache hits.")
+        misses = self._family(families, "cache_misses", "counter", "Cache misses.")
+        ratio = self._family(families, "cache_hit_ratio", "gauge", "Cache hit ratio since start.")
+        size = self._family(families, "cache_entries", "gauge", "Entries currently cached.")
+
+        device_service = getattr(self.client, "_device_service", None)
+        cache = getattr(device_service, "credentials_cache", None)
+        if cache is not None:
+            stats = cache.stats
+            labels = {"cache": "device_credentials"}
+            hits.add(stats.hits, labels, "_total")
+            misses.add(stats.misses, labels, "_total")
+            ratio.add(stats.hit_ratio, labels)
+            size.add(stats.size, labels)
+            self._family(families, "cache_evictions", "counter",
+                         "Cache entries evicted.").add(stats.evictions + stats.expirations, labels, "_total")
+
+        telemetry_service = getattr(self.client, "_telemetry_service", None)
+        caches = list(getattr(telemetry_service, "_timeseries_caches", ()))
+        if caches:
+            totals = {"hits": 0, "partial_hits": 0, "misses": 0, "points": 0}
+            for timeseries_cache in caches:
+                try:
+                    stats = timeseries_cache.stats
+                except Exception:
+                    # 已关闭的缓存
+                    continue
+                for name in totals:
+                    totals[name] += stats[name]
+
+            labels = {"cache": "timeseries"}
+            lookups = totals["hits"] + totals["partial_hits"] + totals["misses"]
+            hits.add(totals["hits"], labels, "_total")
+            misses.add(totals["misses"], labels, "_total")
+            ratio.add(totals["hits"] / lookups if lookups else 0.0, labels)
+            size.add(totals["points"], labels)
+            self._family(families, "cache_partial_hits", "counter",
+                         "Timeseries cache lookups that fetched only missing ranges.").add(
+                totals["partial_hits"], labels, "_total")
+
+    def _collect_telemetry(self, families: Dict[str, _MetricFamily]):
+        """批处理器和发件箱的队列深度、死区过滤和自适应并发"""
+        telemetry_service = getattr(self.client, "_telemetry_service", None)
+        if telemetry_service is None:
+            return
+
+        batchers = list(getattr(telemetry_service, "_batchers", ()))
+        if batchers:
+            totals: Dict[str, int] = {}
+            for batcher in batchers:
+                for name, value in batcher.stats.items():
+                    if isinstance(value, int):
+                        totals[name] = totals.get(name, 0) + value
+            self._family(families, "batcher_pending_points", "gauge",
+                         "Data points waiting in telemetry batchers.").add(totals["pending_points"])
+            self._family(families, "batcher_pending_batches", "gauge",
+                         "Batches waiting in telemetry batchers.").add(totals["pending_batches"])
+            self._family(families, "batcher_sent_points", "counter",
+                         "Data points sent by telemetry batchers.").add(totals["sent_points"], suffix="_total")
+            self._family(families, "batcher_failed_points", "counter",
+                         "Data points telemetry batchers failed to send.").add(totals["failed_points"], suffix="_total")
+
+        outboxes = list(getattr(telemetry_service, "_outboxes", ()))
+        if outboxes:
+            totals = {}
+            for outbox in outboxes:
+                for name, value in outbox.stats.items():
+                    if isinstance(value, int):
+                        totals[name] = totals.get(name, 0) + value
+            self._family(families, "outbox_pending_records", "gauge",
+                         "Records waiting in telemetry outboxes.").add(totals["pending_records"])
+            self._family(families, "outbox_pending_points", "gauge",
+                         "Data points waiting in telemetry outboxes.").add(totals["pending_points"])
+            self._family(families, "outbox_pending_bytes", "gauge",
+                         "Bytes stored in telemetry outboxes.").add(totals["pending_bytes"])
+            self._family(families, "outbox_sent_points", "counter",
+                         "Data points delivered from telemetry outboxes.").add(totals["sent_points"], suffix="_total")
+            self._family(families, "outbox_dropped_points", "counter",
+                         "Data points dropped by telemetry outboxes.").add(totals["dropped_points"], suffix="_total")
+
+        deadband = getattr(telemetry_service, "deadband", None)
+        if deadband is not None:
+            stats = deadband.stats
+            self._family(families, "deadband_passed_points", "counter",
+                         "Data points passed by the deadband filter.").add(stats["passed_points"], suffix="_total")
+            self._family(families, "deadband_dropped_points", "counter",
+                         "Data points dropped by the deadband filter.").add(stats["dropped_points"], suffix="_total")
+
+        concurrency = getattr(telemetry_service, "concurrency", None)
+        if concurrency is not None:
+            stats = concurrency.stats
+            self._family(families, "concurrency_limit", "gauge",
+                         "Current adaptive concurrency limit.").add(stats["limit"])
+            self._family(families, "concurrency_in_flight", "gauge",
+                         "Requests holding an adaptive concurrency permit.").add(stats["in_flight"])
+            self._family(families, "concurrency_waiting", "gauge",
+                         "Requests waiting for an adaptive concurrency permit.").add(stats["waiting"])
+            self._family(families, "concurrency_throughput", "gauge",
+                         "Completed requests per second over the metrics window.").add(stats["throughput"])
+            self._family(families, "concurrency_decreases", "counter",
+                         "Multiplicative concurrency limit cuts.").add(stats["decreases"], suffix="_total")
+
+    def _collect_rate_limiter(self, families: Dict[str, _MetricFamily]):
+        """客户端限流"""
+        limiter = getattr(self.client, "rate_limiter", None)
+        if limiter is None:
+            return
+        stats = limiter.stats
+        self._family(families, "rate_limiter_acquired", "counter",
+                     "Requests admitted by the client-side rate limiter.").add(stats["acquired"], suffix="_total")
+        self._family(families, "rate_limiter_delayed", "counter",
+                     "Requests delayed by the client-side rate limiter.").add(stats["delayed"], suffix="_total")
+        self._family(families, "rate_limiter_wait_seconds", "counter",
+                     "Total time requests waited for the rate limiter.").add(stats["total_wait"], suffix="_total")
+        self._family(families, "rate_limiter_rejected", "counter",
+                     "Requests rejected by the client-side rate limiter.").add(stats["rejected"], suffix="_total")
+        self._family(families, "rate_limiter_throttled_responses", "counter",
+                     "429 responses received from the server.").add(stats["throttled_responses"], suffix="_total")
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464, path: str = "/metrics") -> int:
+        """
+        在后台线程中启动 HTTP 端点
+
+        Args:
+            host: 监听地址
+            port: 监听端口，为 0 时自动分配
+            path: 指标路径
+
+        Returns:
+            int: 实际监听的端口
+        """
+        if self._server is not None:
+            return self._server.server_address[1]
+
+        exporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != path:
+                    self.send_error(404)
+                    return
+                try:
+                    body = exporter.render().encode("utf-8")
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="thingsboardlink-metrics",
+            daemon=True
+        )
+        self._thread.start()
+        return self._server.server_address[1]
+
+    def stop(self):
+        """停止 HTTP 端点"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.stop()
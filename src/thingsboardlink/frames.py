@@ -0,0 +1,361 @@
+"""
+thingsboardlink 表格数据转换模块
+
+本模块提供 pandas DataFrame / NumPy 数组与遥测数据之间的向量化转换：
+
+- 上传：将"时间戳列 + 数值列"形式的表格数据按时间戳分组为多时间戳遥测负载，
+  排序、分组、空值过滤和类型转换均按列批量完成，无需为每个值创建 TelemetryData 对象；
+- 导出：将多个键的时间序列按时间戳对齐为二维数组或 DataFrame。
+
+需要安装可选依赖 numpy（pip install thingsboardlink[numpy]），
+DataFrame 相关功能还需要 pandas（pip install thingsboardlink[pandas]）。
+"""
+
+import gc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 可选依赖
+    np = None
+
+from .models import TimeseriesData, ColumnarTimeseriesData
+from .exceptions import ValidationError, ConfigurationError
+
+
+def _require_numpy():
+    """确认已安装 numpy"""
+    if np is None:
+        raise ConfigurationError(
+            message="该功能需要安装 numpy: pip install thingsboardlink[numpy]",
+            config_key="numpy",
+            expected_value="numpy>=1.20.0"
+        )
+    return np
+
+
+def _require_pandas():
+    """导入 pandas（延迟导入，避免拖慢包的导入速度）"""
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ConfigurationError(
+            message="该功能需要安装 pandas: pip install thingsboardlink[pandas]",
+            config_key="pandas",
+            expected_value="pandas>=1.1.0"
+        ) from None
+    return pd
+
+
+@contextmanager
+def _gc_paused():
+    """
+    暂停循环垃圾回收
+
+    一次创建数百万个字典时，分代回收会被反复触发并遍历所有新对象，
+    而这些对象都不含循环引用，暂停回收可以显著缩短构建时间。
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def is_dataframe(data: Any) -> bool:
+    """判断是否为 pandas DataFrame（不导入 pandas）"""
+    return type(data).__name__ == "DataFrame" and type(data).__module__.startswith("pandas")
+
+
+def is_columnar_input(data: Any, ts_column: str = "ts") -> bool:
+    """
+    判断遥测数据是否为表格形式
+
+    支持 pandas DataFrame、带时间戳字段的 NumPy 结构化数组，
+    以及时间戳列为 NumPy 数组的 {列名: 数组} 字典。
+
+    Args:
+        data: 遥测数据
+        ts_column: 时间戳列名
+
+    Returns:
+        bool: 是否为表格形式
+    """
+    if is_dataframe(data):
+        return True
+    if np is None:
+        return False
+    if isinstance(data, np.ndarray):
+        return data.dtype.names is not None and ts_column in data.dtype.names
+    if isinstance(data, Mapping):
+        return isinstance(data.get(ts_column), np.ndarray)
+    return False
+
+
+def _timestamps_to_ms(values: Any) -> "np.ndarray":
+    """将时间戳列转换为毫秒 int64 数组（支持整数毫秒、datetime64 和带时区的 pandas 时间）"""
+    if hasattr(values, "dt") or type(values).__name__ == "DatetimeIndex":
+        # 带时区的 pandas 时间列无法直接转为 datetime64 数组，先统一转换为 UTC；
+        # 时间精度（ns、us、s 等）由 datetime64 类型转换处理
+        pd = _require_pandas()
+        index = pd.DatetimeIndex(values)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return index.to_numpy().astype("datetime64[ms]").astype(np.int64)
+
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        return array.astype("datetime64[ms]").astype(np.int64)
+    if np.issubdtype(array.dtype, np.floating):
+        if np.isnan(array).any():
+            raise ValidationError(
+                field_name="ts",
+                expected_type="毫秒时间戳",
+                message="时间戳列不能包含空值"
+            )
+    elif not np.issubdtype(array.dtype, np.integer):
+        raise ValidationError(
+            field_name="ts",
+            expected_type="毫秒时间戳或 datetime64",
+            actual_value=str(array.dtype),
+            message="时间戳列类型不受支持"
+        )
+    return array.astype(np.int64)
+
+
+def _columns(data: Any, ts_column: str) -> Tuple[Any, List[Tuple[str, Any]]]:
+    """拆分为 (时间戳列, [(键, 数值列), ...])"""
+    if is_dataframe(data):
+        if ts_column in data.columns:
+            ts_values = data[ts_column]
+            value_columns = [(str(name), data[name]) for name in data.columns if name != ts_column]
+        elif type(data.index).__name__ == "DatetimeIndex" or data.index.name == ts_column:
+            ts_values = data.index
+            value_columns = [(str(name), data[name]) for name in data.columns]
+        else:
+            raise ValidationError(
+                field_name="telemetry_data",
+                expected_type=f"包含 {ts_column} 列或时间索引的 DataFrame",
+                message=f"DataFrame 中缺少时间戳列: {ts_column}"
+            )
+        return ts_values, value_columns
+
+    if isinstance(data, np.ndarray):
+        return data[ts_column], [(name, data[name]) for name in data.dtype.names if name != ts_column]
+
+    return data[ts_column], [(str(key), value) for key, value in data.items() if key != ts_column]
+
+
+def _column_values(values: Any, order: "np.ndarray", size: int) -> Tuple[List[Any], Optional[List[bool]]]:
+    """
+    按排序下标重排数值列，转换为 Python 原生类型，并计算空值掩码
+
+    Returns:
+        Tuple[List[Any], Optional[List[bool]]]: (值列表, 有效值掩码)，无空值时掩码为 None
+    """
+    pandas_valid = None
+    if hasattr(values, "notna") and hasattr(values, "to_numpy"):
+        # pandas 列：可空整数/布尔等扩展类型的缺失值（pandas.NA）只能通过 notna 识别，
+        # 并转换为对象数组以保留整数和布尔类型
+        pandas_valid = np.asarray(values.notna())
+        if isinstance(values.dtype, np.dtype):
+            values = values.to_numpy()
+        else:
+            values = values.to_numpy(dtype=object, na_value=None)
+    array = np.asarray(values)
+
+    if array.dtype.kind in "Mm":
+        raise ValidationError(
+            field_name="telemetry_data",
+            expected_type="数值、布尔或字符串列",
+            actual_value=str(array.dtype),
+            message="时间类型的数值列不受支持"
+        )
+
+    if array.ndim != 1 or len(array) != size:
+        raise ValidationError(
+            field_name="telemetry_data",
+            expected_type=f"长度为 {size} 的一维数组",
+            actual_value=getattr(array, "shape", None),
+            message="数值列的长度必须与时间戳列一致"
+        )
+
+    array = array[order]
+
+    if pandas_valid is not None:
+        valid = pandas_valid[order]
+    elif array.dtype.kind == "f":
+        valid = ~np.isnan(array)
+    elif array.dtype.kind == "O":
+        # 对象列中的 None 和 NaN 视为缺失值
+        valid = np.array([value is not None and value == value for value in array.tolist()], dtype=bool)
+    else:
+        return array.tolist(), None
+
+    if valid.all():
+        return array.tolist(), None
+    return array.tolist(), valid.tolist()
+
+
+def columns_to_entries(data: Any, ts_column: str = "ts") -> List[Dict[str, Any]]:
+    """
+    将表格形式的遥测数据转换为按时间戳分组的 API 条目列表
+
+    行按时间戳稳定排序，相同时间戳的行合并（后出现的值覆盖先出现的值），
+    缺失值（NaN、None、pandas.NA）不上传，所有值均为缺失值的时间戳被忽略。
+
+    Args:
+        data: pandas DataFrame、NumPy 结构化数组或 {列名: 数组} 字典
+        ts_column: 时间戳列名（毫秒整数或 datetime 类型）；DataFrame 缺少该列时使用时间索引
+
+    Returns:
+        List[Dict[str, Any]]: [{"ts": ts, "values": {...}}, ...] 格式的条目列表，按时间升序排列
+
+    Raises:
+        ValidationError: 数据格式不正确时抛出
+        ConfigurationError: 未安装 numpy 时抛出
+    """
+    _require_numpy()
+
+    ts_values, value_columns = _columns(data, ts_column)
+    timestamps = _timestamps_to_ms(ts_values)
+
+    if timestamps.ndim != 1 or len(timestamps) == 0:
+        raise ValidationError(
+            field_name="telemetry_data",
+            message="表格遥测数据不能为空"
+        )
+
+    if not value_columns:
+        raise ValidationError(
+            field_name="telemetry_data",
+            message="表格遥测数据中没有数值列"
+        )
+
+    size = len(timestamps)
+    order = np.argsort(timestamps, kind="stable")
+    sorted_ts = timestamps[order]
+
+    keys = [key for key, _ in value_columns]
+    columns = []
+    masks = []
+    for _, values in value_columns:
+        column, mask = _column_values(values, order, size)
+        columns.append(column)
+        masks.append(mask)
+
+    unique_ts = bool(size == 1 or (np.diff(sorted_ts) != 0).all())
+    ts_list = sorted_ts.tolist()
+
+    with _gc_paused():
+        if unique_ts and all(mask is None for mask in masks):
+            # 常见情况：时间戳唯一且没有缺失值
+            return [{"ts": ts, "values": dict(zip(keys, row))} for ts, row in zip(ts_list, zip(*columns))]
+
+        entries: List[Dict[str, Any]] = []
+        indexed = list(zip(keys, columns, masks))
+        for row, ts in enumerate(ts_list):
+            values = {key: column[row] for key, column, mask in indexed if mask is None or mask[row]}
+            if not values:
+                continue
+            if entries and entries[-1]["ts"] == ts:
+                entries[-1]["values"].update(values)
+            else:
+                entries.append({"ts": ts, "values": values})
+
+    if not entries:
+        raise ValidationError(
+            field_name="telemetry_data",
+            message="表格遥测数据中没有有效值"
+        )
+    return entries
+
+
+def _as_columnar(series: Union[TimeseriesData, ColumnarTimeseriesData],
+                 coerce_numeric: bool) -> ColumnarTimeseriesData:
+    if isinstance(series, ColumnarTimeseriesData):
+        return series
+    return series.to_columnar(coerce_numeric=coerce_numeric)
+
+
+def align_timeseries(data: Mapping[str, Union[TimeseriesData, ColumnarTimeseriesData]],
+                     keys: Optional[List[str]] = None,
+                     coerce_numeric: bool = True) -> Tuple["np.ndarray", Dict[str, "np.ndarray"]]:
+    """
+    将多个键的时间序列按时间戳对齐
+
+    结果时间戳为所有键时间戳的并集（升序），某个键在该时间戳上没有数据时，
+    数值列填充 NaN，非数值列填充 None。同一键的重复时间戳保留最后一个值。
+
+    Args:
+        data: {键: 时间序列数据}，如 get_timeseries_telemetry 的返回值
+        keys: 导出的键及顺序，为空时导出所有键
+        coerce_numeric: 是否尝试将字符串值转换为浮点数
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, np.ndarray]]: (int64 时间戳数组, {键: 对齐后的值数组})
+
+    Raises:
+        ConfigurationError: 未安装 numpy 时抛出
+    """
+    _require_numpy()
+
+    keys = list(data.keys()) if keys is None else list(keys)
+    columnar = {key: _as_columnar(data[key], coerce_numeric) for key in keys if key in data}
+
+    parts = [np.asarray(series.timestamps, dtype=np.int64) for series in columnar.values()]
+    timestamps = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    aligned: Dict[str, np.ndarray] = {}
+    for key in keys:
+        series = columnar.get(key)
+        if series is None or len(series) == 0:
+            aligned[key] = np.full(len(timestamps), np.nan)
+            continue
+
+        series_ts = np.asarray(series.timestamps, dtype=np.int64)
+        series_values = np.asarray(series.values) if series.is_numeric else np.asarray(series.values, dtype=object)
+
+        if series.is_numeric:
+            column = np.full(len(timestamps), np.nan)
+        else:
+            column = np.empty(len(timestamps), dtype=object)
+        # 时间戳升序，重复时间戳按赋值顺序保留最后一个值
+        column[np.searchsorted(timestamps, series_ts)] = series_values
+        aligned[key] = column
+
+    return timestamps, aligned
+
+
+def timeseries_to_dataframe(data: Mapping[str, Union[TimeseriesData, ColumnarTimeseriesData]],
+                            keys: Optional[List[str]] = None,
+                            coerce_numeric: bool = True,
+                            datetime_index: bool = True):
+    """
+    将多个键的时间序列导出为按时间戳对齐的 DataFrame
+
+    Args:
+        data: {键: 时间序列数据}，如 get_timeseries_telemetry 的返回值
+        keys: 导出的键及列顺序，为空时导出所有键
+        coerce_numeric: 是否尝试将字符串值转换为浮点数
+        datetime_index: 是否使用 UTC 时间索引，否则使用毫秒时间戳索引
+
+    Returns:
+        pandas.DataFrame: 每个键一列、索引名为 ts 的 DataFrame
+
+    Raises:
+        ConfigurationError: 未安装 numpy 或 pandas 时抛出
+    """
+    pd = _require_pandas()
+    timestamps, aligned = align_timeseries(data, keys=keys, coerce_numeric=coerce_numeric)
+
+    if datetime_index:
+        index = pd.to_datetime(timestamps, unit="ms", utc=True)
+    else:
+        index = pd.Index(timestamps)
+    index.name = "ts"
+
+    return pd.DataFrame(aligned, index=index)
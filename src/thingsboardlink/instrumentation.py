@@ -0,0 +1,404 @@
+"""
+thingsboardlink 请求监测模块
+
+本模块为客户端的 HTTP 请求提供钩子（中间件）接口和内置的延迟统计：
+
+- RequestHook：请求发送前、收到响应后和请求出错时的回调，参数为 RequestEvent；
+- LatencyHistogram：HDR 风格的对数-线性延迟直方图，记录为 O(1)，相对误差约 1%；
+- RequestMetrics：按 "方法 端点模板" 分组统计延迟、状态码、异常类型和字节数的内置钩子。
+
+端点中的设备 ID、设备令牌等可变部分会被替换为占位符（如 /api/device/{id}），
+同一类请求汇总到同一个直方图中。
+"""
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+# 路径段中的可变部分
+_UUID_SEGMENT = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+_DEVICE_API = re.compile(r"^/api/v1/[^/]+(/|$)")
+
+_template_cache: Dict[str, str] = {}
+_TEMPLATE_CACHE_SIZE = 10000
+
+
+def templatize_endpoint(endpoint: str) -> str:
+    """
+    将请求端点转换为模板，去掉查询参数并把可变路径段替换为占位符
+
+    - 设备 HTTP API 中的设备令牌：/api/v1/{token}/telemetry
+    - UUID（设备 ID、警报 ID 等）：/api/device/{id}/credentials
+    - 纯数字路径段：{n}
+
+    Args:
+        endpoint: API 端点
+
+    Returns:
+        str: 端点模板
+    """
+    template = _template_cache.get(endpoint)
+    if template is not None:
+        return template
+
+    path = "/" + endpoint.split("?", 1)[0].lstrip("/")
+    path = _DEVICE_API.sub(r"/api/v1/{token}\1", path, count=1)
+
+    segments = []
+    for segment in path.split("/"):
+        if _UUID_SEGMENT.match(segment):
+            segment = "{id}"
+        elif segment.isdigit():
+            segment = "{n}"
+        segments.append(segment)
+    template = "/".join(segments)
+
+    if len(_template_cache) >= _TEMPLATE_CACHE_SIZE:
+        _template_cache.clear()
+    _template_cache[endpoint] = template
+    return template
+
+
+@dataclass
+class RequestEvent:
+    """
+    请求事件
+
+    pre_request 时只有方法、端点和请求字节数；post_response 时包含状态码、响应字节数和耗时；
+    on_error 时包含异常和耗时。
+    """
+    method: str
+    endpoint: str
+    path: str
+    request_bytes: int = 0
+    status: Optional[int] = None
+    response_bytes: int = 0
+    duration: float = 0.0
+    error: Optional[BaseException] = None
+    started_at: float = 0.0
+
+
+class RequestHook:
+    """
+    请求钩子基类
+
+    子类按需覆盖以下方法，通过 client.add_hook() 注册。
+    钩子在发送请求的线程（或协程）中同步调用，应尽量轻量；钩子抛出的异常会被忽略，不影响请求。
+    每次实际发出的 HTTP 请求（包括 429 后的重试）都会触发一次回调。
+    """
+
+    def pre_request(self, event: RequestEvent):
+        """请求发送前调用"""
+
+    def post_response(self, event: RequestEvent):
+        """收到响应后调用（包括 4xx/5xx 响应）"""
+
+    def on_error(self, event: RequestEvent):
+        """请求未能得到响应（连接失败、超时）时调用"""
+
+
+def dispatch_hooks(hooks: List[RequestHook], name: str, event: RequestEvent):
+    """依次调用钩子的 name 方法，忽略钩子抛出的异常"""
+    for hook in hooks:
+        try:
+            getattr(hook, name)(event)
+        except Exception:
+            pass
+
+
+def body_size(body: Any) -> int:
+    """请求体字节数"""
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的延迟直方图
+
+    以微秒为单位记录，数值按 2 的幂分段，每段再线性划分为 2^(significant_bits - 1) 个桶，
+    任意数值的相对误差不超过 2^-(significant_bits - 1)。记录只需一次位运算和一次数组自增。
+    本类不加锁，由 RequestMetrics 统一加锁。
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        """
+        初始化直方图
+
+        Args:
+            significant_bits: 每个数值保留的有效二进制位数，默认 7（相对误差约 1.6%）
+        """
+        self.significant_bits = significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self.reset()
+
+    def reset(self):
+        """清空所有记录"""
+        self._counts: List[int] = [0] * (self._half * 2)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.significant_bits
+        if shift <= 0:
+            return value
+        return shift * self._half + (value >> shift)
+
+    def _upper_bound(self, index: int) -> int:
+        """桶内最大的数值"""
+        if index < self._half * 2:
+            return index
+        shift = index // self._half - 1
+        mantissa = index - shift * self._half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        """
+        记录一个延迟值
+
+        Args:
+            seconds: 延迟（秒）
+        """
+        value = max(int(seconds * 1000000), 0)
+        index = self._index(value)
+        if index >= len(self._counts):
+            self._counts.extend([0] * (index + 1 - len(self._counts)))
+        self._counts[index] += 1
+
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram"):
+        """合并另一个直方图（有效位数必须相同）"""
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("只能合并有效位数相同的直方图")
+        if len(other._counts) > len(self._counts):
+            self._counts.extend([0] * (len(other._counts) - len(self._counts)))
+        for index, count in enumerate(other._counts):
+            self._counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        计算百分位延迟
+
+        Args:
+            percent: 百分位（0 到 100）
+
+        Returns:
+            Optional[float]: 延迟（秒，取桶内最大值，不超过记录的最大值），无记录时返回 None
+        """
+        if self.count == 0:
+            return None
+
+        rank = max(int(self.count * percent / 100.0 + 0.5), 1)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max) / 1000000
+        return self.max / 1000000
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """
+        计算不超过各上界的累计记录数（用于导出 Prometheus 直方图）
+
+        记录按所在桶的上界归入，结果的误差不超过桶的相对误差。
+
+        Args:
+            bounds: 升序排列的上界（秒）
+
+        Returns:
+            List[int]: 与 bounds 对应的累计记录数
+        """
+        result = []
+        index = 0
+        seen = 0
+        for bound in bounds:
+            limit = bound * 1000000
+            while index < len(self._counts) and self._upper_bound(index) <= limit:
+                seen += self._counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        直方图摘要
+
+        Returns:
+            Dict[str, Any]: count、sum、min、mean、max 及 p50、p90、p99、p999（秒）
+        """
+        if self.count == 0:
+            return {"count": 0, "sum": 0.0}
+        return {
+            "count": self.count,
+            "sum": self.total / 1000000,
+            "min": self.min / 1000000,
+            "mean": self.total / self.count / 1000000,
+            "max": self.max / 1000000,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9)
+        }
+
+
+class _EndpointStats:
+    """单个端点模板的统计数据"""
+
+    __slots__ = ("histogram", "statuses", "exceptions", "request_bytes", "response_bytes")
+
+    def __init__(self, significant_bits: int):
+        self.histogram = LatencyHistogram(significant_bits)
+        self.statuses: Dict[int, int] = {}
+        self.exceptions: Dict[str, int] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class RequestMetrics(RequestHook):
+    """
+    内置请求统计钩子
+
+    按 "方法 端点模板"（如 "GET /api/device/{id}"）分组记录延迟直方图、状态码分布、
+    按异常类型统计的错误数和收发字节数。通过 client.enable_metrics() 启用。
+
+    4xx/5xx 响应按客户端随后抛出的异常计数（429 为 RateLimitError，其余为 APIError），
+    连接失败和超时按实际异常类型计数（ConnectionError、TimeoutError）。
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        """
+        初始化请求统计
+
+        Args:
+            significant_bits: 延迟直方图的有效二进制位数
+        """
+        self.significant_bits = significant_bits
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._since = time.time()
+
+    def _stats_for(self, event: RequestEvent) -> _EndpointStats:
+        key = f"{event.method} {event.endpoint}"
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats(self.significant_bits)
+        return stats
+
+    def post_response(self, event: RequestEvent):
+        """记录响应的延迟、状态码和字节数"""
+        with self._lock:
+            stats = self._stats_for(event)
+            stats.histogram.record(event.duration)
+            stats.statuses[event.status] = stats.statuses.get(event.status, 0) + 1
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            if event.status is not None and event.status >= 400:
+                name = "RateLimitError" if event.status == 429 else "APIError"
+                stats.exceptions[name] = stats.exceptions.get(name, 0) + 1
+
+    def on_error(self, event: RequestEvent):
+        """记录连接错误和超时（耗时同样计入延迟直方图）"""
+        with self._lock:
+            stats = self._stats_for(event)
+            stats.histogram.record(event.duration)
+            name = type(event.error).__name__
+            stats.exceptions[name] = stats.exceptions.get(name, 0) + 1
+            stats.request_bytes += event.request_bytes
+
+    def snapshot(self, reset: bool = False, buckets: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+        """
+        获取统计快照
+
+        Args:
+            reset: 获取后是否清空统计（用于按周期上报）
+            buckets: 延迟直方图的导出上界（秒，升序），提供时 latency 中包含 "buckets" 累计计数
+
+        Returns:
+            Dict[str, Any]: {"since": 统计开始时间, "endpoints": {"方法 端点模板": {...}}}
+        """
+        with self._lock:
+            endpoints = {}
+            for key, stats in self._endpoints.items():
+                latency = stats.histogram.snapshot()
+                if buckets is not None:
+                    latency["buckets"] = list(zip(buckets, stats.histogram.cumulative_counts(buckets)))
+                endpoints[key] = {
+                    "latency": latency,
+                    "statuses": dict(stats.statuses),
+                    "errors": sum(stats.exceptions.values()),
+                    "exceptions": dict(stats.exceptions),
+                    "request_bytes": stats.request_bytes,
+                    "response_bytes": stats.response_bytes
+                }
+            snapshot = {"since": self._since, "endpoints": endpoints}
+            if reset:
+                self._endpoints = {}
+                self._since = time.time()
+        return snapshot
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._endpoints = {}
+            self._since = time.time()
+
+    def histogram(self, method: str, endpoint: str) -> Optional[LatencyHistogram]:
+        """
+        获取端点的延迟直方图副本
+
+        Args:
+            method: HTTP 方法
+            endpoint: 端点或端点模板
+
+        Returns:
+            Optional[LatencyHistogram]: 直方图副本，没有记录时返回 None
+        """
+        key = f"{method.upper()} {templatize_endpoint(endpoint)}"
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                return None
+            copy = LatencyHistogram(self.significant_bits)
+            copy.merge(stats.histogram)
+            return copy
+
+    def slowest(self, count: int = 10, percentile: float = 99) -> List[Dict[str, Any]]:
+        """
+        按百分位延迟从高到低列出端点
+
+        Args:
+            count: 返回的端点数量
+            percentile: 排序使用的百分位
+
+        Returns:
+            List[Dict[str, Any]]: [{"endpoint": "方法 端点模板", "latency": 秒, "count": 次数}, ...]
+        """
+        with self._lock:
+            rows = [
+                {"endpoint": key, "latency": stats.histogram.percentile(percentile), "count": stats.histogram.count}
+                for key, stats in self._endpoints.items()
+                if stats.histogram.count
+            ]
+        rows.sort(key=lambda row: row["latency"], reverse=True)
+        return rows[:count]
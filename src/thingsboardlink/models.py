@@ -6,11 +6,18 @@ thingsboardlink 数据模型模块
 """
 
 import time
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 可选依赖
+    np = None
+
 
 class EntityType(Enum):
     """
@@ -216,15 +223,20 @@ class DeviceCredentials:
     credentials_type: str = "ACCESS_TOKEN"
     credentials_id: Optional[str] = None
     credentials_value: Optional[str] = None
+    # 凭证记录 ID，更新凭证时必须提供
+    id: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
-        return {
+        result = {
             "deviceId": {"id": self.device_id, "entityType": "DEVICE"},
             "credentialsType": self.credentials_type,
             "credentialsId": self.credentials_id,
             "credentialsValue": self.credentials_value
         }
+        if self.id:
+            result["id"] = {"id": self.id}
+        return result
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DeviceCredentials':
@@ -237,6 +249,10 @@ class DeviceCredentials:
         credentials_id = data.get("credentialsId")
         credentials_value = data.get("credentialsValue")
 
+        credentials_record_id = data.get("id")
+        if isinstance(credentials_record_id, dict):
+            credentials_record_id = credentials_record_id.get("id")
+
         # 对于 ACCESS_TOKEN 类型，如果 credentialsValue 为空但 credentialsId 有值，
         # 则使用 credentialsId 作为实际的访问令牌
         if credentials_type == "ACCESS_TOKEN" and not credentials_value and credentials_id:
@@ -246,7 +262,8 @@ class DeviceCredentials:
             device_id=device_id,
             credentials_type=credentials_type,
             credentials_id=credentials_id,
-            credentials_value=credentials_value
+            credentials_value=credentials_value,
+            id=credentials_record_id
         )
 
 
@@ -303,6 +320,90 @@ class TelemetryData:
                 for k, v in data.items()]
 
 
+@dataclass
+class BulkTelemetryResult:
+    """
+    批量遥测上传结果
+
+    Attributes:
+        succeeded: 上传成功的设备令牌列表
+        failed: 上传失败的设备令牌及对应异常
+        elapsed: 总耗时（秒）
+    """
+    succeeded: List[str] = field(default_factory=list)
+    failed: Dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def success_count(self) -> int:
+        """成功数量"""
+        return len(self.succeeded)
+
+    @property
+    def failure_count(self) -> int:
+        """失败数量"""
+        return len(self.failed)
+
+    @property
+    def all_succeeded(self) -> bool:
+        """是否全部成功"""
+        return not self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            "succeeded": list(self.succeeded),
+            "failed": {token: str(error) for token, error in self.failed.items()},
+            "elapsed": self.elapsed
+        }
+
+
+@dataclass
+class ChunkedTelemetryResult:
+    """
+    分块遥测上传结果
+
+    Attributes:
+        chunks: 负载数量
+        succeeded: 上传成功的负载序号列表（按发送顺序）
+        failed: 上传失败的负载序号及对应异常
+        failed_entries: 上传失败的负载序号及其遥测条目，可用于重试
+        bytes_sent: 成功上传的请求体字节数
+        elapsed: 总耗时（秒）
+    """
+    chunks: int = 0
+    succeeded: List[int] = field(default_factory=list)
+    failed: Dict[int, Exception] = field(default_factory=dict)
+    failed_entries: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)
+    bytes_sent: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def success_count(self) -> int:
+        """成功数量"""
+        return len(self.succeeded)
+
+    @property
+    def failure_count(self) -> int:
+        """失败数量"""
+        return len(self.failed)
+
+    @property
+    def all_succeeded(self) -> bool:
+        """是否全部成功"""
+        return not self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            "chunks": self.chunks,
+            "succeeded": list(self.succeeded),
+            "failed": {index: str(error) for index, error in self.failed.items()},
+            "bytes_sent": self.bytes_sent,
+            "elapsed": self.elapsed
+        }
+
+
 @dataclass
 class Attribute:
     """
@@ -637,3 +738,264 @@ class TimeseriesData:
     def __getitem__(self, index: int) -> Dict[str, Any]:
         """支持下标操作，直接访问values中的元素"""
         return self.values[index]
+
+    def to_columnar(self, coerce_numeric: bool = True) -> 'ColumnarTimeseriesData':
+        """
+        转换为列式存储的时间序列数据
+
+        Args:
+            coerce_numeric: 是否尝试将字符串值转换为浮点数（REST API 常以字符串返回数值）
+
+        Returns:
+            ColumnarTimeseriesData: 列式时间序列数据
+        """
+        return ColumnarTimeseriesData.from_values(self.key, self.values, coerce_numeric=coerce_numeric)
+
+    def to_numpy(self, coerce_numeric: bool = True):
+        """
+        转换为按时间升序排列的 NumPy 数组
+
+        Args:
+            coerce_numeric: 是否尝试将字符串值转换为浮点数（REST API 常以字符串返回数值）
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (int64 时间戳数组, 值数组)，值全部为数值时为 float64，否则为对象数组
+        """
+        return self.to_columnar(coerce_numeric=coerce_numeric).to_numpy()
+
+    def to_pandas(self, coerce_numeric: bool = True, datetime_index: bool = True):
+        """
+        转换为按时间升序排列的 pandas Series
+
+        Args:
+            coerce_numeric: 是否尝试将字符串值转换为浮点数
+            datetime_index: 是否使用 UTC 时间索引，否则使用毫秒时间戳索引
+
+        Returns:
+            pandas.Series: 以数据键命名、索引名为 ts 的 Series
+        """
+        return self.to_columnar(coerce_numeric=coerce_numeric).to_pandas(datetime_index=datetime_index)
+
+
+@dataclass(eq=False)
+class ColumnarTimeseriesData:
+    """
+    列式时间序列数据模型
+
+    时间戳按升序保存在 int64 数组中，数值型数据保存在 float64 数组中，其他类型保存在对象数组（或列表）中。
+    安装 NumPy 时使用 numpy.ndarray，否则使用标准库 array 模块。
+    范围查询使用二分查找，获取最新值为 O(1)。
+    数组不支持逐元素比较的相等判断，实例按对象标识比较。
+    """
+    key: str
+    timestamps: Any
+    values: Any
+
+    @classmethod
+    def from_values(cls,
+                    key: str,
+                    data: List[Dict[str, Any]],
+                    coerce_numeric: bool = True) -> 'ColumnarTimeseriesData':
+        """
+        从字典列表格式创建列式时间序列数据
+
+        Args:
+            key: 数据键
+            data: 数据点列表 [{"ts": ..., "value": ...}, ...]，顺序不限
+            coerce_numeric: 是否尝试将字符串值转换为浮点数（ThingsBoard REST API 常以字符串返回数值）
+
+        Returns:
+            ColumnarTimeseriesData: 按时间升序排列的列式时间序列数据
+        """
+        points = [point for point in data if point.get("ts") is not None]
+        ts_list = [int(point["ts"]) for point in points]
+        value_list = [point.get("value") for point in points]
+
+        # 数据通常已按时间排列（升序或降序），仅在必要时排序
+        if any(ts_list[i] > ts_list[i + 1] for i in range(len(ts_list) - 1)):
+            if all(ts_list[i] >= ts_list[i + 1] for i in range(len(ts_list) - 1)):
+                ts_list.reverse()
+                value_list.reverse()
+            else:
+                order = sorted(range(len(ts_list)), key=ts_list.__getitem__)
+                ts_list = [ts_list[i] for i in order]
+                value_list = [value_list[i] for i in order]
+
+        numeric_values = cls._as_numeric(value_list, coerce_numeric)
+
+        if np is not None:
+            timestamps = np.array(ts_list, dtype=np.int64)
+            if numeric_values is not None:
+                values = np.array(numeric_values, dtype=np.float64)
+            else:
+                values = np.empty(len(value_list), dtype=object)
+                values[:] = value_list
+        else:
+            timestamps = array("q", ts_list)
+            values = array("d", numeric_values) if numeric_values is not None else value_list
+
+        return cls(key=key, timestamps=timestamps, values=values)
+
+    @classmethod
+    def from_timeseries_data(cls,
+                             data: TimeseriesData,
+                             coerce_numeric: bool = True) -> 'ColumnarTimeseriesData':
+        """从 TimeseriesData 创建列式时间序列数据"""
+        return cls.from_values(data.key, data.values, coerce_numeric=coerce_numeric)
+
+    @staticmethod
+    def _as_numeric(values: List[Any], coerce_numeric: bool) -> Optional[List[float]]:
+        """全部为数值（不含布尔值）时返回浮点数列表，否则返回 None"""
+        result = []
+        for value in values:
+            if isinstance(value, bool):
+                return None
+            if isinstance(value, (int, float)):
+                result.append(float(value))
+            elif coerce_numeric and isinstance(value, str):
+                try:
+                    result.append(float(value))
+                except ValueError:
+                    return None
+            else:
+                return None
+        return result
+
+    @property
+    def backend(self) -> str:
+        """存储后端名称（numpy 或 array）"""
+        return "numpy" if np is not None and isinstance(self.timestamps, np.ndarray) else "array"
+
+    @property
+    def is_numeric(self) -> bool:
+        """值是否以 float64 数组存储"""
+        if np is not None and isinstance(self.values, np.ndarray):
+            return self.values.dtype != object
+        return isinstance(self.values, array)
+
+    def get_latest_value(self) -> Optional[Any]:
+        """获取最新值（O(1)）"""
+        if len(self.timestamps) == 0:
+            return None
+        return self._item(self.values[-1])
+
+    def get_latest_ts(self) -> Optional[int]:
+        """获取最新时间戳（O(1)）"""
+        if len(self.timestamps) == 0:
+            return None
+        return int(self.timestamps[-1])
+
+    def _range_bounds(self, start_ts: int, end_ts: int):
+        """使用二分查找计算 [start_ts, end_ts] 对应的下标范围"""
+        if np is not None and isinstance(self.timestamps, np.ndarray):
+            left = int(np.searchsorted(self.timestamps, start_ts, side="left"))
+            right = int(np.searchsorted(self.timestamps, end_ts, side="right"))
+        else:
+            left = bisect_left(self.timestamps, start_ts)
+            right = bisect_right(self.timestamps, end_ts)
+        return left, max(left, right)
+
+    def slice_range(self, start_ts: int, end_ts: int) -> 'ColumnarTimeseriesData':
+        """
+        获取指定时间范围内的数据（闭区间）
+
+        NumPy 后端返回共享底层内存的视图，不复制数据。
+
+        Args:
+            start_ts: 开始时间戳（毫秒）
+            end_ts: 结束时间戳（毫秒）
+
+        Returns:
+            ColumnarTimeseriesData: 指定范围内的列式时间序列数据
+        """
+        left, right = self._range_bounds(start_ts, end_ts)
+        return ColumnarTimeseriesData(
+            key=self.key,
+            timestamps=self.timestamps[left:right],
+            values=self.values[left:right]
+        )
+
+    def get_values_in_range(self, start_ts: int, end_ts: int) -> List[Dict[str, Any]]:
+        """获取指定时间范围内的值（字典列表格式，与 TimeseriesData 一致）"""
+        return self.slice_range(start_ts, end_ts).to_values()
+
+    @staticmethod
+    def _item(value: Any) -> Any:
+        """将 NumPy 标量转换为 Python 原生类型"""
+        return value.item() if np is not None and isinstance(value, np.generic) else value
+
+    def to_values(self) -> List[Dict[str, Any]]:
+        """转换为字典列表格式 [{"ts": ..., "value": ...}, ...]"""
+        if np is not None and isinstance(self.timestamps, np.ndarray):
+            timestamps = self.timestamps.tolist()
+            values = self.values.tolist()
+        else:
+            timestamps = self.timestamps
+            values = self.values
+        return [{"ts": ts, "value": value} for ts, value in zip(timestamps, values)]
+
+    def to_timeseries_data(self) -> TimeseriesData:
+        """转换为 TimeseriesData"""
+        return TimeseriesData(key=self.key, values=self.to_values())
+
+    def to_numpy(self):
+        """
+        转换为 NumPy 数组（NumPy 后端不复制数据）
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (int64 时间戳数组, 值数组)
+
+        Raises:
+            ConfigurationError: 未安装 numpy 时抛出
+        """
+        from .frames import _require_numpy
+
+        numpy = _require_numpy()
+        timestamps = numpy.asarray(self.timestamps, dtype=numpy.int64)
+        if self.is_numeric:
+            values = numpy.asarray(self.values, dtype=numpy.float64)
+        else:
+            values = numpy.empty(len(self.values), dtype=object)
+            values[:] = list(self.values)
+        return timestamps, values
+
+    def to_pandas(self, datetime_index: bool = True):
+        """
+        转换为 pandas Series
+
+        Args:
+            datetime_index: 是否使用 UTC 时间索引，否则使用毫秒时间戳索引
+
+        Returns:
+            pandas.Series: 以数据键命名、索引名为 ts 的 Series
+
+        Raises:
+            ConfigurationError: 未安装 numpy 或 pandas 时抛出
+        """
+        from .frames import _require_pandas
+
+        pd = _require_pandas()
+        timestamps, values = self.to_numpy()
+        if datetime_index:
+            index = pd.to_datetime(timestamps, unit="ms", utc=True)
+        else:
+            index = pd.Index(timestamps)
+        index.name = "ts"
+        return pd.Series(values, index=index, name=self.key)
+
+    @property
+    def nbytes(self) -> int:
+        """时间戳和数值数组占用的字节数（对象数组只计算引用）"""
+        if np is not None and isinstance(self.timestamps, np.ndarray):
+            return int(self.timestamps.nbytes + self.values.nbytes)
+        values_bytes = (self.values.itemsize * len(self.values)
+                        if isinstance(self.values, array) else 8 * len(self.values))
+        return self.timestamps.itemsize * len(self.timestamps) + values_bytes
+
+    def __len__(self) -> int:
+        """支持len()函数，返回数据点数量"""
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """支持下标操作，返回字典格式的数据点"""
+        return {"ts": int(self.timestamps[index]), "value": self._item(self.values[index])}
@@ -0,0 +1,358 @@
+"""
+thingsboardlink 客户端限流模块
+
+本模块提供客户端侧的令牌桶限流器，使批量任务的请求速率保持在 ThingsBoard 服务器的限制之内，
+避免请求被服务器以 429 拒绝后再重试造成的浪费。
+
+限制使用与 ThingsBoard 租户配置相同的格式，如 "100:1,2000:60" 表示每秒最多 100 次、
+每分钟最多 2000 次。租户 API（JWT 认证）共用一组令牌桶，每个设备令牌（设备 HTTP API）各用一组。
+"""
+import email.utils
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .exceptions import RateLimitError, ValidationError
+
+# 设备 HTTP API 端点：api/v1/{设备令牌}/...
+_DEVICE_ENDPOINT = re.compile(r"^/?api/v1/([^/]+)/")
+
+TENANT_SCOPE = "tenant"
+DEVICE_SCOPE = "device"
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 响应头的值，可以是秒数或 HTTP 日期
+        now: 当前时间戳（秒），为空时使用 time.time()
+
+    Returns:
+        Optional[float]: 需要等待的秒数（不小于 0），无法解析时返回 None
+    """
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        return None
+    return max(parsed.timestamp() - (time.time() if now is None else now), 0.0)
+
+
+def parse_rate_limits(limits: Union[str, List[Tuple[int, float]], None]) -> List[Tuple[int, float]]:
+    """
+    解析限流配置
+
+    Args:
+        limits: "容量:秒数" 以逗号分隔的字符串（ThingsBoard 格式，如 "100:1,2000:60"），
+                或 [(容量, 秒数), ...] 列表
+
+    Returns:
+        List[Tuple[int, float]]: [(容量, 秒数), ...]
+
+    Raises:
+        ValidationError: 格式不正确时抛出
+    """
+    if not limits:
+        return []
+
+    if isinstance(limits, str):
+        items = []
+        for part in limits.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            capacity, separator, period = part.partition(":")
+            if not separator:
+                raise ValidationError(
+                    field_name="limits",
+                    expected_type="容量:秒数",
+                    actual_value=limits,
+                    message="限流配置格式不正确，应为 \"容量:秒数\"，多个限制以逗号分隔"
+                )
+            try:
+                items.append((int(capacity), float(period)))
+            except ValueError:
+                raise ValidationError(
+                    field_name="limits",
+                    expected_type="容量:秒数",
+                    actual_value=limits,
+                    message="限流配置中的容量和秒数必须是数字"
+                )
+    else:
+        items = [(int(capacity), float(period)) for capacity, period in limits]
+
+    for capacity, period in items:
+        if capacity <= 0 or period <= 0:
+            raise ValidationError(
+                field_name="limits",
+                expected_type="正数",
+                actual_value=limits,
+                message="限流配置中的容量和秒数必须大于 0"
+            )
+    return items
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    容量为 capacity，每 period 秒补充 capacity 个令牌。
+    reserve() 允许令牌数为负（预约未来的令牌），调用方按返回的等待时间排队，
+    从而使多个线程按预约顺序依次发送。本类不加锁，由 RateLimiter 统一加锁。
+    """
+
+    __slots__ = ("capacity", "period", "rate", "_tokens", "_updated_at")
+
+    def __init__(self, capacity: int, period: float, now: Optional[float] = None):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        if now > self._updated_at:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """预约一个令牌需要等待的时间（秒）"""
+        self._refill(now)
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self, now: float):
+        """预约一个令牌"""
+        self._refill(now)
+        self._tokens -= 1
+
+    def drain(self, now: float, seconds: float):
+        """清空令牌，使下一个令牌在 seconds 秒后才可用（服务器返回 429 时调用）"""
+        self._refill(now)
+        self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+    @property
+    def tokens(self) -> float:
+        """当前令牌数（可能为负）"""
+        return self._tokens
+
+
+class RateLimiter:
+    """
+    客户端限流器
+
+    为租户 API 和每个设备令牌分别维护一组令牌桶：
+
+    - mode="block"：令牌不足时阻塞等待，多个线程按预约顺序排队；
+      需要等待的时间超过 max_wait 时抛出 RateLimitError；
+    - mode="raise"：令牌不足时立即抛出 RateLimitError，retry_after 为需要等待的秒数。
+
+    服务器返回 429 时调用 penalize()，在 Retry-After 期间暂停对应范围的请求。
+    限流器是线程安全的，可以在多个客户端之间共享。
+    """
+
+    MODES = ("block", "raise")
+
+    def __init__(self,
+                 tenant_limits: Union[str, List[Tuple[int, float]], None] = None,
+                 device_limits: Union[str, List[Tuple[int, float]], None] = None,
+                 mode: str = "block",
+                 max_wait: Optional[float] = None,
+                 max_devices: int = 10000):
+        """
+        初始化限流器
+
+        Args:
+            tenant_limits: 租户 API 的限制，如 "100:1,2000:60"，为空时不限制
+            device_limits: 每个设备令牌的限制，为空时不限制
+            mode: 令牌不足时的处理方式（block 或 raise）
+            max_wait: block 模式下的最长等待时间（秒），为空时不限制
+            max_devices: 记录的设备令牌数量上限，超过时淘汰最久未使用的令牌桶
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if mode not in self.MODES:
+            raise ValidationError(
+                field_name="mode",
+                expected_type="block 或 raise",
+                actual_value=mode,
+                message="限流模式必须是 block 或 raise"
+            )
+
+        if max_wait is not None and max_wait < 0:
+            raise ValidationError(
+                field_name="max_wait",
+                expected_type="非负数",
+                actual_value=max_wait,
+                message="最长等待时间不能为负数"
+            )
+
+        if max_devices <= 0:
+            raise ValidationError(
+                field_name="max_devices",
+                expected_type="正整数",
+                actual_value=max_devices,
+                message="设备令牌数量上限必须大于 0"
+            )
+
+        self.tenant_limits = parse_rate_limits(tenant_limits)
+        self.device_limits = parse_rate_limits(device_limits)
+        self.mode = mode
+        self.max_wait = max_wait
+        self.max_devices = max_devices
+
+        self._lock = threading.Lock()
+        self._tenant_buckets = self._create_buckets(self.tenant_limits)
+        self._device_buckets: "OrderedDict[str, List[TokenBucket]]" = OrderedDict()
+
+        # 统计信息
+        self._acquired = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+        self._rejected = 0
+        self._throttled = 0
+
+    @staticmethod
+    def _create_buckets(limits: List[Tuple[int, float]]) -> List[TokenBucket]:
+        now = time.monotonic()
+        return [TokenBucket(capacity, period, now) for capacity, period in limits]
+
+    @staticmethod
+    def scope_for(endpoint: str, require_auth: bool = True) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        确定请求所属的限流范围
+
+        Args:
+            endpoint: API 端点
+            require_auth: 请求是否使用 JWT 认证
+
+        Returns:
+            Optional[Tuple[str, Optional[str]]]: 设备 API 返回 ("device", 设备令牌)，
+            租户 API 返回 ("tenant", None)，登录等无需认证的请求返回 None
+        """
+        match = _DEVICE_ENDPOINT.match(endpoint)
+        if match:
+            return DEVICE_SCOPE, match.group(1)
+        if require_auth:
+            return TENANT_SCOPE, None
+        return None
+
+    def _buckets(self, device_token: Optional[str]) -> List[TokenBucket]:
+        """获取令牌桶（调用方需持有锁）"""
+        if device_token is None:
+            return self._tenant_buckets
+        if not self.device_limits:
+            return []
+
+        buckets = self._device_buckets.get(device_token)
+        if buckets is None:
+            buckets = self._create_buckets(self.device_limits)
+            self._device_buckets[device_token] = buckets
+            while len(self._device_buckets) > self.max_devices:
+                self._device_buckets.popitem(last=False)
+        else:
+            self._device_buckets.move_to_end(device_token)
+        return buckets
+
+    def reserve(self, device_token: Optional[str] = None) -> float:
+        """
+        预约一次请求，返回发送前需要等待的时间（不阻塞）
+
+        Args:
+            device_token: 设备令牌，为空时使用租户范围
+
+        Returns:
+            float: 需要等待的秒数
+
+        Raises:
+            RateLimitError: raise 模式下令牌不足，或等待时间超过 max_wait 时抛出
+        """
+        with self._lock:
+            now = time.monotonic()
+            buckets = self._buckets(device_token)
+            wait = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+
+            if wait > 0 and (self.mode == "raise" or (self.max_wait is not None and wait > self.max_wait)):
+                self._rejected += 1
+                scope = TENANT_SCOPE if device_token is None else DEVICE_SCOPE
+                raise RateLimitError(
+                    message=f"客户端限流：{scope} 范围的请求速率超限，需等待 {wait:.3f} 秒",
+                    retry_after=wait,
+                    limit_type=scope
+                )
+
+            for bucket in buckets:
+                bucket.take(now)
+
+            self._acquired += 1
+            if wait > 0:
+                self._delayed += 1
+                self._total_wait += wait
+            return wait
+
+    def acquire(self, device_token: Optional[str] = None) -> float:
+        """
+        获取一次请求的许可，令牌不足时阻塞等待
+
+        Args:
+            device_token: 设备令牌，为空时使用租户范围
+
+        Returns:
+            float: 实际等待的秒数
+
+        Raises:
+            RateLimitError: raise 模式下令牌不足，或等待时间超过 max_wait 时抛出
+        """
+        wait = self.reserve(device_token)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, device_token: Optional[str] = None, retry_after: Optional[float] = None):
+        """
+        服务器返回 429 后暂停对应范围的请求
+
+        Args:
+            device_token: 设备令牌，为空时为租户范围
+            retry_after: 服务器要求的等待时间（秒），为空时按一个补充周期计算
+        """
+        with self._lock:
+            self._throttled += 1
+            now = time.monotonic()
+            for bucket in self._buckets(device_token):
+                bucket.drain(now, retry_after if retry_after is not None else 1 / bucket.rate)
+
+    def reset(self):
+        """重置所有令牌桶"""
+        with self._lock:
+            self._tenant_buckets = self._create_buckets(self.tenant_limits)
+            self._device_buckets.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """限流统计信息"""
+        with self._lock:
+            return {
+                "acquired": self._acquired,
+                "delayed": self._delayed,
+                "total_wait": self._total_wait,
+                "rejected": self._rejected,
+                "throttled_responses": self._throttled,
+                "device_buckets": len(self._device_buckets)
+            }
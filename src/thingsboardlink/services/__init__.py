@@ -11,6 +11,13 @@ from .attribute_service import AttributeService
 from .alarm_service import AlarmService
 from .rpc_service import RpcService
 from .relation_service import RelationService
+from .telemetry_batcher import TelemetryBatcher
+from .timeseries_fetcher import TimeseriesFetcher, TimeseriesFetchResult
+from .telemetry_outbox import TelemetryOutbox
+from .mqtt_transport import MqttGatewayPublisher, MqttDevicePublisher
+from .deadband_filter import DeadbandFilter
+from .timeseries_cache import TimeseriesCache
+from .concurrency import ConcurrencyController, AsyncConcurrencyController
 
 __all__ = [
     "DeviceService",
@@ -18,5 +25,15 @@ __all__ = [
     "AttributeService",
     "AlarmService",
     "RpcService",
-    'RelationService'
+    'RelationService',
+    "TelemetryBatcher",
+    "TimeseriesFetcher",
+    "TimeseriesFetchResult",
+    "TelemetryOutbox",
+    "MqttGatewayPublisher",
+    "MqttDevicePublisher",
+    "DeadbandFilter",
+    "TimeseriesCache",
+    "ConcurrencyController",
+    "AsyncConcurrencyController"
 ]
@@ -9,8 +9,10 @@ from typing import List, Optional, Dict, Any
 
 from ..models import Alarm, AlarmSeverity, AlarmStatus, PageData
 from ..exceptions import ValidationError, AlarmError, NotFoundError
+from ..tracing import trace_service
 
 
+@trace_service
 class AlarmService:
     """
     警报服务类
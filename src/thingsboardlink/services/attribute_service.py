@@ -9,8 +9,10 @@ from typing import List, Optional, Dict, Any, Union
 
 from ..models import Attribute, AttributeScope
 from ..exceptions import ValidationError, NotFoundError, APIError
+from ..tracing import trace_service
 
 
+@trace_service
 class AttributeService:
     """
     属性服务类
@@ -0,0 +1,374 @@
+"""
+thingsboardlink 自适应并发控制模块
+
+本模块提供基于 AIMD（加性增、乘性减）的并发控制器，用于批量和并行 API：
+
+- 请求成功且延迟正常时，并发上限按 increase / limit 缓慢增加（每完成约 limit 个请求增加 increase）；
+- 服务器返回 429、5xx、请求超时或延迟明显高于基线时，并发上限乘以 decrease_factor；
+  同一时刻发出的一批请求只触发一次下调。
+
+等待中的请求按到达顺序（FIFO）获得许可，并发上限下调时先到的请求不会被后到的请求插队。
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ..exceptions import ValidationError, APIError, RateLimitError, TimeoutError
+
+
+def is_overload_error(error: Optional[BaseException]) -> bool:
+    """
+    判断错误是否表示服务器过载（沿异常的 __cause__ 链查找，未显式链接时沿 __context__ 查找）
+
+    Args:
+        error: 请求抛出的异常
+
+    Returns:
+        bool: 429、5xx 或请求超时时返回 True
+    """
+    while error is not None:
+        if isinstance(error, (RateLimitError, TimeoutError)):
+            return True
+        if isinstance(error, APIError) and error.status_code is not None and error.status_code >= 500:
+            return True
+        if error.__cause__ is not None:
+            error = error.__cause__
+        elif not error.__suppress_context__:
+            error = error.__context__
+        else:
+            error = None
+    return False
+
+
+class _AimdLimit:
+    """AIMD 并发上限的状态和调整逻辑（不含等待，由子类加锁）"""
+
+    def __init__(self,
+                 initial_limit: int = 4,
+                 min_limit: int = 1,
+                 max_limit: int = 64,
+                 increase: float = 1.0,
+                 decrease_factor: float = 0.5,
+                 latency_tolerance: float = 2.0,
+                 min_baseline_latency: float = 0.01,
+                 metrics_window: float = 10.0):
+        """
+        初始化并发控制器
+
+        Args:
+            initial_limit: 初始并发上限
+            min_limit: 最小并发上限
+            max_limit: 最大并发上限
+            increase: 每轮（约 limit 个成功请求）增加的并发数
+            decrease_factor: 检测到过载时并发上限的乘数（0 到 1 之间）
+            latency_tolerance: 平均延迟超过基线延迟的该倍数时视为过载
+            min_baseline_latency: 判断延迟过载时基线延迟的下限（秒），避免极低延迟下的抖动触发下调
+            metrics_window: 吞吐量统计的时间窗口（秒）
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if min_limit <= 0:
+            raise ValidationError(
+                field_name="min_limit",
+                expected_type="正整数",
+                actual_value=min_limit,
+                message="最小并发上限必须大于 0"
+            )
+
+        if max_limit < min_limit:
+            raise ValidationError(
+                field_name="max_limit",
+                expected_type=f"不小于 {min_limit} 的整数",
+                actual_value=max_limit,
+                message="最大并发上限不能小于最小并发上限"
+            )
+
+        if not min_limit <= initial_limit <= max_limit:
+            raise ValidationError(
+                field_name="initial_limit",
+                expected_type=f"{min_limit} 到 {max_limit} 之间的整数",
+                actual_value=initial_limit,
+                message="初始并发上限必须在最小和最大并发上限之间"
+            )
+
+        if increase <= 0:
+            raise ValidationError(
+                field_name="increase",
+                expected_type="正数",
+                actual_value=increase,
+                message="并发增量必须大于 0"
+            )
+
+        if not 0 < decrease_factor < 1:
+            raise ValidationError(
+                field_name="decrease_factor",
+                expected_type="0 到 1 之间的数",
+                actual_value=decrease_factor,
+                message="并发下调系数必须在 0 到 1 之间"
+            )
+
+        if latency_tolerance <= 1:
+            raise ValidationError(
+                field_name="latency_tolerance",
+                expected_type="大于 1 的数",
+                actual_value=latency_tolerance,
+                message="延迟容忍倍数必须大于 1"
+            )
+
+        if metrics_window <= 0:
+            raise ValidationError(
+                field_name="metrics_window",
+                expected_type="正数",
+                actual_value=metrics_window,
+                message="统计窗口必须大于 0"
+            )
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.min_baseline_latency = min_baseline_latency
+        self.metrics_window = metrics_window
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+        # 等待许可的请求（按到达顺序）
+        self._waiters: Deque[object] = deque()
+
+        # 延迟：基线为无负载延迟的估计（跟随最小值，缓慢上浮），平均延迟为指数加权平均
+        self._baseline_latency: Optional[float] = None
+        self._latency: Optional[float] = None
+        self._last_decrease_at = float("-inf")
+
+        # 统计信息
+        self._completed = 0
+        self._failed = 0
+        self._overloads = 0
+        self._increases = 0
+        self._decreases = 0
+        self._completions: Deque[float] = deque()
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return max(self.min_limit, int(self._limit))
+
+    def _can_start(self, ticket: object) -> bool:
+        return self._in_flight < self.limit and self._waiters[0] is ticket
+
+    def _start(self) -> float:
+        self._in_flight += 1
+        if self._in_flight > self._peak_in_flight:
+            self._peak_in_flight = self._in_flight
+        return time.monotonic()
+
+    def _finish(self, started: float, error: Optional[BaseException]):
+        """记录请求结果并调整并发上限"""
+        now = time.monotonic()
+        latency = now - started
+        saturated = self._in_flight * 2 >= self._limit
+        self._in_flight -= 1
+
+        overloaded = False
+        if error is None:
+            self._completed += 1
+            self._completions.append(now)
+
+            if self._baseline_latency is None or latency < self._baseline_latency:
+                self._baseline_latency = latency
+            else:
+                # 服务器持续变慢时基线缓慢跟随，避免并发上限永久停留在最小值
+                self._baseline_latency += (latency - self._baseline_latency) * 0.01
+
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            baseline = max(self._baseline_latency, self.min_baseline_latency)
+            overloaded = self._latency > baseline * self.latency_tolerance
+        else:
+            self._failed += 1
+            if is_overload_error(error):
+                self._overloads += 1
+                overloaded = True
+
+        if overloaded:
+            # 下调之前发出的请求反映的是下调前的负载，不再重复下调
+            if started >= self._last_decrease_at:
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                self._last_decrease_at = now
+                self._latency = None
+                self._decreases += 1
+        elif error is None and saturated:
+            # 只有并发上限被实际用满时才增加，避免空闲时上限无限增长
+            previous = self.limit
+            self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+            if self.limit > previous:
+                self._increases += 1
+
+    def _throughput(self) -> float:
+        now = time.monotonic()
+        while self._completions and self._completions[0] < now - self.metrics_window:
+            self._completions.popleft()
+        return len(self._completions) / self.metrics_window
+
+    def _stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "waiting": len(self._waiters),
+            "completed": self._completed,
+            "failed": self._failed,
+            "overloads": self._overloads,
+            "increases": self._increases,
+            "decreases": self._decreases,
+            "throughput": self._throughput(),
+            "latency": self._latency,
+            "baseline_latency": self._baseline_latency
+        }
+
+
+class ConcurrencyController(_AimdLimit):
+    """
+    自适应并发控制器（线程版本）
+
+    用法：
+        with controller.slot():
+            client.post(...)
+
+    启用后由 TelemetryService 的批量上传、拆分上传和分段获取共享，
+    线程池大小（max_workers、max_in_flight）只作为上限，实际在途请求数由控制器决定。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        获取一个并发许可，达到并发上限时按到达顺序等待
+
+        Args:
+            timeout: 最长等待时间（秒），为空时一直等待
+
+        Returns:
+            float: 许可的开始时间，需传给 release()
+
+        Raises:
+            TimeoutError: 等待超时时抛出
+        """
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                if not self._cond.wait_for(lambda: self._can_start(ticket), timeout):
+                    raise TimeoutError(
+                        message="等待并发许可超时",
+                        timeout_seconds=timeout,
+                        operation="ConcurrencyController.acquire"
+                    )
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+            return self._start()
+
+    def release(self, started: float, error: Optional[BaseException] = None):
+        """
+        归还并发许可并记录请求结果
+
+        Args:
+            started: acquire() 返回的开始时间
+            error: 请求抛出的异常，成功时为空
+        """
+        with self._cond:
+            self._finish(started, error)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """在并发许可内执行请求的上下文管理器"""
+        started = self.acquire()
+        try:
+            yield
+        except BaseException as e:
+            self.release(started, e)
+            raise
+        self.release(started)
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """在并发许可内调用 func"""
+        with self.slot():
+            return func(*args, **kwargs)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """并发上限、在途请求数、吞吐量（请求/秒）和延迟统计"""
+        with self._cond:
+            return self._stats()
+
+
+class AsyncConcurrencyController(_AimdLimit):
+    """
+    自适应并发控制器（asyncio 版本）
+
+    用法：
+        async with controller.slot():
+            await client.post(...)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # asyncio.Condition 需在事件循环中创建，首次使用时延迟初始化
+        self._cond: Optional[asyncio.Condition] = None
+
+    def _get_cond(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self) -> float:
+        """获取一个并发许可，达到并发上限时按到达顺序等待，返回需传给 release() 的开始时间"""
+        cond = self._get_cond()
+        ticket = object()
+        async with cond:
+            self._waiters.append(ticket)
+            try:
+                await cond.wait_for(lambda: self._can_start(ticket))
+            finally:
+                self._waiters.remove(ticket)
+                cond.notify_all()
+            return self._start()
+
+    async def release(self, started: float, error: Optional[BaseException] = None):
+        """归还并发许可并记录请求结果"""
+        cond = self._get_cond()
+        async with cond:
+            self._finish(started, error)
+            cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """在并发许可内执行请求的异步上下文管理器"""
+        started = await self.acquire()
+        try:
+            yield
+        except BaseException as e:
+            await self.release(started, e)
+            raise
+        await self.release(started)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """在并发许可内等待协程函数 func"""
+        async with self.slot():
+            return await func(*args, **kwargs)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """并发上限、在途请求数、吞吐量（请求/秒）和延迟统计"""
+        return self._stats()
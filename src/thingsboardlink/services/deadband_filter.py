@@ -0,0 +1,217 @@
+"""
+thingsboardlink 遥测死区过滤模块
+
+本模块提供按例外报告（report-by-exception）的遥测数据过滤功能。
+过滤器记录每个设备每个键最后一次发送的值，变化量未超过死区阈值的数据点不再上传，
+同时按心跳间隔强制发送，保证服务器端的数据不会长时间不更新。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from ..exceptions import ValidationError
+
+
+class DeadbandFilter:
+    """
+    遥测死区过滤器
+
+    对每个 (设备, 键) 的数据点按时间戳顺序判断是否需要发送：
+
+    - 该键没有发送记录时发送；
+    - 数值（不含布尔值）与上次发送值之差超过 absolute，或超过上次发送值绝对值的 relative 倍时发送；
+    - 非数值与上次发送值不相等时发送；
+    - 距上次发送的时间（按数据点时间戳计算）达到 heartbeat 秒时强制发送。
+
+    absolute 和 relative 均未设置时，只过滤与上次发送值完全相同的数据点。
+    过滤器是线程安全的，可以在多个上传线程之间共享。
+    """
+
+    def __init__(self,
+                 absolute: Optional[float] = None,
+                 relative: Optional[float] = None,
+                 heartbeat: Optional[float] = None,
+                 key_thresholds: Optional[Dict[str, Dict[str, float]]] = None,
+                 max_series: int = 100000):
+        """
+        初始化死区过滤器
+
+        Args:
+            absolute: 绝对死区，变化量必须大于该值才发送
+            relative: 相对死区（如 0.01 表示 1%），变化量必须大于上次发送值绝对值的该倍数才发送
+            heartbeat: 心跳间隔（秒），距上次发送达到该时间时无论是否变化都发送，为空时不强制发送
+            key_thresholds: 按键覆盖的阈值，如 {"temperature": {"absolute": 0.5}}
+            max_series: 记录的 (设备, 键) 数量上限，超过时淘汰最久未发送的记录（其下一个数据点将被发送）
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        self._validate_threshold("absolute", absolute)
+        self._validate_threshold("relative", relative)
+
+        if heartbeat is not None and heartbeat <= 0:
+            raise ValidationError(
+                field_name="heartbeat",
+                expected_type="正数",
+                actual_value=heartbeat,
+                message="心跳间隔必须大于 0"
+            )
+
+        if max_series <= 0:
+            raise ValidationError(
+                field_name="max_series",
+                expected_type="正整数",
+                actual_value=max_series,
+                message="记录数量上限必须大于 0"
+            )
+
+        self.absolute = absolute
+        self.relative = relative
+        self.heartbeat = heartbeat
+        self.max_series = max_series
+
+        self._key_thresholds: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        for key, thresholds in (key_thresholds or {}).items():
+            self.set_key_threshold(key, **thresholds)
+
+        # 最后一次发送的值 {(设备, 键): (值, 时间戳)}，按最近发送时间排列
+        self._last_sent: "OrderedDict[Tuple[Hashable, str], Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self._passed_points = 0
+        self._dropped_points = 0
+        self._heartbeat_points = 0
+
+    @staticmethod
+    def _validate_threshold(name: str, value: Optional[float]):
+        if value is not None and value < 0:
+            raise ValidationError(
+                field_name=name,
+                expected_type="非负数",
+                actual_value=value,
+                message="死区阈值不能为负数"
+            )
+
+    def set_key_threshold(self, key: str, absolute: Optional[float] = None, relative: Optional[float] = None):
+        """
+        设置指定键的死区阈值（覆盖默认阈值）
+
+        Args:
+            key: 数据键
+            absolute: 绝对死区
+            relative: 相对死区
+        """
+        self._validate_threshold("absolute", absolute)
+        self._validate_threshold("relative", relative)
+        self._key_thresholds[key] = (absolute, relative)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """过滤统计信息"""
+        with self._lock:
+            total = self._passed_points + self._dropped_points
+            return {
+                "series": len(self._last_sent),
+                "passed_points": self._passed_points,
+                "dropped_points": self._dropped_points,
+                "heartbeat_points": self._heartbeat_points,
+                "drop_ratio": self._dropped_points / total if total else 0.0
+            }
+
+    def _changed(self, key: str, value: Any, last_value: Any) -> bool:
+        """判断数据点相对上次发送值的变化是否超出死区"""
+        numeric = (isinstance(value, (int, float)) and not isinstance(value, bool) and
+                   isinstance(last_value, (int, float)) and not isinstance(last_value, bool))
+        if not numeric:
+            return value != last_value
+
+        absolute, relative = self._key_thresholds.get(key, (self.absolute, self.relative))
+        delta = abs(value - last_value)
+
+        if delta != delta:
+            # NaN 与任何值都不相等，只有前后都是 NaN 时视为未变化
+            return not (value != value and last_value != last_value)
+
+        if absolute is None and relative is None:
+            return delta != 0
+        if absolute is not None and delta > absolute:
+            return True
+        if relative is not None and delta > relative * abs(last_value):
+            return True
+        return False
+
+    def filter_entries(self, series_id: Hashable, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        过滤按时间戳分组的遥测条目
+
+        保留的数据点被记为已发送；若随后上传失败，应调用 forget() 使这些键的下一个数据点重新发送。
+
+        Args:
+            series_id: 设备标识（设备令牌、设备名称等）
+            entries: [{"ts": ts, "values": {...}}, ...] 格式的条目列表
+
+        Returns:
+            List[Dict[str, Any]]: 过滤后的条目列表（按时间戳升序，不含空条目）
+        """
+        heartbeat_ms = self.heartbeat * 1000 if self.heartbeat is not None else None
+        result = []
+
+        with self._lock:
+            for entry in sorted(entries, key=lambda item: item["ts"]):
+                ts = entry["ts"]
+                values = {}
+
+                for key, value in entry["values"].items():
+                    series_key = (series_id, key)
+                    last = self._last_sent.get(series_key)
+
+                    if last is None or self._changed(key, value, last[0]):
+                        pass
+                    elif heartbeat_ms is not None and ts - last[1] >= heartbeat_ms:
+                        self._heartbeat_points += 1
+                    else:
+                        self._dropped_points += 1
+                        continue
+
+                    values[key] = value
+                    self._passed_points += 1
+                    self._last_sent[series_key] = (value, ts)
+                    self._last_sent.move_to_end(series_key)
+
+                if values:
+                    result.append({"ts": ts, "values": values})
+
+            while len(self._last_sent) > self.max_series:
+                self._last_sent.popitem(last=False)
+
+        return result
+
+    def forget(self, series_id: Hashable, keys: Optional[Iterable[str]] = None):
+        """
+        清除发送记录，使对应键的下一个数据点一定被发送
+
+        Args:
+            series_id: 设备标识
+            keys: 数据键，为空时清除该设备的所有记录
+        """
+        with self._lock:
+            if keys is None:
+                for series_key in [k for k in self._last_sent if k[0] == series_id]:
+                    del self._last_sent[series_key]
+            else:
+                for key in keys:
+                    self._last_sent.pop((series_id, key), None)
+
+    def forget_entries(self, series_id: Hashable, entries: List[Dict[str, Any]]):
+        """清除条目中所有键的发送记录（上传失败时调用）"""
+        keys = set()
+        for entry in entries:
+            keys.update(entry["values"])
+        self.forget(series_id, keys)
+
+    def clear(self):
+        """清除所有发送记录"""
+        with self._lock:
+            self._last_sent.clear()
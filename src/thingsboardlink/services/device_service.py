@@ -4,18 +4,23 @@ thingsboardlink 设备服务模块
 本模块提供设备管理相关的 API 调用功能。
 包括设备的创建、查询、更新、删除以及凭证管理等操作。
 """
+from dataclasses import replace
 from typing import List, Optional, Dict, Any
 
+from ..cache import TTLCache, CacheStats
 from ..models import Device, DeviceCredentials, PageData
 from ..exceptions import NotFoundError, DeviceError, ValidationError
+from ..tracing import trace_service
 
 
+@trace_service
 class DeviceService:
     """
     设备服务类
 
     提供设备管理相关的所有操作。
     包括 CRUD 操作、凭证管理和批量查询等功能。
+    设备凭证会缓存在本地，以减少遥测上传时重复的凭证查询。
     """
 
     def __init__(self, client):
@@ -27,6 +32,13 @@ class DeviceService:
         """
         self.client = client
 
+        # 设备凭证缓存，容量为 0 时禁用
+        cache_size = getattr(client, "credentials_cache_size", 0)
+        cache_ttl = getattr(client, "credentials_cache_ttl", 0)
+        self.credentials_cache: Optional[TTLCache] = None
+        if cache_size > 0 and cache_ttl > 0:
+            self.credentials_cache = TTLCache(max_size=cache_size, ttl=cache_ttl)
+
     def create_device(self,
                       name: str,
                       device_type: str = "default",
@@ -186,6 +198,7 @@ class DeviceService:
 
         try:
             response = self.client.delete(f"/api/device/{device_id}")
+            self.invalidate_credentials(device_id)
             return response.status_code == 200
 
         except Exception as e:
@@ -258,12 +271,13 @@ class DeviceService:
                 f"获取设备列表失败 | Failed to get device list: {str(e)}"
             )
 
-    def get_device_credentials(self, device_id: str) -> DeviceCredentials:
+    def get_device_credentials(self, device_id: str, use_cache: bool = True) -> DeviceCredentials:
         """
         获取设备凭证
 
         Args:
             device_id: 设备 ID
+            use_cache: 是否优先使用本地凭证缓存
 
         Returns:
             DeviceCredentials: 设备凭证对象
@@ -280,10 +294,20 @@ class DeviceService:
                 message="设备 ID 不能为空"
             )
 
+        if use_cache and self.credentials_cache is not None:
+            cached = self.credentials_cache.get(device_id)
+            if cached is not None:
+                return cached
+
         try:
             response = self.client.get(f"/api/device/{device_id}/credentials")
             credentials_data = response.json()
-            return DeviceCredentials.from_dict(credentials_data)
+            credentials = DeviceCredentials.from_dict(credentials_data)
+
+            if self.credentials_cache is not None:
+                self.credentials_cache.set(device_id, credentials)
+
+            return credentials
 
         except Exception as e:
             if "404" in str(e) or "Not Found" in str(e):
@@ -296,6 +320,89 @@ class DeviceService:
                 device_id=device_id
             )
 
+    def update_device_credentials(self, credentials: DeviceCredentials) -> DeviceCredentials:
+        """
+        更新设备凭证
+
+        凭证对象未包含记录 ID（id）时先从服务器获取现有凭证的记录 ID。
+        更新成功后会同步刷新本地凭证缓存。
+
+        Args:
+            credentials: 设备凭证对象
+
+        Returns:
+            DeviceCredentials: 更新后的设备凭证对象
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            DeviceError: 凭证更新失败时抛出
+        """
+        if not credentials.device_id or not credentials.device_id.strip():
+            raise ValidationError(
+                field_name="credentials.device_id",
+                expected_type="非空字符串",
+                actual_value=credentials.device_id,
+                message="设备 ID 不能为空"
+            )
+
+        # 无论成功与否，旧凭证都不再可信
+        self.invalidate_credentials(credentials.device_id)
+
+        try:
+            # ThingsBoard 只允许更新已有的凭证记录，未提供记录 ID 时从服务器获取
+            if not credentials.id:
+                existing = self.get_device_credentials(credentials.device_id, use_cache=False)
+                credentials = replace(credentials, id=existing.id)
+
+            response = self.client.post(
+                "/api/device/credentials",
+                data=credentials.to_dict()
+            )
+
+            updated = DeviceCredentials.from_dict(response.json())
+
+            if self.credentials_cache is not None:
+                self.credentials_cache.set(updated.device_id, updated)
+
+            return updated
+
+        except Exception as e:
+            raise DeviceError(
+                message=f"更新设备凭证失败: {str(e)}",
+                device_id=credentials.device_id
+            )
+
+    def invalidate_credentials(self, device_id: Optional[str] = None) -> bool:
+        """
+        使本地缓存的设备凭证失效
+
+        Args:
+            device_id: 设备 ID，为空则清空整个凭证缓存
+
+        Returns:
+            bool: 是否有缓存条目被移除
+        """
+        if self.credentials_cache is None:
+            return False
+
+        if device_id is None:
+            removed = len(self.credentials_cache) > 0
+            self.credentials_cache.clear()
+            return removed
+
+        return self.credentials_cache.invalidate(device_id)
+
+    def get_credentials_cache_stats(self) -> Optional[CacheStats]:
+        """
+        获取设备凭证缓存统计信息
+
+        Returns:
+            Optional[CacheStats]: 命中、未命中、淘汰等统计信息，缓存禁用时返回 None
+        """
+        if self.credentials_cache is None:
+            return None
+        return self.credentials_cache.stats
+
     def get_devices_by_name(self, device_name: str) -> List[Device]:
         """
         根据名称搜索设备
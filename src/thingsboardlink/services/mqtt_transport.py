@@ -0,0 +1,651 @@
+"""
+thingsboardlink MQTT 传输模块
+
+本模块提供基于 ThingsBoard MQTT API 的遥测数据发布功能。
+网关发布器通过单个持久连接为大量子设备发送遥测数据和属性（v1/gateway/*），
+设备发布器使用单个设备的令牌发送该设备的遥测数据和属性（v1/devices/me/*），
+负载格式与 TelemetryService 的 HTTP 接口保持一致。
+
+需要安装可选依赖 paho-mqtt：pip install thingsboardlink[mqtt]
+"""
+
+import json
+import ssl
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:  # pragma: no cover - 可选依赖
+    mqtt = None
+
+from ..models import TelemetryData
+from ..exceptions import ValidationError, TelemetryError, ConfigurationError, TimeoutError
+from .telemetry_service import TelemetryService
+from .deadband_filter import DeadbandFilter
+
+
+class _MqttTransport:
+    """
+    MQTT 传输基类
+
+    负责连接管理、自动重连和在途消息窗口：
+    发布前占用窗口中的一个位置，收到 PUBACK（QoS 0 为写入套接字）后释放，
+    窗口已满时 publish 阻塞，从而向生产者施加背压。
+    断线期间 QoS 1/2 消息由 paho 缓存，重连后自动重发。
+    """
+
+    def __init__(self,
+                 host: str,
+                 access_token: str,
+                 port: int = 1883,
+                 qos: int = 1,
+                 max_inflight: int = 100,
+                 keepalive: int = 60,
+                 client_id: Optional[str] = None,
+                 tls: Union[bool, ssl.SSLContext] = False,
+                 reconnect_min_delay: float = 1.0,
+                 reconnect_max_delay: float = 60.0,
+                 publish_timeout: Optional[float] = None,
+                 deadband: Optional[DeadbandFilter] = None):
+        """
+        初始化 MQTT 传输
+
+        Args:
+            host: MQTT 服务器地址
+            access_token: 访问令牌（作为 MQTT 用户名）
+            port: MQTT 服务器端口
+            qos: 默认服务质量等级（0、1、2）
+            max_inflight: 最大在途消息数
+            keepalive: 心跳间隔（秒）
+            client_id: 客户端 ID，为空时自动生成
+            tls: 是否启用 TLS，或自定义的 SSLContext
+            reconnect_min_delay: 首次重连等待时间（秒）
+            reconnect_max_delay: 最大重连等待时间（秒）
+            publish_timeout: 在途窗口已满时发布的最长等待时间（秒），为空则一直等待
+            deadband: 死区过滤器，可选，设置后变化量未超过阈值的遥测数据点不再发布
+
+        Raises:
+            ConfigurationError: 未安装 paho-mqtt 时抛出
+            ValidationError: 参数验证失败时抛出
+        """
+        if mqtt is None:
+            raise ConfigurationError(
+                message="MQTT 传输需要安装 paho-mqtt: pip install thingsboardlink[mqtt]",
+                config_key="paho-mqtt",
+                expected_value="paho-mqtt>=1.6.0"
+            )
+
+        if not access_token or not access_token.strip():
+            raise ValidationError(
+                field_name="access_token",
+                expected_type="非空字符串",
+                actual_value=access_token,
+                message="访问令牌不能为空"
+            )
+
+        if qos not in (0, 1, 2):
+            raise ValidationError(
+                field_name="qos",
+                expected_type="0、1 或 2",
+                actual_value=qos,
+                message="服务质量等级必须是 0、1 或 2"
+            )
+
+        if max_inflight <= 0:
+            raise ValidationError(
+                field_name="max_inflight",
+                expected_type="正整数",
+                actual_value=max_inflight,
+                message="最大在途消息数必须大于 0"
+            )
+
+        self.host = host
+        self.port = port
+        self.qos = qos
+        self.max_inflight = max_inflight
+        self.keepalive = keepalive
+        self.publish_timeout = publish_timeout
+        self.deadband = deadband
+        self.client_id = client_id or f"thingsboardlink-{uuid.uuid4().hex[:12]}"
+
+        # paho-mqtt 2.x 需要显式指定回调 API 版本，回调签名通过可变参数兼容 1.x 和 2.x
+        if hasattr(mqtt, "CallbackAPIVersion"):
+            self._client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=self.client_id)
+        else:
+            self._client = mqtt.Client(client_id=self.client_id)
+
+        self._client.username_pw_set(access_token.strip())
+        self._client.max_inflight_messages_set(max_inflight)
+        self._client.reconnect_delay_set(min_delay=max(int(reconnect_min_delay), 1),
+                                         max_delay=max(int(reconnect_max_delay), 1))
+
+        if tls:
+            if isinstance(tls, ssl.SSLContext):
+                self._client.tls_set_context(tls)
+            else:
+                self._client.tls_set()
+
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_publish = self._on_publish
+
+        # 在途消息窗口
+        self._window = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._inflight_mids = set()
+        self._early_acks = set()
+        self._untracked_mids = set()
+
+        self._connected = threading.Event()
+        self._started = False
+
+        # 统计信息
+        self._published_messages = 0
+        self._acked_messages = 0
+        self._connects = 0
+        self._disconnects = 0
+        self._last_error: Optional[str] = None
+
+    @property
+    def is_connected(self) -> bool:
+        """是否已连接"""
+        return self._connected.is_set()
+
+    @property
+    def inflight(self) -> int:
+        """在途消息数"""
+        with self._lock:
+            return len(self._inflight_mids)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """传输统计信息"""
+        with self._lock:
+            return {
+                "connected": self.is_connected,
+                "inflight": len(self._inflight_mids),
+                "published_messages": self._published_messages,
+                "acked_messages": self._acked_messages,
+                "connects": self._connects,
+                "disconnects": self._disconnects,
+                "last_error": self._last_error
+            }
+
+    def connect(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        连接 MQTT 服务器并启动网络线程
+
+        连接断开后网络线程会按 reconnect_min_delay ~ reconnect_max_delay 自动重连。
+
+        Args:
+            timeout: 等待连接成功的超时时间（秒），为 0 时不等待
+
+        Returns:
+            bool: 超时时间内是否已连接
+
+        Raises:
+            TimeoutError: 等待连接超时时抛出
+        """
+        if not self._started:
+            self._client.connect_async(self.host, self.port, keepalive=self.keepalive)
+            self._client.loop_start()
+            self._started = True
+
+        if timeout == 0:
+            return self.is_connected
+
+        if not self._connected.wait(timeout):
+            raise TimeoutError(
+                message=f"连接 MQTT 服务器超时: {self.host}:{self.port}",
+                timeout_seconds=timeout,
+                operation="mqtt connect"
+            )
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有在途消息得到确认
+
+        Args:
+            timeout: 最长等待时间（秒），为空则一直等待
+
+        Returns:
+            bool: 是否已全部确认
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._inflight_mids:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        发送剩余消息后断开连接
+
+        Args:
+            timeout: 等待在途消息确认的最长时间（秒）
+        """
+        if not self._started:
+            return
+
+        self.flush(timeout)
+        self._before_disconnect()
+        self._client.disconnect()
+        self._client.loop_stop()
+        self._started = False
+        self._connected.clear()
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.close()
+
+    def _before_disconnect(self):
+        """主动断开连接前的钩子"""
+
+    def _after_connect(self):
+        """（重新）连接成功后的钩子，在网络线程中调用，不得阻塞"""
+
+    def _publish_telemetry(self,
+                           topic: str,
+                           entries_by_series: Dict[str, List[Dict[str, Any]]],
+                           build_payload,
+                           qos: Optional[int]) -> Optional[int]:
+        """
+        经死区过滤后发布遥测数据
+
+        Args:
+            topic: 主题
+            entries_by_series: {设备标识: 按时间戳分组的遥测条目}
+            build_payload: 由过滤后的 {设备标识: 条目} 构建负载的函数
+            qos: 服务质量等级
+
+        Returns:
+            Optional[int]: 消息 ID，所有数据点均被过滤时返回 None
+        """
+        deadband = self.deadband
+        if deadband is not None:
+            entries_by_series = {
+                series_id: filtered
+                for series_id, filtered in (
+                    (series_id, deadband.filter_entries(series_id, entries))
+                    for series_id, entries in entries_by_series.items()
+                )
+                if filtered
+            }
+            if not entries_by_series:
+                return None
+
+        try:
+            return self._publish(topic, build_payload(entries_by_series), qos=qos)
+        except Exception:
+            if deadband is not None:
+                for series_id, entries in entries_by_series.items():
+                    deadband.forget_entries(series_id, entries)
+            raise
+
+    def _publish_untracked(self, topic: str, payload: Any, qos: Optional[int] = None):
+        """
+        在网络线程中直接发布消息，不占用在途窗口
+
+        供连接回调使用：回调中等待窗口会阻塞网络线程，导致确认无法处理。
+        """
+        info = self._client.publish(topic, json.dumps(payload, separators=(",", ":")),
+                                    qos=self.qos if qos is None else qos)
+        with self._lock:
+            if info.mid in self._early_acks:
+                self._early_acks.discard(info.mid)
+            else:
+                self._untracked_mids.add(info.mid)
+
+    def _publish(self, topic: str, payload: Any, qos: Optional[int] = None) -> int:
+        """
+        发布消息
+
+        Args:
+            topic: 主题
+            payload: 负载（将序列化为紧凑 JSON）
+            qos: 服务质量等级，为空时使用默认值
+
+        Returns:
+            int: 消息 ID
+
+        Raises:
+            TelemetryError: 在途窗口等待超时或发布失败时抛出
+        """
+        qos = self.qos if qos is None else qos
+        data = json.dumps(payload, separators=(",", ":"))
+
+        if not self._window.acquire(timeout=self.publish_timeout):
+            raise TelemetryError(
+                f"MQTT 在途消息数已达上限 {self.max_inflight}，等待超时"
+            )
+
+        # 调用 paho 时不能持有本对象的锁：paho 在持有内部锁时调用 on_publish，否则可能死锁
+        try:
+            info = self._client.publish(topic, data, qos=qos)
+        except Exception as e:
+            self._window.release()
+            raise TelemetryError(f"MQTT 消息发布失败: {str(e)}") from e
+
+        # 未连接时 QoS 1/2 消息由 paho 缓存并在重连后发送，QoS 0 消息会丢失
+        if info.rc != mqtt.MQTT_ERR_SUCCESS and not (info.rc == mqtt.MQTT_ERR_NO_CONN and qos > 0):
+            self._window.release()
+            raise TelemetryError(
+                f"MQTT 消息发布失败: {mqtt.error_string(info.rc)}"
+            )
+
+        with self._lock:
+            self._published_messages += 1
+            if info.mid in self._early_acks:
+                # 确认在 publish 返回之前已到达
+                self._early_acks.discard(info.mid)
+                self._acked_messages += 1
+                self._window.release()
+            else:
+                self._inflight_mids.add(info.mid)
+
+        return info.mid
+
+    def _on_connect(self, client, userdata, flags, reason_code, *args):
+        """连接回调（兼容 paho-mqtt 1.x 和 2.x）"""
+        if reason_code == 0:
+            with self._lock:
+                self._connects += 1
+            self._connected.set()
+            self._after_connect()
+        else:
+            with self._lock:
+                self._last_error = f"MQTT 连接被拒绝: {reason_code}"
+
+    def _on_disconnect(self, client, userdata, *args):
+        """断开连接回调（兼容 paho-mqtt 1.x 和 2.x）"""
+        was_connected = self._connected.is_set()
+        self._connected.clear()
+        with self._lock:
+            self._disconnects += 1
+            reason_code = args[1] if len(args) >= 2 else (args[0] if args else None)
+            # 连接被拒绝时保留 _on_connect 记录的原因
+            if was_connected and reason_code is not None and reason_code != 0:
+                self._last_error = f"MQTT 连接断开: {reason_code}"
+
+    def _on_publish(self, client, userdata, mid, *args):
+        """发布确认回调（兼容 paho-mqtt 1.x 和 2.x）"""
+        with self._lock:
+            if mid in self._untracked_mids:
+                self._untracked_mids.discard(mid)
+            elif mid in self._inflight_mids:
+                self._inflight_mids.discard(mid)
+                self._acked_messages += 1
+                self._window.release()
+                if not self._inflight_mids:
+                    self._idle.notify_all()
+            else:
+                self._early_acks.add(mid)
+
+
+class MqttGatewayPublisher(_MqttTransport):
+    """
+    MQTT 网关发布器
+
+    使用网关设备的访问令牌连接 ThingsBoard，通过网关 API 代表任意数量的子设备发送数据：
+    v1/gateway/connect、v1/gateway/disconnect、v1/gateway/telemetry、v1/gateway/attributes。
+    已声明连接的子设备会在重连后重新声明。
+    """
+
+    TOPIC_CONNECT = "v1/gateway/connect"
+    TOPIC_DISCONNECT = "v1/gateway/disconnect"
+    TOPIC_TELEMETRY = "v1/gateway/telemetry"
+    TOPIC_ATTRIBUTES = "v1/gateway/attributes"
+
+    def __init__(self, host: str, access_token: str, **kwargs):
+        """
+        初始化网关发布器
+
+        Args:
+            host: MQTT 服务器地址
+            access_token: 网关设备的访问令牌
+            **kwargs: 传递给 MQTT 传输的其他参数（port、qos、max_inflight 等）
+        """
+        super().__init__(host, access_token, **kwargs)
+
+        # 已声明连接的子设备 {设备名称: 设备类型}
+        self._devices: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def _validate_device_name(device_name: str):
+        """校验子设备名称"""
+        if not device_name or not str(device_name).strip():
+            raise ValidationError(
+                field_name="device_name",
+                expected_type="非空字符串",
+                actual_value=device_name,
+                message="设备名称不能为空"
+            )
+
+    def connect_device(self, device_name: str, device_type: Optional[str] = None) -> int:
+        """
+        声明子设备已连接（设备不存在时 ThingsBoard 会自动创建）
+
+        Args:
+            device_name: 子设备名称
+            device_type: 子设备类型，可选
+
+        Returns:
+            int: 消息 ID
+        """
+        self._validate_device_name(device_name)
+
+        payload = {"device": device_name}
+        if device_type:
+            payload["type"] = device_type
+
+        with self._lock:
+            self._devices[device_name] = device_type
+        return self._publish(self.TOPIC_CONNECT, payload)
+
+    def disconnect_device(self, device_name: str) -> int:
+        """
+        声明子设备已断开
+
+        Args:
+            device_name: 子设备名称
+
+        Returns:
+            int: 消息 ID
+        """
+        self._validate_device_name(device_name)
+
+        with self._lock:
+            self._devices.pop(device_name, None)
+        return self._publish(self.TOPIC_DISCONNECT, {"device": device_name})
+
+    def send_telemetry(self,
+                       device_name: str,
+                       telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+                       timestamp: Optional[int] = None,
+                       qos: Optional[int] = None) -> Optional[int]:
+        """
+        发送单个子设备的遥测数据
+
+        Args:
+            device_name: 子设备名称
+            telemetry_data: 遥测数据，格式与 post_telemetry_with_device_token 相同
+            timestamp: 时间戳（毫秒），可选
+            qos: 服务质量等级，可选
+
+        Returns:
+            Optional[int]: 消息 ID，所有数据点均被死区过滤时返回 None
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 发布失败时抛出
+        """
+        return self.send_telemetry_many({device_name: telemetry_data}, timestamp=timestamp, qos=qos)
+
+    def send_telemetry_many(self,
+                            telemetry_by_device: Dict[str, Union[Dict[str, Any], List[TelemetryData], TelemetryData]],
+                            timestamp: Optional[int] = None,
+                            qos: Optional[int] = None) -> Optional[int]:
+        """
+        在一条消息中发送多个子设备的遥测数据
+
+        Args:
+            telemetry_by_device: {子设备名称: 遥测数据}
+            timestamp: 时间戳（毫秒），可选，应用于未指定时间戳的数据
+            qos: 服务质量等级，可选
+
+        Returns:
+            Optional[int]: 消息 ID，所有数据点均被死区过滤时返回 None
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 发布失败时抛出
+        """
+        if not telemetry_by_device:
+            raise ValidationError(
+                field_name="telemetry_by_device",
+                expected_type="非空字典",
+                actual_value=telemetry_by_device,
+                message="遥测数据不能为空"
+            )
+
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        entries_by_device = {}
+        for device_name, telemetry_data in telemetry_by_device.items():
+            self._validate_device_name(device_name)
+            entries_by_device[device_name] = TelemetryService._group_telemetry(telemetry_data, timestamp)
+
+        return self._publish_telemetry(self.TOPIC_TELEMETRY, entries_by_device, dict, qos)
+
+    def send_attributes(self,
+                        device_name: str,
+                        attributes: Dict[str, Any],
+                        qos: Optional[int] = None) -> int:
+        """
+        发送子设备的客户端属性
+
+        Args:
+            device_name: 子设备名称
+            attributes: 属性键值对
+            qos: 服务质量等级，可选
+
+        Returns:
+            int: 消息 ID
+        """
+        self._validate_device_name(device_name)
+
+        if not attributes:
+            raise ValidationError(
+                field_name="attributes",
+                expected_type="非空字典",
+                actual_value=attributes,
+                message="属性数据不能为空"
+            )
+
+        return self._publish(self.TOPIC_ATTRIBUTES, {device_name: attributes}, qos=qos)
+
+    def _after_connect(self):
+        """重连后重新声明所有子设备（首次连接前声明的设备已在 paho 队列中，无需重复）"""
+        with self._lock:
+            if self._connects <= 1:
+                return
+            devices = list(self._devices.items())
+
+        for device_name, device_type in devices:
+            payload = {"device": device_name}
+            if device_type:
+                payload["type"] = device_type
+            self._publish_untracked(self.TOPIC_CONNECT, payload)
+
+
+class MqttDevicePublisher(_MqttTransport):
+    """
+    MQTT 设备发布器
+
+    使用设备访问令牌连接 ThingsBoard，通过设备 API 发送该设备的数据：
+    v1/devices/me/telemetry、v1/devices/me/attributes。
+    与 HTTP 接口不同，发布在在途窗口内流水线进行，不等待每条消息的确认。
+    """
+
+    TOPIC_TELEMETRY = "v1/devices/me/telemetry"
+    TOPIC_ATTRIBUTES = "v1/devices/me/attributes"
+
+    def __init__(self, host: str, access_token: str, **kwargs):
+        """
+        初始化设备发布器
+
+        Args:
+            host: MQTT 服务器地址
+            access_token: 设备访问令牌
+            **kwargs: 传递给 MQTT 传输的其他参数（port、qos、max_inflight 等）
+        """
+        super().__init__(host, access_token, **kwargs)
+
+        # 死区过滤器中本设备的标识，与 HTTP 上传使用相同的设备令牌，共享过滤器时状态一致
+        self._series_id = access_token.strip()
+
+    def send_telemetry(self,
+                       telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+                       timestamp: Optional[int] = None,
+                       qos: Optional[int] = None) -> Optional[int]:
+        """
+        发送遥测数据
+
+        Args:
+            telemetry_data: 遥测数据，格式与 post_telemetry_with_device_token 相同
+            timestamp: 时间戳（毫秒），可选
+            qos: 服务质量等级，可选
+
+        Returns:
+            Optional[int]: 消息 ID，所有数据点均被死区过滤时返回 None
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 发布失败时抛出
+        """
+        entries = TelemetryService._group_telemetry(telemetry_data, timestamp)
+        return self._publish_telemetry(
+            self.TOPIC_TELEMETRY,
+            {self._series_id: entries},
+            lambda filtered: TelemetryService._entries_payload(filtered[self._series_id]),
+            qos
+        )
+
+    def send_attributes(self, attributes: Dict[str, Any], qos: Optional[int] = None) -> int:
+        """
+        发送客户端属性
+
+        Args:
+            attributes: 属性键值对
+            qos: 服务质量等级，可选
+
+        Returns:
+            int: 消息 ID
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 发布失败时抛出
+        """
+        if not attributes:
+            raise ValidationError(
+                field_name="attributes",
+                expected_type="非空字典",
+                actual_value=attributes,
+                message="属性数据不能为空"
+            )
+
+        return self._publish(self.TOPIC_ATTRIBUTES, attributes, qos=qos)
@@ -9,8 +9,10 @@ from typing import List, Optional, Dict, Any
 
 from ..models import EntityRelation, EntityId, EntityType
 from ..exceptions import ValidationError, APIError
+from ..tracing import trace_service
 
 
+@trace_service
 class RelationService:
     """
     关系服务类
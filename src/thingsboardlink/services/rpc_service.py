@@ -10,8 +10,10 @@ from typing import Optional, Dict, Any
 
 from ..models import RPCRequest, RPCResponse, PersistentRPCRequest
 from ..exceptions import ValidationError, RPCError, TimeoutError
+from ..tracing import trace_service
 
 
+@trace_service
 class RpcService:
     """
     RPC 服务类
@@ -0,0 +1,427 @@
+"""
+thingsboardlink 遥测批处理模块
+
+本模块提供基于设备令牌的遥测数据批量上传功能。
+数据点按设备令牌缓存在内存中，达到数量、字节或延迟阈值时合并为一次多时间戳请求发送。
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..models import TelemetryData
+from ..exceptions import ValidationError, TelemetryError
+from ..frames import is_columnar_input
+
+
+class _DeviceBuffer:
+    """单个设备令牌的待发送缓冲区"""
+
+    __slots__ = ("entries", "points", "size", "created_at")
+
+    def __init__(self):
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.points = 0
+        self.size = 2  # JSON 数组的方括号
+        self.created_at = time.monotonic()
+
+
+class TelemetryBatcher:
+    """
+    遥测批处理器
+
+    在后台线程中按设备令牌聚合遥测数据点，并在满足以下任一条件时发送：
+    数据点数量达到 max_points、估算负载大小达到 max_bytes、
+    最早的数据点等待时间超过 max_latency。
+
+    已封存的批次由最多 max_in_flight 个发送线程并发发送（启用自适应并发时由控制器进一步调整）。
+    待发送数据点总数受 max_pending_points 限制，超过时 add() 会阻塞（或立即报错），
+    从而向生产者施加背压。close() 会发送所有剩余数据。
+    """
+
+    def __init__(self,
+                 telemetry_service,
+                 max_points: int = 500,
+                 max_bytes: int = 256 * 1024,
+                 max_latency: float = 1.0,
+                 max_pending_points: int = 100000,
+                 block_when_full: bool = True,
+                 add_timeout: Optional[float] = None,
+                 on_error: Optional[Callable[[str, List[Dict[str, Any]], Exception], None]] = None,
+                 max_in_flight: Optional[int] = None):
+        """
+        初始化遥测批处理器
+
+        Args:
+            telemetry_service: TelemetryService 实例
+            max_points: 单个设备单次发送的最大数据点数
+            max_bytes: 单个设备单次发送的最大负载字节数（估算值）
+            max_latency: 数据点在缓冲区中的最大等待时间（秒）
+            max_pending_points: 所有设备待发送数据点总数上限
+            block_when_full: 缓冲区已满时 add() 是否阻塞等待
+            add_timeout: 阻塞等待的超时时间（秒），为空则一直等待
+            on_error: 发送失败回调，参数为设备令牌、遥测条目和异常
+            max_in_flight: 最大并发发送请求数，默认为自适应并发控制器的最大上限（未启用时为
+                TelemetryService.DEFAULT_MAX_IN_FLIGHT）
+        """
+        if max_points <= 0:
+            raise ValidationError(
+                field_name="max_points",
+                expected_type="正整数",
+                actual_value=max_points,
+                message="最大数据点数必须大于 0"
+            )
+
+        if max_bytes <= 0:
+            raise ValidationError(
+                field_name="max_bytes",
+                expected_type="正整数",
+                actual_value=max_bytes,
+                message="最大负载字节数必须大于 0"
+            )
+
+        if max_latency <= 0:
+            raise ValidationError(
+                field_name="max_latency",
+                expected_type="正数",
+                actual_value=max_latency,
+                message="最大等待时间必须大于 0"
+            )
+
+        if max_pending_points < max_points:
+            raise ValidationError(
+                field_name="max_pending_points",
+                expected_type=f"不小于 max_points ({max_points}) 的整数",
+                actual_value=max_pending_points,
+                message="待发送数据点上限不能小于单次发送的最大数据点数"
+            )
+
+        if max_in_flight is None:
+            if telemetry_service.concurrency is not None:
+                max_in_flight = telemetry_service.concurrency.max_limit
+            else:
+                max_in_flight = telemetry_service.DEFAULT_MAX_IN_FLIGHT
+
+        if max_in_flight <= 0:
+            raise ValidationError(
+                field_name="max_in_flight",
+                expected_type="正整数",
+                actual_value=max_in_flight,
+                message="最大并发发送请求数必须大于 0"
+            )
+
+        self.telemetry_service = telemetry_service
+        self.max_points = max_points
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self.max_pending_points = max_pending_points
+        self.block_when_full = block_when_full
+        self.add_timeout = add_timeout
+        self.on_error = on_error
+        self.max_in_flight = max_in_flight
+
+        self._buffers: Dict[str, _DeviceBuffer] = {}
+        self._ready: List[tuple] = []
+        self._pending_points = 0
+        self._in_flight = 0
+
+        self._lock = threading.Lock()
+        self._work_available = threading.Condition(self._lock)
+        self._space_available = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+
+        # 统计信息
+        self._sent_requests = 0
+        self._sent_points = 0
+        self._failed_requests = 0
+        self._failed_points = 0
+        self._last_error: Optional[Exception] = None
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight,
+            thread_name_prefix="thingsboardlink-telemetry-sender"
+        )
+        self._worker = threading.Thread(
+            target=self._run,
+            name="thingsboardlink-telemetry-batcher",
+            daemon=True
+        )
+        self._worker.start()
+
+    def add(self,
+            device_token: str,
+            telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+            timestamp: Optional[int] = None,
+            ts_column: str = "ts"):
+        """
+        添加遥测数据到批处理缓冲区
+
+        Args:
+            device_token: 设备访问令牌
+            telemetry_data: 遥测数据，格式与 post_telemetry_with_device_token 相同
+            timestamp: 时间戳（毫秒），可选
+            ts_column: 表格数据的时间戳列名
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 批处理器已关闭或缓冲区已满时抛出
+        """
+        if not device_token or not device_token.strip():
+            raise ValidationError(
+                field_name="device_token",
+                expected_type="非空字符串",
+                actual_value=device_token,
+                message="设备令牌不能为空"
+            )
+
+        if not is_columnar_input(telemetry_data, ts_column) and not telemetry_data:
+            raise ValidationError(
+                field_name="telemetry_data",
+                expected_type="非空数据",
+                actual_value=telemetry_data,
+                message="遥测数据不能为空"
+            )
+
+        entries = self.telemetry_service._group_telemetry(telemetry_data, timestamp, ts_column)
+        points = sum(len(entry["values"]) for entry in entries)
+
+        if points > self.max_pending_points:
+            raise TelemetryError(
+                f"单次添加的数据点数 {points} 超过待发送上限 {self.max_pending_points}"
+            )
+
+        with self._lock:
+            self._wait_for_space(points)
+
+            buffer = self._buffers.get(device_token)
+            if buffer is None:
+                buffer = self._buffers[device_token] = _DeviceBuffer()
+
+            for entry in entries:
+                ts = entry["ts"]
+                values = None
+                for key, value in entry["values"].items():
+                    if values is None:
+                        values = buffer.entries.get(ts)
+                        if values is None:
+                            values = buffer.entries[ts] = {}
+                            # {"ts":1700000000000,"values":{}}, 的估算长度
+                            buffer.size += 30
+                    if key not in values:
+                        buffer.points += 1
+                        self._pending_points += 1
+                    values[key] = value
+                    buffer.size += len(key) + len(str(value)) + 6
+
+                    # 达到阈值时立即封存，其余数据写入新缓冲区，保证单批不超过 max_points / max_bytes
+                    if buffer.points >= self.max_points or buffer.size >= self.max_bytes:
+                        self._seal(device_token)
+                        buffer = self._buffers[device_token] = _DeviceBuffer()
+                        values = None
+
+            if not buffer.entries:
+                del self._buffers[device_token]
+
+            self._work_available.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即发送所有缓冲数据并等待发送完成
+
+        Args:
+            timeout: 最长等待时间（秒），为空则一直等待
+
+        Returns:
+            bool: 是否在超时前全部发送完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            self._seal_all()
+            self._work_available.notify()
+
+            while self._buffers or self._ready or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        关闭批处理器，发送所有剩余数据后停止后台线程
+
+        Args:
+            timeout: 等待后台线程结束的最长时间（秒）
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._work_available.notify_all()
+            self._space_available.notify_all()
+
+        self._worker.join(timeout)
+
+    @property
+    def pending_points(self) -> int:
+        """当前待发送（含发送中）的数据点数"""
+        with self._lock:
+            return self._pending_points
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取批处理统计信息
+
+        Returns:
+            Dict[str, Any]: 已发送、失败请求数与数据点数，以及当前队列深度
+        """
+        with self._lock:
+            return {
+                "pending_points": self._pending_points,
+                "pending_batches": len(self._buffers) + len(self._ready),
+                "in_flight_requests": self._in_flight,
+                "sent_requests": self._sent_requests,
+                "sent_points": self._sent_points,
+                "failed_requests": self._failed_requests,
+                "failed_points": self._failed_points,
+                "last_error": str(self._last_error) if self._last_error else None
+            }
+
+    def _wait_for_space(self, points: int):
+        """在持有锁的情况下等待缓冲区腾出空间"""
+        if self._closed:
+            raise TelemetryError("遥测批处理器已关闭")
+
+        if self._pending_points + points <= self.max_pending_points:
+            return
+
+        if not self.block_when_full:
+            raise TelemetryError(
+                f"遥测批处理缓冲区已满，待发送数据点: {self._pending_points}"
+            )
+
+        deadline = None if self.add_timeout is None else time.monotonic() + self.add_timeout
+
+        # 缓冲区已满时立即发送所有设备的数据，以尽快腾出空间
+        self._seal_all()
+        self._work_available.notify()
+
+        while self._pending_points + points > self.max_pending_points:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TelemetryError(
+                    f"等待遥测批处理缓冲区空间超时，待发送数据点: {self._pending_points}"
+                )
+            self._space_available.wait(remaining)
+            if self._closed:
+                raise TelemetryError("遥测批处理器已关闭")
+
+    def _seal(self, device_token: str):
+        """在持有锁的情况下封存设备缓冲区并加入发送队列，后续数据写入新缓冲区"""
+        buffer = self._buffers.pop(device_token, None)
+        if buffer is not None:
+            self._ready.append((device_token, buffer))
+
+    def _seal_all(self):
+        """在持有锁的情况下封存所有设备缓冲区"""
+        for device_token in list(self._buffers):
+            self._seal(device_token)
+
+    def _take_ready(self) -> List[tuple]:
+        """在持有锁的情况下取出所有待发送的缓冲区"""
+        now = time.monotonic()
+        for device_token, buffer in list(self._buffers.items()):
+            if now - buffer.created_at >= self.max_latency:
+                self._seal(device_token)
+
+        batches = self._ready
+        self._ready = []
+        self._in_flight += len(batches)
+        return batches
+
+    def _next_deadline(self) -> Optional[float]:
+        """在持有锁的情况下计算下一个延迟触发时间"""
+        if not self._buffers:
+            return None
+        oldest = min(buffer.created_at for buffer in self._buffers.values())
+        return oldest + self.max_latency
+
+    def _run(self):
+        """后台发送线程主循环"""
+        while True:
+            with self._lock:
+                while not self._ready and not self._closed:
+                    deadline = self._next_deadline()
+                    if deadline is not None and deadline <= time.monotonic():
+                        break
+                    self._work_available.wait(
+                        None if deadline is None else deadline - time.monotonic()
+                    )
+
+                if self._closed:
+                    self._seal_all()
+
+                batches = self._take_ready()
+                closing = self._closed
+
+            for device_token, buffer in batches:
+                self._executor.submit(self._send, device_token, buffer)
+
+            if closing and not batches:
+                with self._lock:
+                    if not self._buffers and not self._ready:
+                        while self._in_flight:
+                            self._idle.wait()
+                        self._idle.notify_all()
+                        break
+
+        self._executor.shutdown(wait=True)
+
+    def _send(self, device_token: str, buffer: _DeviceBuffer):
+        """发送单个设备的缓冲数据"""
+        entries = [
+            {"ts": ts, "values": values}
+            for ts, values in sorted(buffer.entries.items())
+        ]
+
+        error = None
+        try:
+            self.telemetry_service._send_entries(device_token, entries)
+        except Exception as e:
+            error = e
+
+        with self._lock:
+            self._in_flight -= 1
+            self._pending_points -= buffer.points
+
+            if error is None:
+                self._sent_requests += 1
+                self._sent_points += buffer.points
+            else:
+                self._failed_requests += 1
+                self._failed_points += buffer.points
+                self._last_error = error
+
+            self._space_available.notify_all()
+            if not self._buffers and not self._ready and not self._in_flight:
+                self._idle.notify_all()
+
+        if error is not None and self.on_error is not None:
+            try:
+                self.on_error(device_token, entries, error)
+            except Exception:
+                # 回调异常不能终止后台发送线程
+                pass
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出，发送剩余数据"""
+        self.close()
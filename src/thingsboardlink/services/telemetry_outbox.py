@@ -0,0 +1,581 @@
+"""
+thingsboardlink 遥测发件箱模块
+
+本模块提供基于 SQLite（WAL 模式）的持久化存储转发功能。
+遥测数据先写入本地发件箱，后台线程按写入顺序批量发送；服务器不可达时数据保留在磁盘上，
+连接恢复后继续按从旧到新的顺序补发。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..models import TelemetryData
+from ..exceptions import ValidationError, TelemetryError, APIError, RateLimitError, PartialTelemetryError
+from ..frames import is_columnar_input
+
+
+# 负载编码方式
+_ENCODING_JSON = 0
+_ENCODING_ZLIB = 1
+
+# 超过该长度的负载使用 zlib 压缩
+_COMPRESS_THRESHOLD = 256
+
+
+class TelemetryOutbox:
+    """
+    遥测发件箱
+
+    put() 将遥测数据写入 SQLite 数据库后立即返回，后台线程按 id 顺序读取最早的记录，
+    按设备令牌合并为多时间戳负载发送，发送成功后删除。
+
+    - 网络错误、超时、429 和 5xx 响应：保留记录，按指数退避重试；
+    - 其他 4xx 响应（如设备令牌无效）：记录无法发送成功，直接丢弃并通知 on_drop；
+    - 拆分上传部分失败：只保留失败负载中的条目等待重试，已成功的条目不再重发；
+    - 磁盘配额（max_bytes / max_records）用尽时按 drop_policy 处理：
+      drop_oldest 删除最早的记录（正在发送的记录除外，只剩这些记录时丢弃新数据），
+      drop_newest 丢弃新数据，raise 抛出 TelemetryError；
+    - replay_rate 限制每秒发送的数据点数，避免恢复连接后的补发流量冲击服务器。
+
+    数据库使用 WAL 模式和 synchronous=NORMAL，负载以紧凑 JSON 存储，较大的负载使用 zlib 压缩，
+    以减少慢速存储（如 SD 卡）上的写入量。
+    """
+
+    DROP_POLICIES = ("drop_oldest", "drop_newest", "raise")
+
+    def __init__(self,
+                 telemetry_service,
+                 path: str,
+                 max_bytes: int = 256 * 1024 * 1024,
+                 max_records: Optional[int] = None,
+                 drop_policy: str = "drop_oldest",
+                 batch_records: int = 200,
+                 max_batch_points: int = 1000,
+                 replay_rate: Optional[float] = None,
+                 retry_delay: float = 1.0,
+                 max_retry_delay: float = 60.0,
+                 on_drop: Optional[Callable[[str, List[Dict[str, Any]], str], None]] = None,
+                 autostart: bool = True):
+        """
+        初始化遥测发件箱
+
+        Args:
+            telemetry_service: TelemetryService 实例
+            path: SQLite 数据库文件路径
+            max_bytes: 发件箱中负载总字节数上限
+            max_records: 发件箱记录数上限，为空时不限制
+            drop_policy: 配额用尽时的处理策略（drop_oldest、drop_newest、raise）
+            batch_records: 每轮从磁盘读取的最大记录数
+            max_batch_points: 单个设备单次请求的最大数据点数
+            replay_rate: 每秒最多发送的数据点数，为空时不限制
+            retry_delay: 发送失败后的首次重试等待时间（秒），之后指数增长
+            max_retry_delay: 最大重试等待时间（秒）
+            on_drop: 记录被丢弃时的回调，参数为设备令牌、遥测条目和原因（quota、rejected）
+            autostart: 是否立即启动后台发送线程
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if max_bytes <= 0:
+            raise ValidationError(
+                field_name="max_bytes",
+                expected_type="正整数",
+                actual_value=max_bytes,
+                message="发件箱字节数上限必须大于 0"
+            )
+
+        if max_records is not None and max_records <= 0:
+            raise ValidationError(
+                field_name="max_records",
+                expected_type="正整数",
+                actual_value=max_records,
+                message="发件箱记录数上限必须大于 0"
+            )
+
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValidationError(
+                field_name="drop_policy",
+                expected_type=" 或 ".join(self.DROP_POLICIES),
+                actual_value=drop_policy,
+                message="不支持的丢弃策略"
+            )
+
+        if batch_records <= 0 or max_batch_points <= 0:
+            raise ValidationError(
+                field_name="batch_records/max_batch_points",
+                expected_type="正整数",
+                message="批量大小必须大于 0"
+            )
+
+        if replay_rate is not None and replay_rate <= 0:
+            raise ValidationError(
+                field_name="replay_rate",
+                expected_type="正数",
+                actual_value=replay_rate,
+                message="补发速率必须大于 0"
+            )
+
+        self.telemetry_service = telemetry_service
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.drop_policy = drop_policy
+        self.batch_records = batch_records
+        self.max_batch_points = max_batch_points
+        self.replay_rate = replay_rate
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.on_drop = on_drop
+
+        self._lock = threading.Lock()
+        self._work_available = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+        self._draining = False
+        # 后台线程正在发送的记录的最大 id，配额策略不删除 id 不大于该值的记录
+        self._in_flight_max_id = 0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "token TEXT NOT NULL, "
+            "encoding INTEGER NOT NULL, "
+            "payload BLOB NOT NULL, "
+            "points INTEGER NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+
+        # 恢复上次运行遗留的记录统计
+        row = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0), COALESCE(SUM(points), 0) FROM outbox"
+        ).fetchone()
+        self._pending_records, self._pending_bytes, self._pending_points = row
+
+        # 统计信息
+        self._sent_requests = 0
+        self._sent_points = 0
+        self._failed_attempts = 0
+        self._dropped_records = 0
+        self._dropped_points = 0
+        self._last_error: Optional[Exception] = None
+
+        self._worker: Optional[threading.Thread] = None
+        if autostart:
+            self.start()
+
+    def start(self):
+        """启动后台发送线程"""
+        with self._lock:
+            if self._closed:
+                raise TelemetryError("发件箱已关闭")
+            if self._worker is not None and self._worker.is_alive():
+                return
+
+            self._worker = threading.Thread(
+                target=self._run,
+                name="thingsboardlink-telemetry-outbox",
+                daemon=True
+            )
+            self._worker.start()
+
+    def put(self,
+            device_token: str,
+            telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+            timestamp: Optional[int] = None,
+            ts_column: str = "ts") -> bool:
+        """
+        将遥测数据写入发件箱
+
+        时间戳在写入时确定，补发的数据保留原始时间戳。
+
+        Args:
+            device_token: 设备访问令牌
+            telemetry_data: 遥测数据，格式与 post_telemetry_with_device_token 相同
+            timestamp: 时间戳（毫秒），可选
+            ts_column: 表格数据的时间戳列名
+
+        Returns:
+            bool: 是否已写入（配额用尽且无法按 drop_policy 腾出空间时返回 False）
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 发件箱已关闭，或 raise 策略下配额用尽时抛出
+        """
+        if not device_token or not device_token.strip():
+            raise ValidationError(
+                field_name="device_token",
+                expected_type="非空字符串",
+                actual_value=device_token,
+                message="设备令牌不能为空"
+            )
+
+        if not is_columnar_input(telemetry_data, ts_column) and not telemetry_data:
+            raise ValidationError(
+                field_name="telemetry_data",
+                expected_type="非空数据",
+                actual_value=telemetry_data,
+                message="遥测数据不能为空"
+            )
+
+        entries = self.telemetry_service._group_telemetry(telemetry_data, timestamp, ts_column)
+        points = sum(len(entry["values"]) for entry in entries)
+        encoding, payload = self._encode(entries)
+
+        if len(payload) > self.max_bytes:
+            raise TelemetryError(
+                f"单条遥测数据大小 {len(payload)} 字节超过发件箱上限 {self.max_bytes} 字节"
+            )
+
+        with self._lock:
+            if self._closed:
+                raise TelemetryError("发件箱已关闭")
+
+            if not self._make_room(len(payload)):
+                if self.drop_policy == "raise":
+                    raise TelemetryError("发件箱已满")
+                self._record_drop(device_token, entries, points, "quota")
+                return False
+
+            self._conn.execute(
+                "INSERT INTO outbox (token, encoding, payload, points, created_at) VALUES (?, ?, ?, ?, ?)",
+                (device_token, encoding, payload, points, time.time())
+            )
+            self._pending_records += 1
+            self._pending_bytes += len(payload)
+            self._pending_points += points
+
+            self._work_available.notify()
+
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待发件箱中的所有记录发送完成
+
+        Args:
+            timeout: 最长等待时间（秒），为空则一直等待
+
+        Returns:
+            bool: 是否已全部发送
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            self._work_available.notify()
+            while self._pending_records > 0 or self._draining:
+                if self._worker is None or not self._worker.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """
+        关闭发件箱
+
+        停止后台线程并关闭数据库，未发送的记录保留在磁盘上，下次打开时继续发送。
+
+        Args:
+            timeout: 等待后台线程退出的最长时间（秒）
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._work_available.notify_all()
+
+        if self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join(timeout)
+
+        with self._lock:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.close()
+
+    @property
+    def pending_records(self) -> int:
+        """待发送记录数"""
+        with self._lock:
+            return self._pending_records
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """发件箱统计信息"""
+        with self._lock:
+            return {
+                "pending_records": self._pending_records,
+                "pending_points": self._pending_points,
+                "pending_bytes": self._pending_bytes,
+                "sent_requests": self._sent_requests,
+                "sent_points": self._sent_points,
+                "failed_attempts": self._failed_attempts,
+                "dropped_records": self._dropped_records,
+                "dropped_points": self._dropped_points,
+                "last_error": self._last_error
+            }
+
+    @staticmethod
+    def _encode(entries: List[Dict[str, Any]]):
+        """将遥测条目编码为紧凑 JSON，较大的负载使用 zlib 压缩"""
+        raw = json.dumps(entries, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        if len(raw) > _COMPRESS_THRESHOLD:
+            compressed = zlib.compress(raw, 6)
+            if len(compressed) < len(raw):
+                return _ENCODING_ZLIB, compressed
+        return _ENCODING_JSON, raw
+
+    @staticmethod
+    def _decode(encoding: int, payload: bytes) -> List[Dict[str, Any]]:
+        """解码负载"""
+        if encoding == _ENCODING_ZLIB:
+            payload = zlib.decompress(payload)
+        return json.loads(payload)
+
+    def _make_room(self, size: int) -> bool:
+        """
+        为新记录腾出空间（调用方需持有锁）
+
+        Returns:
+            bool: 是否有足够空间写入新记录
+        """
+        def _over_quota() -> bool:
+            return (self._pending_bytes + size > self.max_bytes or
+                    (self.max_records is not None and self._pending_records + 1 > self.max_records))
+
+        if not _over_quota():
+            return True
+
+        if self.drop_policy != "drop_oldest":
+            return False
+
+        while _over_quota() and self._pending_records > 0:
+            rows = self._conn.execute(
+                "SELECT id, token, encoding, payload, points FROM outbox WHERE id > ? ORDER BY id LIMIT 64",
+                (self._in_flight_max_id,)
+            ).fetchall()
+            if not rows:
+                break
+
+            dropped_ids = []
+            for row_id, token, encoding, payload, points in rows:
+                if not _over_quota():
+                    break
+                dropped_ids.append(row_id)
+                self._pending_records -= 1
+                self._pending_bytes -= len(payload)
+                self._pending_points -= points
+                self._record_drop(token, self._decode(encoding, payload) if self.on_drop else [], points, "quota")
+
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id in dropped_ids])
+
+        return not _over_quota()
+
+    def _record_drop(self, token: str, entries: List[Dict[str, Any]], points: int, reason: str):
+        """记录丢弃的数据并通知回调（调用方需持有锁）"""
+        self._dropped_records += 1
+        self._dropped_points += points
+        if self.on_drop is not None:
+            try:
+                self.on_drop(token, entries, reason)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_permanent_failure(error: Exception) -> bool:
+        """判断发送错误是否不可重试（4xx 响应，429 除外）"""
+        cause = error if isinstance(error, APIError) else error.__cause__
+        status_code = getattr(cause, "status_code", None)
+        return status_code is not None and 400 <= status_code < 500 and status_code != 429
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """获取服务器限流时要求的等待时间（429 响应的 Retry-After）"""
+        cause = error
+        while cause is not None and not isinstance(cause, RateLimitError):
+            cause = cause.__cause__
+        return cause.retry_after if cause is not None else None
+
+    def _run(self):
+        """后台线程：按从旧到新的顺序读取记录，按设备令牌合并后发送"""
+        retry_delay = self.retry_delay
+        next_send_at = time.monotonic()
+
+        while True:
+            with self._lock:
+                while self._pending_records == 0 and not self._closed:
+                    self._idle.notify_all()
+                    self._work_available.wait()
+
+                if self._closed:
+                    self._idle.notify_all()
+                    return
+
+                rows = self._conn.execute(
+                    "SELECT id, token, encoding, payload, points FROM outbox ORDER BY id LIMIT ?",
+                    (self.batch_records,)
+                ).fetchall()
+                self._draining = True
+                self._in_flight_max_id = rows[-1][0] if rows else 0
+
+            # 按设备令牌分组，组内保持写入顺序
+            batches: Dict[str, List[tuple]] = {}
+            for row in rows:
+                batches.setdefault(row[1], []).append(row)
+
+            failed = False
+            server_delay = None
+            for token, token_rows in batches.items():
+                for chunk in self._split_rows(token_rows):
+                    if self.replay_rate is not None:
+                        wait = next_send_at - time.monotonic()
+                        if wait > 0 and self._wait_closed(wait):
+                            break
+
+                    points = sum(row[4] for row in chunk)
+                    entries = [entry for row in chunk for entry in self._decode(row[2], row[3])]
+
+                    try:
+                        self.telemetry_service._send_entries(token, entries)
+                    except PartialTelemetryError as e:
+                        if not self._keep_failed_entries(token, chunk, points, e):
+                            continue
+                        server_delay = self._retry_after(e)
+                        failed = True
+                        break
+                    except Exception as e:
+                        with self._lock:
+                            self._last_error = e
+                            if self._is_permanent_failure(e):
+                                self._delete_rows(chunk)
+                                self._record_drop(token, entries, points, "rejected")
+                                continue
+                            self._failed_attempts += 1
+                        server_delay = self._retry_after(e)
+                        failed = True
+                        break
+
+                    with self._lock:
+                        self._delete_rows(chunk)
+                        self._sent_requests += 1
+                        self._sent_points += points
+
+                    if self.replay_rate is not None:
+                        next_send_at = max(next_send_at, time.monotonic()) + points / self.replay_rate
+
+                if failed or self._closed:
+                    break
+
+            with self._lock:
+                self._draining = False
+                self._in_flight_max_id = 0
+                self._idle.notify_all()
+
+            if failed:
+                # 服务器不可达时退避，期间新数据只写入磁盘；服务器限流时至少等待 Retry-After
+                if self._wait_closed(max(retry_delay, server_delay or 0.0)):
+                    return
+                retry_delay = min(retry_delay * 2, self.max_retry_delay)
+            else:
+                retry_delay = self.retry_delay
+
+    def _split_rows(self, rows: List[tuple]) -> List[List[tuple]]:
+        """按 max_batch_points 将同一设备的记录拆分为多个请求"""
+        chunks = []
+        current = []
+        current_points = 0
+        for row in rows:
+            if current and current_points + row[4] > self.max_batch_points:
+                chunks.append(current)
+                current = []
+                current_points = 0
+            current.append(row)
+            current_points += row[4]
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _keep_failed_entries(self,
+                             token: str,
+                             rows: List[tuple],
+                             points: int,
+                             error: PartialTelemetryError) -> bool:
+        """
+        处理拆分上传的部分失败：已成功的条目从发件箱删除，被拒绝的条目丢弃，其余失败条目保留等待重试
+
+        保留的条目写回这批记录中最早的一条，以保持发送顺序。
+
+        Returns:
+            bool: 是否仍有需要重试的条目
+        """
+        result = error.result
+        retry_entries: List[Dict[str, Any]] = []
+        rejected_entries: List[Dict[str, Any]] = []
+        for index in sorted(result.failed):
+            target = rejected_entries if self._is_permanent_failure(result.failed[index]) else retry_entries
+            target.extend(result.failed_entries.get(index, []))
+
+        retry_points = sum(len(entry["values"]) for entry in retry_entries)
+        rejected_points = sum(len(entry["values"]) for entry in rejected_entries)
+
+        with self._lock:
+            self._last_error = error
+            self._sent_requests += result.success_count
+            self._sent_points += max(points - retry_points - rejected_points, 0)
+            if rejected_entries:
+                self._record_drop(token, rejected_entries, rejected_points, "rejected")
+
+            if not retry_entries:
+                self._delete_rows(rows)
+                return False
+
+            self._failed_attempts += 1
+            self._rewrite_row(rows[0], retry_entries, retry_points)
+            self._delete_rows(rows[1:])
+            return True
+
+    def _rewrite_row(self, row: tuple, entries: List[Dict[str, Any]], points: int):
+        """用剩余的遥测条目覆盖记录（调用方需持有锁）"""
+        if self._conn is None:
+            return
+        encoding, payload = self._encode(entries)
+        cursor = self._conn.execute(
+            "UPDATE outbox SET encoding = ?, payload = ?, points = ? WHERE id = ?",
+            (encoding, payload, points, row[0])
+        )
+        if cursor.rowcount:
+            self._pending_bytes += len(payload) - len(row[3])
+            self._pending_points += points - row[4]
+
+    def _delete_rows(self, rows: List[tuple]):
+        """删除已处理的记录（调用方需持有锁），已被配额策略删除的记录不重复计数"""
+        if self._conn is None:
+            return
+        for row in rows:
+            cursor = self._conn.execute("DELETE FROM outbox WHERE id = ?", (row[0],))
+            if cursor.rowcount:
+                self._pending_records -= 1
+                self._pending_bytes -= len(row[3])
+                self._pending_points -= row[4]
+
+    def _wait_closed(self, timeout: float) -> bool:
+        """等待指定时间，发件箱关闭时提前返回 True"""
+        with self._lock:
+            if not self._closed:
+                self._work_available.wait_for(lambda: self._closed, timeout)
+            return self._closed
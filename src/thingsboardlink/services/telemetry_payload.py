@@ -0,0 +1,172 @@
+"""
+thingsboardlink 遥测负载拆分模块
+
+本模块将按时间戳分组的遥测条目拆分为不超过指定字节数的多个负载。
+负载大小在累加条目时逐个估算（键名长度带缓存），只在拆分完成后对每个负载序列化一次。
+估算基于紧凑 JSON（无空格、ASCII 转义），与实际发送的请求体完全一致。
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Tuple
+
+from ..exceptions import ValidationError
+
+# 条目固定部分：{"ts":<ts>,"values":{<items>}}
+_ENTRY_OVERHEAD = len('{"ts":,"values":{}}')
+
+
+def dumps_compact(payload: Any) -> str:
+    """序列化为紧凑 JSON（与负载大小估算一致）"""
+    return json.dumps(payload, separators=(",", ":"))
+
+
+class PayloadSizeEstimator:
+    """
+    紧凑 JSON 大小估算器
+
+    数值、布尔值和 None 按其 JSON 表示直接计算长度，
+    字符串和嵌套对象只序列化该值本身；键名的长度会被缓存，批量数据中重复的键只计算一次。
+    """
+
+    def __init__(self):
+        self._key_sizes: Dict[str, int] = {}
+
+    def key_size(self, key: str) -> int:
+        """键名序列化后的长度（含引号和冒号）"""
+        size = self._key_sizes.get(key)
+        if size is None:
+            size = len(json.dumps(str(key))) + 1
+            if len(self._key_sizes) < 65536:
+                self._key_sizes[key] = size
+        return size
+
+    @staticmethod
+    def value_size(value: Any) -> int:
+        """值序列化后的长度"""
+        if value is None or value is True:
+            return 4
+        if value is False:
+            return 5
+        if isinstance(value, int):
+            return len(int.__repr__(value))
+        if isinstance(value, float):
+            if math.isfinite(value):
+                return len(float.__repr__(value))
+            return 3 if math.isnan(value) else (8 if value > 0 else 9)
+        return len(dumps_compact(value))
+
+    def item_size(self, key: str, value: Any) -> int:
+        """单个键值对的长度（"key":value）"""
+        return self.key_size(key) + self.value_size(value)
+
+    def entry_size(self, entry: Dict[str, Any]) -> int:
+        """单个条目的长度"""
+        values = entry["values"]
+        items = sum(self.item_size(key, value) for key, value in values.items())
+        return _ENTRY_OVERHEAD + len(str(entry["ts"])) + items + max(len(values) - 1, 0)
+
+
+def split_entries(entries: List[Dict[str, Any]],
+                  max_bytes: int,
+                  estimator: PayloadSizeEstimator = None) -> List[List[Dict[str, Any]]]:
+    """
+    将遥测条目按顺序拆分为多个负载
+
+    条目按原有顺序装入负载，装不下时开始下一个负载；
+    单个条目本身超过上限时，将其键值对拆分为多个时间戳相同的条目。
+
+    Args:
+        entries: [{"ts": ts, "values": {...}}, ...] 格式的条目列表
+        max_bytes: 单个负载的最大字节数
+        estimator: 大小估算器，可选
+
+    Returns:
+        List[List[Dict[str, Any]]]: 负载列表，每个负载为条目列表
+
+    Raises:
+        ValidationError: 单个键值对本身超过上限时抛出
+    """
+    estimator = estimator or PayloadSizeEstimator()
+
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    # 单个条目以对象发送，多个条目以数组发送（外加方括号和逗号）
+    current_size = 0
+
+    def _payload_size(size: int, count: int) -> int:
+        return size if count <= 1 else size + count + 1
+
+    for entry in entries:
+        size = estimator.entry_size(entry)
+
+        if _payload_size(size, 1) > max_bytes:
+            if current:
+                chunks.append(current)
+                current, current_size = [], 0
+            chunks.extend([piece] for piece in _split_entry(entry, max_bytes, estimator))
+            continue
+
+        if current and _payload_size(current_size + size, len(current) + 1) > max_bytes:
+            chunks.append(current)
+            current, current_size = [], 0
+
+        current.append(entry)
+        current_size += size
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_entry(entry: Dict[str, Any],
+                 max_bytes: int,
+                 estimator: PayloadSizeEstimator) -> List[Dict[str, Any]]:
+    """将超过上限的单个条目按键值对拆分为多个时间戳相同的条目"""
+    ts = entry["ts"]
+    base = _ENTRY_OVERHEAD + len(str(ts))
+
+    pieces: List[Dict[str, Any]] = []
+    values: Dict[str, Any] = {}
+    size = base
+
+    for key, value in entry["values"].items():
+        item = estimator.item_size(key, value)
+        if base + item > max_bytes:
+            raise ValidationError(
+                field_name=str(key),
+                expected_type=f"序列化后不超过 {max_bytes} 字节的数据点",
+                actual_value=f"{base + item} 字节",
+                message="单个遥测数据点超过负载大小上限"
+            )
+
+        separator = 1 if values else 0
+        if size + separator + item > max_bytes:
+            pieces.append({"ts": ts, "values": values})
+            values, size, separator = {}, base, 0
+
+        values[key] = value
+        size += separator + item
+
+    if values:
+        pieces.append({"ts": ts, "values": values})
+    return pieces
+
+
+def build_payloads(entries: List[Dict[str, Any]],
+                   max_bytes: int) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    拆分并序列化遥测条目
+
+    Args:
+        entries: 按时间戳分组的遥测条目
+        max_bytes: 单个负载的最大字节数
+
+    Returns:
+        List[Tuple[str, List[Dict[str, Any]]]]: [(JSON 请求体, 对应的条目列表), ...]
+    """
+    payloads = []
+    for chunk in split_entries(entries, max_bytes):
+        body = dumps_compact(chunk[0] if len(chunk) == 1 else chunk)
+        payloads.append((body, chunk))
+    return payloads
@@ -6,12 +6,19 @@ thingsboardlink 遥测服务模块
 """
 
 import time
-from typing import List, Optional, Dict, Any, Union
+import weakref
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Dict, Any, Union, Iterator, Tuple
 
-from ..models import TelemetryData, TimeseriesData
-from ..exceptions import ValidationError, TelemetryError, NotFoundError
+from ..models import TelemetryData, TimeseriesData, AttributeScope, BulkTelemetryResult, ChunkedTelemetryResult
+from ..exceptions import ValidationError, TelemetryError, NotFoundError, APIError, PartialTelemetryError
+from ..frames import is_columnar_input, columns_to_entries
+from .telemetry_payload import build_payloads
+from ..tracing import trace_service, propagate_context, untraced
 
 
+@trace_service
 class TelemetryService:
     """
     遥测服务类
@@ -20,6 +27,12 @@ class TelemetryService:
     包括数据上传、最新数据获取、历史数据查询等功能。
     """
 
+    # ThingsBoard HTTP 传输默认的最大负载大小（transport.http.max_payload_size）
+    DEFAULT_MAX_PAYLOAD_BYTES = 65536
+
+    # 拆分上传时默认的最大在途请求数
+    DEFAULT_MAX_IN_FLIGHT = 4
+
     def __init__(self, client):
         """
         初始化遥测服务
@@ -29,17 +42,37 @@ class TelemetryService:
         """
         self.client = client
 
+        # 由本服务创建的批处理器，客户端关闭时统一发送剩余数据
+        self._batchers = weakref.WeakSet()
+
+        # 由本服务创建的发件箱，客户端关闭时统一关闭（未发送的数据保留在磁盘上）
+        self._outboxes = weakref.WeakSet()
+
+        # 由本服务创建的 MQTT 发布器，客户端关闭时统一断开连接
+        self._mqtt_publishers = weakref.WeakSet()
+
+        # 死区过滤器，为空时上传所有数据点
+        self.deadband = None
+
+        # 自适应并发控制器，为空时按 max_workers / max_in_flight 固定并发
+        self.concurrency = None
+
+        # 由本服务创建的时间序列缓存，客户端关闭时统一关闭
+        self._timeseries_caches = weakref.WeakSet()
+
     def post_telemetry(self,
                        device_id: str,
                        telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
-                       timestamp: Optional[int] = None) -> bool:
+                       timestamp: Optional[int] = None,
+                       ts_column: str = "ts") -> bool:
         """
         上传遥测数据
 
         Args:
             device_id: 设备 ID
-            telemetry_data: 遥测数据
+            telemetry_data: 遥测数据，也可以是表格数据（见 post_telemetry_with_device_token）
             timestamp: 时间戳（毫秒），可选
+            ts_column: 表格数据的时间戳列名
 
         Returns:
             bool: 上传是否成功
@@ -56,7 +89,7 @@ class TelemetryService:
                 message="设备 ID 不能为空"
             )
 
-        if not telemetry_data:
+        if not is_columnar_input(telemetry_data, ts_column) and not telemetry_data:
             raise ValidationError(
                 field_name="telemetry_data",
                 expected_type="非空数据",
@@ -64,9 +97,15 @@ class TelemetryService:
                 message="遥测数据不能为空"
             )
 
+        device_service = self.client.device_service
+
         try:
-            # 获取设备凭证
-            credentials = self.client.device_service.get_device_credentials(device_id)
+            # 获取设备凭证（优先使用凭证缓存）
+            cache = device_service.credentials_cache
+            credentials = cache.get(device_id) if cache is not None else None
+            from_cache = credentials is not None
+            if credentials is None:
+                credentials = device_service.get_device_credentials(device_id, use_cache=False)
 
             if not credentials or not credentials.credentials_value:
                 raise TelemetryError(
@@ -74,10 +113,37 @@ class TelemetryService:
                 )
 
             # 使用设备令牌上传遥测数据
+            try:
+                return self.post_telemetry_with_device_token(
+                    device_token=credentials.credentials_value,
+                    telemetry_data=telemetry_data,
+                    timestamp=timestamp,
+                    ts_column=ts_column
+                )
+            except TelemetryError as e:
+                # 缓存的令牌被拒绝说明凭证已失效，刷新凭证后重试一次（刚获取的令牌被拒绝时不重试）
+                if not (from_cache and self._is_unauthorized(e)
+                        and device_service.invalidate_credentials(device_id)):
+                    raise
+                rejected = e
+
+            rejected_token = credentials.credentials_value
+            credentials = device_service.get_device_credentials(device_id, use_cache=False)
+
+            if not credentials or not credentials.credentials_value:
+                raise TelemetryError(
+                    "无法获取设备访问令牌"
+                )
+
+            if credentials.credentials_value == rejected_token:
+                # 服务器上的令牌未变化，重试同样会被拒绝
+                raise rejected
+
             return self.post_telemetry_with_device_token(
                 device_token=credentials.credentials_value,
                 telemetry_data=telemetry_data,
-                timestamp=timestamp
+                timestamp=timestamp,
+                ts_column=ts_column
             )
 
         except Exception as e:
@@ -90,17 +156,30 @@ class TelemetryService:
     def post_telemetry_with_device_token(self,
                                          device_token: str,
                                          telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
-                                         timestamp: Optional[int] = None) -> bool:
+                                         timestamp: Optional[int] = None,
+                                         ts_column: str = "ts") -> bool:
         """
         使用设备令牌上传遥测数据
 
+        除键值对和 TelemetryData 外，还支持表格数据：包含时间戳列和数值列的 pandas DataFrame、
+        NumPy 结构化数组或 {列名: NumPy 数组} 字典，按列向量化转换为多时间戳负载。
+
+        负载超过客户端的 max_payload_bytes 时自动拆分为多个负载按顺序流水线发送，
+        部分负载上传失败时抛出 PartialTelemetryError（包含每个负载的上传结果）。
+
         Args:
             device_token: 设备访问令牌
             telemetry_data: 遥测数据
-            timestamp: 时间戳（毫秒），可选
+            timestamp: 时间戳（毫秒），可选，表格数据使用时间戳列
+            ts_column: 表格数据的时间戳列名（毫秒整数或 datetime 类型）
 
         Returns:
             bool: 上传是否成功
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 上传失败时抛出
+            PartialTelemetryError: 拆分上传时部分负载上传失败时抛出
         """
         if not device_token or not device_token.strip():
             raise ValidationError(
@@ -111,78 +190,587 @@ class TelemetryService:
             )
 
         try:
-            # 统一时间戳
-            if timestamp is None:
-                timestamp = int(time.time() * 1000)
-
-            # 转换数据格式
-            if isinstance(telemetry_data, dict):
-                # 字典格式：{"key1": value1, "key2": value2}
-                payload = {
-                    "ts": timestamp,
-                    "values": telemetry_data
-                }
-            elif isinstance(telemetry_data, TelemetryData):
-                # 单个 TelemetryData 对象
-                payload = telemetry_data.to_dict()
-            elif isinstance(telemetry_data, list):
-                # TelemetryData 对象列表
-                if not telemetry_data:
+            entries = self._group_telemetry(telemetry_data, timestamp, ts_column)
+            return self._send_entries(device_token, entries)
+
+        except Exception as e:
+            if isinstance(e, (ValidationError, TelemetryError)):
+                raise
+            raise TelemetryError(
+                f"上传遥测数据失败: {str(e)}"
+            ) from e
+
+    def post_telemetry_chunked(self,
+                               device_token: str,
+                               telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+                               timestamp: Optional[int] = None,
+                               max_payload_bytes: Optional[int] = None,
+                               max_in_flight: int = 4,
+                               ts_column: str = "ts") -> ChunkedTelemetryResult:
+        """
+        使用设备令牌分块上传遥测数据
+
+        条目按时间戳顺序装入不超过 max_payload_bytes 的负载，负载按顺序提交，
+        同时最多 max_in_flight 个请求在途。单个负载失败不会中断其余负载，
+        失败负载的条目保存在结果中，可直接用于重试。
+
+        Args:
+            device_token: 设备访问令牌
+            telemetry_data: 遥测数据，格式与 post_telemetry_with_device_token 相同
+            timestamp: 时间戳（毫秒），可选
+            max_payload_bytes: 单个负载的最大字节数，为空时使用客户端的 max_payload_bytes
+            max_in_flight: 最大在途请求数
+            ts_column: 表格数据的时间戳列名
+
+        Returns:
+            ChunkedTelemetryResult: 每个负载的上传结果
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if not device_token or not device_token.strip():
+            raise ValidationError(
+                field_name="device_token",
+                expected_type="非空字符串",
+                actual_value=device_token,
+                message="设备令牌不能为空"
+            )
+
+        if max_payload_bytes is None:
+            max_payload_bytes = getattr(self.client, "max_payload_bytes", None) or self.DEFAULT_MAX_PAYLOAD_BYTES
+
+        if max_payload_bytes <= 0:
+            raise ValidationError(
+                field_name="max_payload_bytes",
+                expected_type="正整数",
+                actual_value=max_payload_bytes,
+                message="负载大小上限必须大于 0"
+            )
+
+        if max_in_flight <= 0:
+            raise ValidationError(
+                field_name="max_in_flight",
+                expected_type="正整数",
+                actual_value=max_in_flight,
+                message="最大在途请求数必须大于 0"
+            )
+
+        entries = self._group_telemetry(telemetry_data, timestamp, ts_column)
+        if self.deadband is not None:
+            entries = self.deadband.filter_entries(device_token, entries)
+            if not entries:
+                return ChunkedTelemetryResult()
+
+        payloads = build_payloads(entries, max_payload_bytes)
+        result = self._send_payloads(device_token, payloads, max_in_flight)
+
+        if self.deadband is not None:
+            for failed_entries in result.failed_entries.values():
+                self.deadband.forget_entries(device_token, failed_entries)
+        return result
+
+    def post_telemetry_bulk(self,
+                            telemetry_by_token: Dict[str, Union[Dict[str, Any], List[TelemetryData], TelemetryData]],
+                            timestamp: Optional[int] = None,
+                            max_workers: Optional[int] = None) -> BulkTelemetryResult:
+        """
+        使用设备令牌并发上传多个设备的遥测数据
+
+        请求在线程池中并发发送并共享客户端的 HTTP 连接池，单个设备失败不会影响其他设备。
+        并发数默认等于客户端连接池大小（pool_maxsize），超过该值的线程只会等待或新建无法复用的连接。
+        启用自适应并发时，max_workers 默认为控制器的最大并发上限，实际在途请求数由控制器调整。
+
+        Args:
+            telemetry_by_token: {设备令牌: 遥测数据}，遥测数据格式与 post_telemetry_with_device_token 相同
+            timestamp: 时间戳（毫秒），可选，应用于未指定时间戳的数据
+            max_workers: 最大并发请求数，可选
+
+        Returns:
+            BulkTelemetryResult: 每个设备的上传结果
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if not isinstance(telemetry_by_token, dict):
+            raise ValidationError(
+                field_name="telemetry_by_token",
+                expected_type="Dict[str, 遥测数据]",
+                actual_value=type(telemetry_by_token).__name__
+            )
+
+        if max_workers is None:
+            if self.concurrency is not None:
+                max_workers = self.concurrency.max_limit
+            else:
+                max_workers = getattr(self.client, "pool_maxsize", 10)
+
+        if max_workers <= 0:
+            raise ValidationError(
+                field_name="max_workers",
+                expected_type="正整数",
+                actual_value=max_workers,
+                message="最大并发请求数必须大于 0"
+            )
+
+        result = BulkTelemetryResult()
+        started = time.monotonic()
+
+        # 统一确定时间戳，使所有设备的数据点时间一致
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        # 在提交前完成格式转换，格式错误的设备直接记为失败
+        jobs = {}
+        for device_token, telemetry_data in telemetry_by_token.items():
+            try:
+                if not device_token or not str(device_token).strip():
                     raise ValidationError(
-                        field_name="telemetry_data",
-                        message="遥测数据列表不能为空 | Telemetry data list cannot be empty"
+                        field_name="device_token",
+                        expected_type="非空字符串",
+                        actual_value=device_token,
+                        message="设备令牌不能为空"
                     )
+                jobs[device_token] = self._group_telemetry(telemetry_data, timestamp)
+            except ValidationError as e:
+                result.failed[device_token] = e
+
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)),
+                                    thread_name_prefix="thingsboardlink-telemetry-bulk") as executor:
+                # 已按设备并发，单个设备的拆分负载依次发送
+                futures = {
+                    executor.submit(propagate_context(self._send_entries), device_token, entries, 1): device_token
+                    for device_token, entries in jobs.items()
+                }
 
-                # 按时间戳分组数据
-                grouped_data = {}
-                for item in telemetry_data:
-                    if not isinstance(item, TelemetryData):
-                        raise ValidationError(
-                            field_name="telemetry_data",
-                            expected_type="TelemetryData 对象列表 | List of TelemetryData objects",
-                            actual_value=type(item).__name__
-                        )
-
-                    ts = item.timestamp or timestamp
-                    if ts not in grouped_data:
-                        grouped_data[ts] = {}
-                    grouped_data[ts][item.key] = item.value
-
-                # 转换为 API 格式
-                if len(grouped_data) == 1:
-                    # 单个时间戳
-                    ts, values = next(iter(grouped_data.items()))
-                    payload = {"ts": ts, "values": values}
-                else:
-                    # 多个时间戳
-                    payload = [
-                        {"ts": ts, "values": values}
-                        for ts, values in grouped_data.items()
-                    ]
-            else:
+                for future in as_completed(futures):
+                    device_token = futures[future]
+                    try:
+                        future.result()
+                        result.succeeded.append(device_token)
+                    except Exception as e:
+                        if not isinstance(e, TelemetryError):
+                            error = TelemetryError(f"上传遥测数据失败: {str(e)}")
+                            error.__cause__ = e
+                            e = error
+                        result.failed[device_token] = e
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    @staticmethod
+    def _group_telemetry(telemetry_data: Union[Dict[str, Any], List[TelemetryData], TelemetryData],
+                         timestamp: Optional[int] = None,
+                         ts_column: str = "ts") -> List[Dict[str, Any]]:
+        """
+        将遥测数据转换为按时间戳分组的 API 条目列表
+
+        Args:
+            telemetry_data: 遥测数据
+            timestamp: 时间戳（毫秒），可选
+            ts_column: 表格数据的时间戳列名
+
+        Returns:
+            List[Dict[str, Any]]: [{"ts": ts, "values": {...}}, ...] 格式的条目列表
+
+        Raises:
+            ValidationError: 数据格式不正确时抛出
+        """
+        # 表格数据：按列向量化分组
+        if is_columnar_input(telemetry_data, ts_column):
+            return columns_to_entries(telemetry_data, ts_column)
+
+        # 统一时间戳
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        # 转换数据格式
+        if isinstance(telemetry_data, dict):
+            # 字典格式：{"key1": value1, "key2": value2}
+            return [{"ts": timestamp, "values": telemetry_data}]
+        elif isinstance(telemetry_data, TelemetryData):
+            # 单个 TelemetryData 对象
+            return [telemetry_data.to_dict()]
+        elif isinstance(telemetry_data, list):
+            # TelemetryData 对象列表
+            if not telemetry_data:
                 raise ValidationError(
                     field_name="telemetry_data",
-                    expected_type="Dict, TelemetryData 或 List[TelemetryData] | Dict, TelemetryData or List[TelemetryData]",
-                    actual_value=type(telemetry_data).__name__
+                    message="遥测数据列表不能为空 | Telemetry data list cannot be empty"
                 )
 
-            # ThingsBoard 设备遥测数据上传端点
-            response = self.client.post(f"/api/v1/{device_token}/telemetry", data=payload)
+            # 按时间戳分组数据
+            grouped_data = {}
+            for item in telemetry_data:
+                if not isinstance(item, TelemetryData):
+                    raise ValidationError(
+                        field_name="telemetry_data",
+                        expected_type="TelemetryData 对象列表 | List of TelemetryData objects",
+                        actual_value=type(item).__name__
+                    )
+
+                ts = item.timestamp or timestamp
+                if ts not in grouped_data:
+                    grouped_data[ts] = {}
+                grouped_data[ts][item.key] = item.value
 
-            if response.status_code == 200:
-                return True
+            return [
+                {"ts": ts, "values": values}
+                for ts, values in grouped_data.items()
+            ]
+        else:
+            raise ValidationError(
+                field_name="telemetry_data",
+                expected_type="Dict, TelemetryData 或 List[TelemetryData] | Dict, TelemetryData or List[TelemetryData]",
+                actual_value=type(telemetry_data).__name__
+            )
+
+    def _send_entries(self,
+                      device_token: str,
+                      entries: List[Dict[str, Any]],
+                      max_in_flight: Optional[int] = None) -> bool:
+        """
+        将遥测条目发送到设备遥测端点
+
+        设备 API 通过 URL 中的设备令牌认证，因此不需要用户 JWT。
+        启用死区过滤时先过滤条目，全部被过滤时不发送请求；
+        客户端设置了 max_payload_bytes 时，超过上限的条目被拆分为多个负载发送。
+
+        Args:
+            device_token: 设备访问令牌
+            entries: 按时间戳分组的遥测条目
+            max_in_flight: 拆分发送时的最大在途请求数，为空时使用默认值
+
+        Returns:
+            bool: 上传是否成功
+
+        Raises:
+            TelemetryError: 上传失败时抛出
+            PartialTelemetryError: 拆分发送时部分负载上传失败时抛出
+        """
+        deadband = self.deadband
+        if deadband is None:
+            return self._send_unfiltered(device_token, entries, max_in_flight)
+
+        entries = deadband.filter_entries(device_token, entries)
+        if not entries:
+            return True
+
+        try:
+            return self._send_unfiltered(device_token, entries, max_in_flight)
+        except Exception:
+            # 上传失败的数据点未到达服务器，清除发送记录使这些键的下一个数据点重新发送
+            deadband.forget_entries(device_token, entries)
+            raise
+
+    def _send_unfiltered(self,
+                         device_token: str,
+                         entries: List[Dict[str, Any]],
+                         max_in_flight: Optional[int] = None) -> bool:
+        """发送遥测条目（不经过死区过滤），必要时拆分为多个负载"""
+        max_payload_bytes = getattr(self.client, "max_payload_bytes", None)
+        if not max_payload_bytes:
+            return self._post_payload(device_token, self._entries_payload(entries))
+
+        payloads = build_payloads(entries, max_payload_bytes)
+        if len(payloads) == 1:
+            return self._post_payload(device_token, payloads[0][0])
+
+        if max_in_flight is None:
+            if self.concurrency is not None:
+                max_in_flight = self.concurrency.max_limit
             else:
-                raise TelemetryError(
-                    f"遥测数据上传失败，状态码: {response.status_code}"
-                )
+                max_in_flight = self.DEFAULT_MAX_IN_FLIGHT
+        result = self._send_payloads(device_token, payloads, max_in_flight)
+        if not result.all_succeeded:
+            first_error = result.failed[min(result.failed)]
+            raise PartialTelemetryError(
+                f"遥测数据部分上传失败: {result.failure_count}/{result.chunks} 个负载失败",
+                result=result
+            ) from first_error
+        return True
+
+    def _post_payload(self, device_token: str, payload: Union[str, Dict[str, Any], List[Dict[str, Any]]]) -> bool:
+        """
+        发送单个遥测负载
 
-        except Exception as e:
-            if isinstance(e, (ValidationError, TelemetryError)):
-                raise
+        Args:
+            device_token: 设备访问令牌
+            payload: 负载（已序列化的 JSON 字符串或可序列化对象）
+
+        Returns:
+            bool: 上传是否成功
+
+        Raises:
+            TelemetryError: 上传失败时抛出
+        """
+        # ThingsBoard 设备遥测数据上传端点
+        response = self._call(
+            self.client.post,
+            f"/api/v1/{device_token}/telemetry",
+            data=payload,
+            require_auth=False
+        )
+
+        if response.status_code == 200:
+            return True
+        else:
             raise TelemetryError(
-                f"上传遥测数据失败: {str(e)}"
+                f"遥测数据上传失败，状态码: {response.status_code}"
             )
 
+    def _send_payloads(self,
+                       device_token: str,
+                       payloads: List[Tuple[str, List[Dict[str, Any]]]],
+                       max_in_flight: int) -> ChunkedTelemetryResult:
+        """
+        按顺序流水线发送多个负载
+
+        负载按顺序提交到线程池，最多 max_in_flight 个请求同时在途，不等待前一个负载的响应。
+
+        Args:
+            device_token: 设备访问令牌
+            payloads: [(JSON 请求体, 条目列表), ...]
+            max_in_flight: 最大在途请求数
+
+        Returns:
+            ChunkedTelemetryResult: 每个负载的上传结果
+        """
+        result = ChunkedTelemetryResult(chunks=len(payloads))
+        started = time.monotonic()
+
+        def _record(index: int, error: Optional[Exception]):
+            body, chunk = payloads[index]
+            if error is None:
+                result.succeeded.append(index)
+                result.bytes_sent += len(body)
+            else:
+                if not isinstance(error, TelemetryError):
+                    wrapped = TelemetryError(f"上传遥测数据失败: {str(error)}")
+                    wrapped.__cause__ = error
+                    error = wrapped
+                result.failed[index] = error
+                result.failed_entries[index] = chunk
+
+        workers = min(max_in_flight, len(payloads), getattr(self.client, "pool_maxsize", max_in_flight))
+        if workers <= 1:
+            for index, (body, _) in enumerate(payloads):
+                try:
+                    self._post_payload(device_token, body)
+                    _record(index, None)
+                except Exception as e:
+                    _record(index, e)
+        else:
+            with ThreadPoolExecutor(max_workers=workers,
+                                    thread_name_prefix="thingsboardlink-telemetry-chunks") as executor:
+                # 线程池按提交顺序开始执行，保证负载按顺序发出
+                futures = [executor.submit(propagate_context(self._post_payload), device_token, body) for body, _ in payloads]
+                for index, future in enumerate(futures):
+                    try:
+                        future.result()
+                        _record(index, None)
+                    except Exception as e:
+                        _record(index, e)
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def _call(self, func, *args, **kwargs):
+        """调用 func，启用自适应并发时在控制器的并发许可内执行"""
+        concurrency = self.concurrency
+        if concurrency is None:
+            return func(*args, **kwargs)
+        return concurrency.run(func, *args, **kwargs)
+
+    @staticmethod
+    def _entries_payload(entries: List[Dict[str, Any]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        将遥测条目转换为设备 API 负载格式：单个时间戳使用对象，多个时间戳使用数组
+
+        Args:
+            entries: 按时间戳分组的遥测条目
+
+        Returns:
+            Union[Dict[str, Any], List[Dict[str, Any]]]: 设备 API 负载
+        """
+        return entries[0] if len(entries) == 1 else entries
+
+    @staticmethod
+    def _is_unauthorized(error: Exception) -> bool:
+        """
+        判断遥测上传错误是否由设备令牌无效引起
+
+        Args:
+            error: 上传时抛出的异常
+
+        Returns:
+            bool: 是否为 401 未授权错误
+        """
+        cause = error.__cause__
+        # 拆分上传的部分失败异常以首个失败负载的 TelemetryError 为原因
+        while isinstance(cause, TelemetryError):
+            cause = cause.__cause__
+        return isinstance(cause, APIError) and cause.status_code == 401
+
+    def create_batcher(self, **kwargs):
+        """
+        创建遥测批处理器
+
+        批处理器按设备令牌聚合数据点，并在后台线程中以多时间戳负载发送。
+        客户端关闭时会自动发送所有剩余数据。
+
+        Args:
+            **kwargs: 传递给 TelemetryBatcher 的参数
+
+        Returns:
+            TelemetryBatcher: 遥测批处理器实例
+        """
+        from .telemetry_batcher import TelemetryBatcher
+
+        batcher = TelemetryBatcher(self, **kwargs)
+        self._batchers.add(batcher)
+        return batcher
+
+    def create_outbox(self, path: str, **kwargs):
+        """
+        创建持久化遥测发件箱
+
+        写入发件箱的数据保存在本地 SQLite 数据库中，由后台线程按写入顺序发送，
+        服务器不可达期间的数据在连接恢复后补发。
+
+        Args:
+            path: SQLite 数据库文件路径
+            **kwargs: 传递给 TelemetryOutbox 的参数
+
+        Returns:
+            TelemetryOutbox: 遥测发件箱实例
+        """
+        from .telemetry_outbox import TelemetryOutbox
+
+        outbox = TelemetryOutbox(self, path, **kwargs)
+        self._outboxes.add(outbox)
+        return outbox
+
+    def create_mqtt_publisher(self, device_token: str, host: Optional[str] = None, **kwargs):
+        """
+        创建设备 MQTT 发布器
+
+        通过设备 MQTT API 持续上传遥测数据和属性，发布无需等待 HTTP 响应。
+
+        Args:
+            device_token: 设备访问令牌
+            host: MQTT 服务器地址，为空时使用客户端基础 URL 的主机名
+            **kwargs: 传递给 MqttDevicePublisher 的参数（port、qos、max_inflight 等），
+                默认使用本服务的死区过滤器
+
+        Returns:
+            MqttDevicePublisher: 设备 MQTT 发布器实例（尚未连接）
+        """
+        from .mqtt_transport import MqttDevicePublisher
+
+        if host is None:
+            host = urlparse(self.client.base_url).hostname
+
+        kwargs.setdefault("deadband", self.deadband)
+        publisher = MqttDevicePublisher(host, device_token, **kwargs)
+        self._mqtt_publishers.add(publisher)
+        return publisher
+
+    def create_timeseries_cache(self, path: str = ":memory:", **kwargs):
+        """
+        创建时间序列本地缓存
+
+        缓存记录已获取的时间区间，重复或重叠的查询只向服务器请求缺失的子区间。
+
+        Args:
+            path: SQLite 数据库文件路径，默认为内存数据库
+            **kwargs: 传递给 TimeseriesCache 的参数（max_bytes、max_age、settle_time 等）
+
+        Returns:
+            TimeseriesCache: 时间序列缓存实例
+        """
+        from .timeseries_cache import TimeseriesCache
+
+        cache = TimeseriesCache(self, path, **kwargs)
+        self._timeseries_caches.add(cache)
+        return cache
+
+    def enable_deadband(self,
+                        absolute: Optional[float] = None,
+                        relative: Optional[float] = None,
+                        heartbeat: Optional[float] = None,
+                        **kwargs):
+        """
+        启用死区过滤（按例外报告）
+
+        启用后，所有经由本服务上传的遥测数据（post_telemetry、批量上传、批处理器、发件箱，
+        以及之后创建的 MQTT 发布器）都会先经过过滤：变化量未超过阈值的数据点不再上传，
+        并按心跳间隔强制发送。
+
+        Args:
+            absolute: 绝对死区
+            relative: 相对死区（如 0.01 表示 1%）
+            heartbeat: 心跳间隔（秒），为空时不强制发送
+            **kwargs: 传递给 DeadbandFilter 的其他参数（key_thresholds、max_series）
+
+        Returns:
+            DeadbandFilter: 死区过滤器实例
+        """
+        from .deadband_filter import DeadbandFilter
+
+        self.deadband = DeadbandFilter(absolute=absolute, relative=relative, heartbeat=heartbeat, **kwargs)
+        return self.deadband
+
+    def disable_deadband(self):
+        """停用死区过滤"""
+        self.deadband = None
+
+    def enable_adaptive_concurrency(self,
+                                    initial_limit: Optional[int] = None,
+                                    max_limit: Optional[int] = None,
+                                    **kwargs):
+        """
+        启用自适应并发控制（AIMD）
+
+        启用后，设备遥测上传（批量上传、拆分上传、批处理器和发件箱）以及分段获取时间序列
+        共享一个并发控制器：请求正常时逐步增加在途请求数，遇到 429、5xx、超时或延迟突增时成倍减少。
+
+        Args:
+            initial_limit: 初始并发上限，默认为 DEFAULT_MAX_IN_FLIGHT 与 max_limit 的较小值
+            max_limit: 最大并发上限，默认为客户端连接池大小（pool_maxsize）
+            **kwargs: 传递给 ConcurrencyController 的其他参数（min_limit、increase、decrease_factor 等）
+
+        Returns:
+            ConcurrencyController: 并发控制器实例，stats 属性提供当前上限和吞吐量
+        """
+        from .concurrency import ConcurrencyController
+
+        if max_limit is None:
+            max_limit = getattr(self.client, "pool_maxsize", 10)
+        if initial_limit is None:
+            initial_limit = max(min(self.DEFAULT_MAX_IN_FLIGHT, max_limit), kwargs.get("min_limit", 1))
+
+        self.concurrency = ConcurrencyController(initial_limit=initial_limit, max_limit=max_limit, **kwargs)
+        return self.concurrency
+
+    def disable_adaptive_concurrency(self):
+        """停用自适应并发控制"""
+        self.concurrency = None
+
+    def close(self):
+        """关闭由本服务创建的所有批处理器（发送剩余数据）、发件箱、MQTT 发布器和时间序列缓存"""
+        for batcher in list(self._batchers):
+            batcher.close()
+
+        for outbox in list(self._outboxes):
+            outbox.close()
+
+        for publisher in list(self._mqtt_publishers):
+            publisher.close()
+
+        for cache in list(self._timeseries_caches):
+            cache.close()
+
     def get_latest_telemetry(self,
                              device_id: str,
                              keys: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -242,6 +830,182 @@ class TelemetryService:
                 f"获取最新遥测数据失败: {str(e)}"
             )
 
+    # AttributeScope 与 Entity Data Query 中属性键类型的对应关系
+    _ATTRIBUTE_KEY_TYPES = {
+        AttributeScope.CLIENT_SCOPE: "CLIENT_ATTRIBUTE",
+        AttributeScope.SERVER_SCOPE: "SERVER_ATTRIBUTE",
+        AttributeScope.SHARED_SCOPE: "SHARED_ATTRIBUTE"
+    }
+
+    def get_latest_telemetry_bulk(self,
+                                  timeseries_keys: Optional[List[str]] = None,
+                                  attribute_keys: Optional[List[str]] = None,
+                                  device_ids: Optional[List[str]] = None,
+                                  device_type: Optional[Union[str, List[str]]] = None,
+                                  name_filter: Optional[str] = None,
+                                  attribute_scope: Optional[AttributeScope] = None,
+                                  page_size: int = 1000,
+                                  max_pages: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取多个设备的最新遥测数据和属性
+
+        基于 Entity Data Query API（/api/entitiesQuery/find），一次分页查询即可替代逐设备调用 get_latest_telemetry。
+        设备过滤条件：device_ids（设备 ID 列表）与 device_type / name_filter 二选一；
+        只提供 name_filter 时按名称前缀匹配所有设备；均未提供时查询租户下所有设备。
+
+        Args:
+            timeseries_keys: 遥测数据键列表
+            attribute_keys: 属性键列表
+            device_ids: 设备 ID 列表
+            device_type: 设备类型（或类型列表）
+            name_filter: 设备名称过滤（前缀匹配）
+            attribute_scope: 属性范围，为空时匹配任意范围
+            page_size: 每页设备数量
+            max_pages: 最大查询页数，为空时查询全部
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 以设备 ID 为键的字典，每项包含 name、type、
+            timeseries 和 attributes（后两者格式为 {键: {"value": ..., "timestamp": ...}}，缺失的键不出现）
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 查询失败时抛出
+        """
+        if not timeseries_keys and not attribute_keys:
+            raise ValidationError(
+                field_name="timeseries_keys/attribute_keys",
+                expected_type="非空列表",
+                message="遥测数据键和属性键不能同时为空"
+            )
+
+        if device_ids is not None and (device_type or name_filter):
+            raise ValidationError(
+                field_name="device_ids",
+                message="device_ids 不能与 device_type 或 name_filter 同时使用"
+            )
+
+        if device_ids is not None and not device_ids:
+            return {}
+
+        if page_size <= 0:
+            raise ValidationError(
+                field_name="page_size",
+                expected_type="正整数",
+                actual_value=page_size,
+                message="页面大小必须大于 0"
+            )
+
+        if attribute_scope is not None and not isinstance(attribute_scope, AttributeScope):
+            raise ValidationError(
+                field_name="attribute_scope",
+                expected_type="AttributeScope 枚举",
+                actual_value=type(attribute_scope).__name__,
+                message="attribute_scope 必须是 AttributeScope 枚举类型"
+            )
+
+        # 构建实体过滤器
+        if device_ids:
+            entity_filter = {
+                "type": "entityList",
+                "entityType": "DEVICE",
+                "entityList": [device_id.strip() for device_id in device_ids]
+            }
+        elif device_type:
+            device_types = [device_type] if isinstance(device_type, str) else list(device_type)
+            entity_filter = {
+                "type": "deviceType",
+                "deviceType": device_types[0],
+                "deviceTypes": device_types,
+                "deviceNameFilter": name_filter or ""
+            }
+        elif name_filter:
+            entity_filter = {
+                "type": "entityName",
+                "entityType": "DEVICE",
+                "entityNameFilter": name_filter
+            }
+        else:
+            entity_filter = {
+                "type": "entityType",
+                "entityType": "DEVICE"
+            }
+
+        attribute_key_type = self._ATTRIBUTE_KEY_TYPES.get(attribute_scope, "ATTRIBUTE")
+
+        latest_values = [{"type": "TIME_SERIES", "key": key} for key in timeseries_keys or []]
+        latest_values += [{"type": attribute_key_type, "key": key} for key in attribute_keys or []]
+
+        query = {
+            "entityFilter": entity_filter,
+            "entityFields": [
+                {"type": "ENTITY_FIELD", "key": "name"},
+                {"type": "ENTITY_FIELD", "key": "type"}
+            ],
+            "latestValues": latest_values,
+            "pageLink": {
+                "page": 0,
+                "pageSize": page_size,
+                "sortOrder": {
+                    "key": {"type": "ENTITY_FIELD", "key": "createdTime"},
+                    "direction": "ASC"
+                }
+            }
+        }
+
+        result: Dict[str, Dict[str, Any]] = {}
+
+        try:
+            page = 0
+            while max_pages is None or page < max_pages:
+                query["pageLink"]["page"] = page
+                response = self.client.post("/api/entitiesQuery/find", data=query)
+                page_data = response.json()
+
+                for entity in page_data.get("data", []):
+                    device_id = (entity.get("entityId") or {}).get("id")
+                    if not device_id:
+                        continue
+
+                    latest = entity.get("latest") or {}
+                    fields = latest.get("ENTITY_FIELD") or {}
+
+                    result[device_id] = {
+                        "name": (fields.get("name") or {}).get("value"),
+                        "type": (fields.get("type") or {}).get("value"),
+                        "timeseries": self._compact_latest(latest.get("TIME_SERIES")),
+                        "attributes": self._compact_latest(latest.get(attribute_key_type))
+                    }
+
+                if not page_data.get("hasNext"):
+                    break
+                page += 1
+
+            return result
+
+        except Exception as e:
+            if isinstance(e, ValidationError):
+                raise
+            raise TelemetryError(
+                f"批量获取最新遥测数据失败: {str(e)}"
+            ) from e
+
+    @staticmethod
+    def _compact_latest(values: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        将 Entity Data Query 返回的最新值转换为 {键: {"value": ..., "timestamp": ...}}
+
+        服务端对不存在的键返回 ts 为 0 的空值，这些键会被忽略。
+        """
+        result = {}
+        for key, item in (values or {}).items():
+            if not item or not item.get("ts"):
+                continue
+            result[key] = {
+                "value": item.get("value"),
+                "timestamp": item.get("ts")
+            }
+        return result
+
     def get_timeseries_telemetry(self,
                                  device_id: str,
                                  keys: List[str],
@@ -249,10 +1013,14 @@ class TelemetryService:
                                  end_ts: int,
                                  interval: Optional[int] = None,
                                  limit: Optional[int] = None,
-                                 agg: Optional[str] = None) -> Dict[str, TimeseriesData]:
+                                 agg: Optional[str] = None,
+                                 order_by: Optional[str] = None) -> Dict[str, TimeseriesData]:
         """
         获取时间序列遥测数据
 
+        单次请求返回的原始数据点数受 limit 限制（服务端默认 100），超出部分会被截断；
+        长时间范围请使用 fetch_timeseries() 分段获取。
+
         Args:
             device_id: 设备 ID
             keys: 数据键列表
@@ -261,6 +1029,7 @@ class TelemetryService:
             interval: 聚合间隔（毫秒），可选
             limit: 数据点数量限制，可选
             agg: 聚合方式（MIN, MAX, AVG, SUM, COUNT），可选
+            order_by: 排序方式（ASC, DESC），可选
 
         Returns:
             Dict[str, TimeseriesData]: 时间序列数据字典
@@ -306,6 +1075,8 @@ class TelemetryService:
                 params["limit"] = limit
             if agg is not None:
                 params["agg"] = agg.upper()
+            if order_by is not None:
+                params["orderBy"] = order_by.upper()
 
             response = self.client.get(endpoint, params=params)
             telemetry_data = response.json()
@@ -322,8 +1093,217 @@ class TelemetryService:
                 raise
             raise TelemetryError(
                 f"获取时间序列遥测数据失败: {str(e)}"
+            ) from e
+
+    def fetch_timeseries(self,
+                         device_id: str,
+                         keys: List[str],
+                         start_ts: int,
+                         end_ts: int,
+                         limit: int = 10000,
+                         max_workers: int = 4,
+                         order_by: str = "ASC",
+                         **kwargs):
+        """
+        分段并行获取长时间范围的原始时间序列数据
+
+        时间范围按观测到的数据点密度自适应切分为多个窗口并发请求，
+        结果按键合并为有序、去重的 TimeseriesData。
+
+        Args:
+            device_id: 设备 ID
+            keys: 数据键列表
+            start_ts: 开始时间戳（毫秒）
+            end_ts: 结束时间戳（毫秒）
+            limit: 每个窗口请求的数据点数量上限
+            max_workers: 最大并发请求数（启用自适应并发时为上限）
+            order_by: 合并结果的排序方式（ASC, DESC）
+            **kwargs: 传递给 TimeseriesFetcher 的其他参数
+
+        Returns:
+            TimeseriesFetchResult: 合并后的数据、请求数量（windows）和达到 limit 的窗口数量（limit_hit_windows）
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 获取数据失败时抛出
+        """
+        from .timeseries_fetcher import TimeseriesFetcher
+
+        fetcher = TimeseriesFetcher(self, limit=limit, max_workers=max_workers, **kwargs)
+        return fetcher.fetch(device_id, keys, start_ts, end_ts, order_by=order_by)
+
+    @untraced
+    def iter_timeseries(self,
+                        device_id: str,
+                        keys: List[str],
+                        start_ts: int,
+                        end_ts: int,
+                        window_ms: int = 3600 * 1000,
+                        limit: int = 10000,
+                        chunked: bool = False,
+                        prefetch: bool = True) -> Iterator[Union[TelemetryData, Dict[str, TimeseriesData]]]:
+        """
+        按时间窗口流式获取原始时间序列数据
+
+        依次请求 [start_ts, end_ts) 内的各个时间窗口并逐窗口产出数据，内存占用只与窗口大小有关。
+        启用预取时，在调用方处理当前窗口的同时于后台线程请求下一个窗口。
+        某个键在窗口内返回的数据点达到 limit 时，会从其最后一个时间戳之后继续请求该键的剩余数据。
+
+        Args:
+            device_id: 设备 ID
+            keys: 数据键列表
+            start_ts: 开始时间戳（毫秒）
+            end_ts: 结束时间戳（毫秒）
+            window_ms: 时间窗口大小（毫秒）
+            limit: 每次请求的数据点数量上限
+            chunked: 为 True 时每次产出一个 Dict[str, TimeseriesData] 数据块，否则逐个产出 TelemetryData
+            prefetch: 是否预取下一个窗口
+
+        Yields:
+            Union[TelemetryData, Dict[str, TimeseriesData]]: 数据点或数据块，每个键内按时间升序排列
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 获取数据失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not keys:
+            raise ValidationError(
+                field_name="keys",
+                expected_type="非空列表",
+                actual_value=keys,
+                message="数据键列表不能为空"
+            )
+
+        if start_ts >= end_ts:
+            raise ValidationError(
+                field_name="start_ts/end_ts",
+                message="开始时间必须小于结束时间"
+            )
+
+        if window_ms <= 0:
+            raise ValidationError(
+                field_name="window_ms",
+                expected_type="正整数",
+                actual_value=window_ms,
+                message="时间窗口大小必须大于 0"
             )
 
+        if limit <= 0:
+            raise ValidationError(
+                field_name="limit",
+                expected_type="正整数",
+                actual_value=limit,
+                message="数据点数量限制必须大于 0"
+            )
+
+        return self._iter_timeseries(device_id, list(keys), start_ts, end_ts,
+                                     int(window_ms), limit, chunked, prefetch)
+
+    def _iter_timeseries(self,
+                         device_id: str,
+                         keys: List[str],
+                         start_ts: int,
+                         end_ts: int,
+                         window_ms: int,
+                         limit: int,
+                         chunked: bool,
+                         prefetch: bool) -> Iterator[Union[TelemetryData, Dict[str, TimeseriesData]]]:
+        """iter_timeseries 的生成器实现（参数校验在首次迭代前完成）"""
+        # 请求为 (窗口起点, 请求起点, 窗口终点, 键列表)
+        Request = Tuple[int, int, int, List[str]]
+
+        def _fetch(request: Request) -> Dict[str, TimeseriesData]:
+            _, request_start, request_end, request_keys = request
+            return self.get_timeseries_telemetry(
+                device_id=device_id,
+                keys=request_keys,
+                start_ts=request_start,
+                end_ts=request_end,
+                limit=limit,
+                order_by="ASC"
+            )
+
+        def _next_request(request: Request, data: Dict[str, TimeseriesData]) -> Optional[Request]:
+            window_start, request_start, window_end, request_keys = request
+
+            # 数据点达到 limit 的键需要从已返回的最后一个时间戳之后继续请求（每个键的时间戳唯一）
+            full_keys = []
+            resume_ts = None
+            for key in request_keys:
+                series = data.get(key)
+                if series is not None and len(series.values) >= limit:
+                    last_ts = max(point.get("ts", request_start) for point in series.values)
+                    full_keys.append(key)
+                    resume_ts = last_ts + 1 if resume_ts is None else min(resume_ts, last_ts + 1)
+
+            if full_keys and resume_ts < window_end:
+                return window_start, resume_ts, window_end, full_keys
+
+            if window_end >= end_ts:
+                return None
+            return window_end, window_end, min(end_ts, window_end + window_ms), keys
+
+        # 每个键已产出的最后时间戳，用于去除续传请求中的重复数据点
+        emitted_ts: Dict[str, int] = {}
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thingsboardlink-ts-iter") if prefetch else None
+        future = None
+
+        try:
+            request = (start_ts, start_ts, min(end_ts, start_ts + window_ms), keys)
+            if executor is not None:
+                future = executor.submit(propagate_context(_fetch), request)
+
+            while request is not None:
+                data = future.result() if future is not None else _fetch(request)
+                future = None
+
+                next_request = _next_request(request, data)
+                if next_request is not None and executor is not None:
+                    future = executor.submit(propagate_context(_fetch), next_request)
+
+                chunk: Dict[str, TimeseriesData] = {}
+                for key in request[3]:
+                    series = data.get(key)
+                    if series is None or not series.values:
+                        continue
+
+                    last_ts = emitted_ts.get(key)
+                    values = sorted(
+                        (point for point in series.values
+                         if point.get("ts") is not None and (last_ts is None or point["ts"] > last_ts)),
+                        key=lambda point: point["ts"]
+                    )
+                    if values:
+                        emitted_ts[key] = values[-1]["ts"]
+                        chunk[key] = TimeseriesData.from_dict(key, values)
+
+                if chunk:
+                    if chunked:
+                        yield chunk
+                    else:
+                        points = [TelemetryData.from_dict(key, point)
+                                  for key, series in chunk.items() for point in series.values]
+                        points.sort(key=lambda point: point.timestamp)
+                        for point in points:
+                            yield point
+
+                request = next_request
+
+        finally:
+            if future is not None:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
+
     def delete_telemetry(self,
                          device_id: str,
                          keys: List[str],
@@ -0,0 +1,528 @@
+"""
+thingsboardlink 时间序列本地缓存模块
+
+本模块提供基于 SQLite（WAL 模式）的历史遥测数据本地缓存。
+缓存按 (设备, 键) 记录已获取的时间区间，查询时只向服务器请求尚未覆盖的子区间，
+其余数据直接从本地读取。缓存可按总大小（最近最少使用）和数据年龄淘汰。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models import TimeseriesData
+from ..codec import TimeseriesBlockWriter
+from ..exceptions import ValidationError, TelemetryError
+
+# 每个数据点在值之外的估算存储开销（设备 ID、键名引用、时间戳和索引）
+_POINT_OVERHEAD = 48
+
+
+def _subtract_intervals(start_ts: int,
+                        end_ts: int,
+                        covered: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    计算 [start_ts, end_ts) 中未被覆盖的子区间
+
+    Args:
+        start_ts: 开始时间戳
+        end_ts: 结束时间戳（不含）
+        covered: 按开始时间升序排列、互不重叠的已覆盖区间
+
+    Returns:
+        List[Tuple[int, int]]: 未覆盖的子区间列表
+    """
+    gaps = []
+    cursor = start_ts
+    for interval_start, interval_end in covered:
+        if interval_end <= cursor:
+            continue
+        if interval_start >= end_ts:
+            break
+        if interval_start > cursor:
+            gaps.append((cursor, interval_start))
+        cursor = max(cursor, interval_end)
+        if cursor >= end_ts:
+            break
+    if cursor < end_ts:
+        gaps.append((cursor, end_ts))
+    return gaps
+
+
+class TimeseriesCache:
+    """
+    时间序列本地缓存
+
+    get() 的语义与 fetch_timeseries 相同（时间范围为 [start_ts, end_ts)），
+    但已获取过的区间直接从本地读取，只请求缺失的子区间；缺失区间相同的键合并为一次请求。
+
+    - 结束时间晚于"当前时间 - settle_time"的部分不记为已覆盖，设备可能仍在补传这段时间的数据；
+    - max_age：区间获取时间早于该值时视为过期，下次查询时重新获取；
+    - max_bytes：缓存数据总量（估算值）超过该值时，按最近访问时间淘汰整条 (设备, 键) 序列。
+    """
+
+    def __init__(self,
+                 telemetry_service,
+                 path: str = ":memory:",
+                 max_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None,
+                 settle_time: float = 60.0,
+                 limit: int = 10000,
+                 max_workers: int = 4):
+        """
+        初始化时间序列缓存
+
+        Args:
+            telemetry_service: TelemetryService 实例
+            path: SQLite 数据库文件路径，默认为内存数据库
+            max_bytes: 缓存数据总量上限（字节，估算值），为空时不限制
+            max_age: 缓存区间的最长保留时间（秒），为空时不过期
+            settle_time: 最近数据的稳定时间（秒），晚于"当前时间 - settle_time"的数据不缓存覆盖记录
+            limit: 获取缺失区间时每个窗口请求的数据点数量上限
+            max_workers: 获取缺失区间时的最大并发请求数
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValidationError(
+                field_name="max_bytes",
+                expected_type="正整数",
+                actual_value=max_bytes,
+                message="缓存大小上限必须大于 0"
+            )
+
+        if max_age is not None and max_age <= 0:
+            raise ValidationError(
+                field_name="max_age",
+                expected_type="正数",
+                actual_value=max_age,
+                message="缓存保留时间必须大于 0"
+            )
+
+        if settle_time < 0:
+            raise ValidationError(
+                field_name="settle_time",
+                expected_type="非负数",
+                actual_value=settle_time,
+                message="稳定时间不能为负数"
+            )
+
+        self.telemetry_service = telemetry_service
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.settle_time = settle_time
+        self.limit = limit
+        self.max_workers = max_workers
+
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            "device_id TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "ts INTEGER NOT NULL, "
+            "value TEXT NOT NULL, "
+            "PRIMARY KEY (device_id, key, ts)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            "device_id TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "start_ts INTEGER NOT NULL, "
+            "end_ts INTEGER NOT NULL, "
+            "fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (device_id, key, start_ts))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS series ("
+            "device_id TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "bytes INTEGER NOT NULL DEFAULT 0, "
+            "accessed_at REAL NOT NULL, "
+            "PRIMARY KEY (device_id, key))"
+        )
+
+        # 统计信息
+        self._hits = 0
+        self._partial_hits = 0
+        self._misses = 0
+        self._fetched_ranges = 0
+        self._fetched_points = 0
+        self._evicted_series = 0
+
+    def get(self,
+            device_id: str,
+            keys: List[str],
+            start_ts: int,
+            end_ts: int,
+            order_by: str = "ASC") -> Dict[str, TimeseriesData]:
+        """
+        获取时间序列数据，只向服务器请求本地尚未覆盖的子区间
+
+        Args:
+            device_id: 设备 ID
+            keys: 数据键列表
+            start_ts: 开始时间戳（毫秒）
+            end_ts: 结束时间戳（毫秒，不含）
+            order_by: 排序方式（ASC, DESC）
+
+        Returns:
+            Dict[str, TimeseriesData]: 按键组织的时间序列数据（无数据的键不包含在结果中）
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 获取数据失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not keys:
+            raise ValidationError(
+                field_name="keys",
+                expected_type="非空列表",
+                actual_value=keys,
+                message="数据键列表不能为空"
+            )
+
+        if start_ts >= end_ts:
+            raise ValidationError(
+                field_name="start_ts/end_ts",
+                message="开始时间必须小于结束时间"
+            )
+
+        if order_by.upper() not in ("ASC", "DESC"):
+            raise ValidationError(
+                field_name="order_by",
+                expected_type="ASC 或 DESC",
+                actual_value=order_by,
+                message="排序方式必须是 ASC 或 DESC"
+            )
+
+        keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            self._check_open()
+            self._expire()
+
+            # 按缺失区间对键分组，缺失区间完全相同的键合并请求
+            missing: Dict[Tuple[Tuple[int, int], ...], List[str]] = {}
+            for key in keys:
+                gaps = _subtract_intervals(start_ts, end_ts, self._covered(device_id, key, start_ts, end_ts))
+                if not gaps:
+                    self._hits += 1
+                    continue
+                if gaps == [(start_ts, end_ts)]:
+                    self._misses += 1
+                else:
+                    self._partial_hits += 1
+                missing.setdefault(tuple(gaps), []).append(key)
+
+        # 请求期间不持有锁，其他线程可以继续读取缓存
+        for gaps, gap_keys in missing.items():
+            for gap_start, gap_end in gaps:
+                self._fetch_range(device_id, gap_keys, gap_start, gap_end)
+
+        with self._lock:
+            self._check_open()
+            result = {}
+            for key in keys:
+                values = self._read(device_id, key, start_ts, end_ts, order_by.upper() == "DESC")
+                if values:
+                    result[key] = TimeseriesData.from_dict(key, values)
+            self._touch(device_id, keys)
+            self._evict_to_size()
+            return result
+
+    def _fetch_range(self, device_id: str, keys: List[str], start_ts: int, end_ts: int):
+        """从服务器获取 [start_ts, end_ts) 的数据并写入缓存"""
+        fetched = self.telemetry_service.fetch_timeseries(
+            device_id, keys, start_ts, end_ts,
+            limit=self.limit, max_workers=self.max_workers
+        )
+
+        # 最近的数据可能仍有设备补传，覆盖记录截止到稳定时间点
+        settled_end = min(end_ts, int((time.time() - self.settle_time) * 1000))
+        fetched_at = time.time()
+
+        with self._lock:
+            self._check_open()
+            self._conn.execute("BEGIN")
+            try:
+                for key in keys:
+                    series = fetched.data.get(key)
+                    rows = [
+                        (device_id, key, int(point["ts"]), json.dumps(point.get("value")))
+                        for point in (series.values if series is not None else [])
+                        if point.get("ts") is not None
+                    ]
+                    # 替换区间内的旧数据，服务器端已删除的数据点不会残留
+                    self._delete_points(device_id, key, start_ts, end_ts)
+                    if rows:
+                        self._conn.executemany(
+                            "INSERT INTO points (device_id, key, ts, value) VALUES (?, ?, ?, ?)", rows
+                        )
+                        self._fetched_points += len(rows)
+
+                    size = sum(len(row[3]) + _POINT_OVERHEAD for row in rows)
+                    self._conn.execute(
+                        "INSERT INTO series (device_id, key, bytes, accessed_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (device_id, key) DO UPDATE SET bytes = bytes + excluded.bytes",
+                        (device_id, key, size, fetched_at)
+                    )
+
+                    if settled_end > start_ts:
+                        self._add_coverage(device_id, key, start_ts, settled_end, fetched_at)
+
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._fetched_ranges += 1
+
+    def _covered(self, device_id: str, key: str, start_ts: int, end_ts: int) -> List[Tuple[int, int]]:
+        """与 [start_ts, end_ts) 相交的已覆盖区间"""
+        return self._conn.execute(
+            "SELECT start_ts, end_ts FROM coverage "
+            "WHERE device_id = ? AND key = ? AND start_ts < ? AND end_ts > ? ORDER BY start_ts",
+            (device_id, key, end_ts, start_ts)
+        ).fetchall()
+
+    def _add_coverage(self, device_id: str, key: str, start_ts: int, end_ts: int, fetched_at: float):
+        """记录覆盖区间，并与相邻或重叠的区间合并（合并后的获取时间取最早值）"""
+        overlapping = self._conn.execute(
+            "SELECT start_ts, end_ts, fetched_at FROM coverage "
+            "WHERE device_id = ? AND key = ? AND start_ts <= ? AND end_ts >= ?",
+            (device_id, key, end_ts, start_ts)
+        ).fetchall()
+
+        for interval_start, interval_end, interval_fetched_at in overlapping:
+            start_ts = min(start_ts, interval_start)
+            end_ts = max(end_ts, interval_end)
+            fetched_at = min(fetched_at, interval_fetched_at)
+
+        self._conn.execute(
+            "DELETE FROM coverage WHERE device_id = ? AND key = ? AND start_ts <= ? AND end_ts >= ?",
+            (device_id, key, end_ts, start_ts)
+        )
+        self._conn.execute(
+            "INSERT INTO coverage (device_id, key, start_ts, end_ts, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (device_id, key, start_ts, end_ts, fetched_at)
+        )
+
+    def _read(self, device_id: str, key: str, start_ts: int, end_ts: int, descending: bool) -> List[Dict[str, Any]]:
+        """读取本地缓存的数据点"""
+        rows = self._conn.execute(
+            "SELECT ts, value FROM points WHERE device_id = ? AND key = ? AND ts >= ? AND ts < ? "
+            f"ORDER BY ts {'DESC' if descending else 'ASC'}",
+            (device_id, key, start_ts, end_ts)
+        ).fetchall()
+        return [{"ts": ts, "value": json.loads(value)} for ts, value in rows]
+
+    def _touch(self, device_id: str, keys: List[str]):
+        """更新序列的最近访问时间"""
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE series SET accessed_at = ? WHERE device_id = ? AND key = ?",
+            [(now, device_id, key) for key in keys]
+        )
+
+    def _expire(self):
+        """删除过期的覆盖区间及其数据点"""
+        if self.max_age is None:
+            return
+
+        cutoff = time.time() - self.max_age
+        expired = self._conn.execute(
+            "SELECT device_id, key, start_ts, end_ts FROM coverage WHERE fetched_at < ?", (cutoff,)
+        ).fetchall()
+        if not expired:
+            return
+
+        self._conn.execute("BEGIN")
+        try:
+            for device_id, key, start_ts, end_ts in expired:
+                self._delete_points(device_id, key, start_ts, end_ts)
+            self._conn.execute("DELETE FROM coverage WHERE fetched_at < ?", (cutoff,))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _delete_points(self, device_id: str, key: str, start_ts: int, end_ts: int):
+        """删除 [start_ts, end_ts) 内的数据点并更新序列大小"""
+        size = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0), COUNT(*) FROM points "
+            "WHERE device_id = ? AND key = ? AND ts >= ? AND ts < ?",
+            (device_id, key, start_ts, end_ts)
+        ).fetchone()
+        self._conn.execute(
+            "DELETE FROM points WHERE device_id = ? AND key = ? AND ts >= ? AND ts < ?",
+            (device_id, key, start_ts, end_ts)
+        )
+        self._conn.execute(
+            "UPDATE series SET bytes = MAX(bytes - ?, 0) WHERE device_id = ? AND key = ?",
+            (size[0] + size[1] * _POINT_OVERHEAD, device_id, key)
+        )
+
+    def _evict_to_size(self):
+        """按最近访问时间淘汰整条序列，直到缓存大小不超过 max_bytes"""
+        if self.max_bytes is None:
+            return
+
+        total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM series").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        candidates = self._conn.execute(
+            "SELECT device_id, key, bytes FROM series ORDER BY accessed_at ASC"
+        ).fetchall()
+
+        self._conn.execute("BEGIN")
+        try:
+            for device_id, key, size in candidates:
+                if total <= self.max_bytes:
+                    break
+                self._drop_series(device_id, key)
+                total -= size
+                self._evicted_series += 1
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _drop_series(self, device_id: str, key: Optional[str] = None):
+        """删除序列的所有数据点、覆盖区间和记录"""
+        condition, params = ("device_id = ?", (device_id,)) if key is None else \
+            ("device_id = ? AND key = ?", (device_id, key))
+        for table in ("points", "coverage", "series"):
+            self._conn.execute(f"DELETE FROM {table} WHERE {condition}", params)
+
+    def invalidate(self, device_id: str, keys: Optional[List[str]] = None):
+        """
+        删除设备的缓存数据
+
+        Args:
+            device_id: 设备 ID
+            keys: 数据键列表，为空时删除该设备的所有键
+        """
+        with self._lock:
+            self._check_open()
+            self._conn.execute("BEGIN")
+            try:
+                if keys is None:
+                    self._drop_series(device_id)
+                else:
+                    for key in keys:
+                        self._drop_series(device_id, key)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self):
+        """删除所有缓存数据"""
+        with self._lock:
+            self._check_open()
+            self._conn.execute("BEGIN")
+            for table in ("points", "coverage", "series"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("COMMIT")
+
+    def evict(self):
+        """立即执行过期和大小淘汰"""
+        with self._lock:
+            self._check_open()
+            self._expire()
+            self._evict_to_size()
+
+    def export_blocks(self,
+                      path: str,
+                      device_id: str,
+                      keys: Optional[List[str]] = None,
+                      start_ts: Optional[int] = None,
+                      end_ts: Optional[int] = None,
+                      block_size: int = 1024) -> int:
+        """
+        将本地缓存的数据导出为压缩分块文件（不发起请求）
+
+        Args:
+            path: 文件路径
+            device_id: 设备 ID
+            keys: 数据键列表，为空时导出该设备的所有键
+            start_ts: 开始时间戳（毫秒，含），为空时不限制
+            end_ts: 结束时间戳（毫秒，不含），为空时不限制
+            block_size: 每个数据块的最大数据点数量
+
+        Returns:
+            int: 写入的数据块数量
+        """
+        start_ts = -(1 << 63) if start_ts is None else start_ts
+        end_ts = (1 << 63) - 1 if end_ts is None else end_ts
+
+        with self._lock:
+            self._check_open()
+            if keys is None:
+                keys = [row[0] for row in self._conn.execute(
+                    "SELECT key FROM series WHERE device_id = ? ORDER BY key", (device_id,)
+                )]
+            series = [
+                TimeseriesData(key=key, values=self._read(device_id, key, start_ts, end_ts, False))
+                for key in keys
+            ]
+
+        with TimeseriesBlockWriter(path, block_size=block_size) as writer:
+            return sum(writer.write(data) for data in series)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            self._check_open()
+            series, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM series"
+            ).fetchone()
+            points = self._conn.execute("SELECT COUNT(*) FROM points").fetchone()[0]
+            return {
+                "series": series,
+                "points": points,
+                "bytes": size,
+                "hits": self._hits,
+                "partial_hits": self._partial_hits,
+                "misses": self._misses,
+                "fetched_ranges": self._fetched_ranges,
+                "fetched_points": self._fetched_points,
+                "evicted_series": self._evicted_series
+            }
+
+    def _check_open(self):
+        if self._conn is None:
+            raise TelemetryError("时间序列缓存已关闭")
+
+    def close(self):
+        """关闭缓存数据库"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.close()
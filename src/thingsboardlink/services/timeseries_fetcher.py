@@ -0,0 +1,297 @@
+"""
+thingsboardlink 时间序列分段获取模块
+
+本模块提供长时间范围历史遥测数据的分段并行获取功能。
+时间范围被切分为多个窗口，窗口大小根据已观测到的数据点密度自适应调整，
+各窗口并发请求后按键合并为有序且去重的时间序列。
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ..models import TimeseriesData
+from ..exceptions import ValidationError, TelemetryError
+from ..tracing import propagate_context
+
+
+@dataclass
+class TimeseriesFetchResult:
+    """
+    分段获取结果
+
+    Attributes:
+        data: 按键合并后的时间序列数据（按时间升序或降序排列）
+        windows: 实际发送的请求数量
+        limit_hit_windows: 返回数据点达到 limit、需要继续请求剩余部分的窗口数量
+            （数据仍然完整，该值较大时说明窗口过大或 limit 过小）
+    """
+    data: Dict[str, TimeseriesData]
+    windows: int = 0
+    limit_hit_windows: int = 0
+
+    @property
+    def limit_hit(self) -> bool:
+        """是否有窗口达到 limit"""
+        return self.limit_hit_windows > 0
+
+
+class _Window:
+    """单个请求窗口，时间范围为 [start_ts, end_ts)"""
+
+    __slots__ = ("start_ts", "end_ts", "keys")
+
+    def __init__(self, start_ts: int, end_ts: int, keys: List[str]):
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.keys = keys
+
+
+class TimeseriesFetcher:
+    """
+    时间序列分段获取器
+
+    将 [start_ts, end_ts] 切分为多个时间窗口并发获取原始数据点：
+
+    - 窗口大小按已完成窗口的数据点密度（取各键最大值）估算，使每个窗口约含 limit * fill_factor 个数据点；
+    - 每个窗口按时间降序请求，若某个键返回的数据点数达到 limit，
+      则只针对这些键继续请求窗口起点到已返回最早时间戳之间的剩余部分，已获取的数据不会丢弃。
+    """
+
+    def __init__(self,
+                 telemetry_service,
+                 limit: int = 10000,
+                 max_workers: int = 4,
+                 initial_window_ms: int = 3600 * 1000,
+                 min_window_ms: int = 1000,
+                 max_window_ms: Optional[int] = None,
+                 fill_factor: float = 0.5):
+        """
+        初始化时间序列分段获取器
+
+        Args:
+            telemetry_service: TelemetryService 实例
+            limit: 每个窗口请求的数据点数量上限
+            max_workers: 最大并发请求数
+            initial_window_ms: 尚未观测到数据点密度时的窗口大小（毫秒）
+            min_window_ms: 最小窗口大小（毫秒）
+            max_window_ms: 最大窗口大小（毫秒），为空时不限制
+            fill_factor: 目标填充率，窗口预计数据点数为 limit * fill_factor
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        if limit <= 0:
+            raise ValidationError(
+                field_name="limit",
+                expected_type="正整数",
+                actual_value=limit,
+                message="数据点数量限制必须大于 0"
+            )
+
+        if max_workers <= 0:
+            raise ValidationError(
+                field_name="max_workers",
+                expected_type="正整数",
+                actual_value=max_workers,
+                message="最大并发请求数必须大于 0"
+            )
+
+        if not 0 < fill_factor <= 1:
+            raise ValidationError(
+                field_name="fill_factor",
+                expected_type="(0, 1] 区间内的数值",
+                actual_value=fill_factor,
+                message="目标填充率必须在 0 到 1 之间"
+            )
+
+        self.telemetry_service = telemetry_service
+        self.limit = limit
+        self.max_workers = max_workers
+        self.initial_window_ms = max(int(initial_window_ms), 1)
+        self.min_window_ms = max(int(min_window_ms), 1)
+        self.max_window_ms = max_window_ms
+        self.fill_factor = fill_factor
+
+    def fetch(self,
+              device_id: str,
+              keys: List[str],
+              start_ts: int,
+              end_ts: int,
+              order_by: str = "ASC") -> TimeseriesFetchResult:
+        """
+        分段获取时间序列数据
+
+        Args:
+            device_id: 设备 ID
+            keys: 数据键列表
+            start_ts: 开始时间戳（毫秒）
+            end_ts: 结束时间戳（毫秒）
+            order_by: 合并结果的排序方式（ASC, DESC）
+
+        Returns:
+            TimeseriesFetchResult: 合并后的数据
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+            TelemetryError: 获取数据失败时抛出
+        """
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        if not keys:
+            raise ValidationError(
+                field_name="keys",
+                expected_type="非空列表",
+                actual_value=keys,
+                message="数据键列表不能为空"
+            )
+
+        if start_ts >= end_ts:
+            raise ValidationError(
+                field_name="start_ts/end_ts",
+                message="开始时间必须小于结束时间"
+            )
+
+        if order_by.upper() not in ("ASC", "DESC"):
+            raise ValidationError(
+                field_name="order_by",
+                expected_type="ASC 或 DESC",
+                actual_value=order_by,
+                message="排序方式必须是 ASC 或 DESC"
+            )
+
+        keys = list(keys)
+        merged: Dict[str, Dict[int, Any]] = {key: {} for key in keys}
+        result = TimeseriesFetchResult(data={})
+
+        cursor = start_ts
+        width = float(self.initial_window_ms)
+        density: Optional[float] = None  # 数据点/毫秒
+        continuations: List[_Window] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="thingsboardlink-ts-fetch") as executor:
+            pending = {}
+
+            try:
+                while cursor < end_ts or continuations or pending:
+                    # 优先提交剩余部分窗口，再按当前窗口大小切分新窗口
+                    while len(pending) < self.max_workers and (continuations or cursor < end_ts):
+                        if continuations:
+                            window = continuations.pop()
+                        else:
+                            window_end = min(end_ts, cursor + max(int(width), self.min_window_ms))
+                            window = _Window(cursor, window_end, keys)
+                            cursor = window_end
+
+                        future = executor.submit(propagate_context(self._fetch_window), device_id, window)
+                        pending[future] = window
+                        result.windows += 1
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        window = pending.pop(future)
+                        window_data = future.result()
+
+                        continuation = self._merge_window(window, window_data, merged)
+                        if continuation is not None:
+                            continuations.append(continuation)
+                            result.limit_hit_windows += 1
+
+                        # 更新数据点密度（指数加权平均）并重新估算窗口大小
+                        observed = self._observed_density(window, window_data)
+                        density = observed if density is None else 0.5 * density + 0.5 * observed
+                        width = self._next_width(width, density)
+
+            except Exception as e:
+                for future in pending:
+                    future.cancel()
+                if isinstance(e, (ValidationError, TelemetryError)):
+                    raise
+                raise TelemetryError(f"分段获取时间序列遥测数据失败: {str(e)}") from e
+
+        reverse = order_by.upper() == "DESC"
+        for key, points in merged.items():
+            if not points:
+                continue
+            values = [{"ts": ts, "value": points[ts]} for ts in sorted(points, reverse=reverse)]
+            result.data[key] = TimeseriesData.from_dict(key, values)
+
+        return result
+
+    def _fetch_window(self, device_id: str, window: _Window) -> Dict[str, TimeseriesData]:
+        """请求单个窗口的数据（按时间降序，保证达到 limit 时保留的是窗口内最新的数据点）"""
+        return self.telemetry_service._call(
+            self.telemetry_service.get_timeseries_telemetry,
+            device_id=device_id,
+            keys=window.keys,
+            start_ts=window.start_ts,
+            end_ts=window.end_ts,
+            limit=self.limit,
+            order_by="DESC"
+        )
+
+    def _merge_window(self,
+                      window: _Window,
+                      window_data: Dict[str, TimeseriesData],
+                      merged: Dict[str, Dict[int, Any]]) -> Optional[_Window]:
+        """
+        合并窗口数据并判断是否需要继续获取剩余部分
+
+        Returns:
+            Optional[_Window]: 达到 limit 的键的剩余部分窗口，无需继续时返回 None
+        """
+        full_keys = []
+        continuation_end = window.start_ts
+
+        for key in window.keys:
+            series = window_data.get(key)
+            if series is None or not series.values:
+                continue
+
+            points = merged.setdefault(key, {})
+            min_ts = None
+            for point in series.values:
+                ts = point.get("ts")
+                if ts is None:
+                    continue
+                points.setdefault(ts, point.get("value"))
+                if min_ts is None or ts < min_ts:
+                    min_ts = ts
+
+            if len(series.values) >= self.limit and min_ts is not None and min_ts > window.start_ts:
+                # 每个键的时间戳唯一，最早时间戳之前（不含）的部分即为尚未获取的剩余数据
+                full_keys.append(key)
+                continuation_end = max(continuation_end, min_ts)
+
+        if not full_keys:
+            return None
+
+        return _Window(window.start_ts, continuation_end, full_keys)
+
+    @staticmethod
+    def _observed_density(window: _Window, window_data: Dict[str, TimeseriesData]) -> float:
+        """计算窗口内单个键的最大数据点密度（数据点/毫秒）"""
+        duration = max(window.end_ts - window.start_ts, 1)
+        max_points = max((len(series.values) for series in window_data.values()), default=0)
+        return max_points / duration
+
+    def _next_width(self, width: float, density: float) -> float:
+        """根据数据点密度估算下一个窗口的大小（毫秒）"""
+        if density > 0:
+            next_width = self.limit * self.fill_factor / density
+        else:
+            # 未观测到数据点时逐步扩大窗口
+            next_width = width * 2
+
+        next_width = max(next_width, float(self.min_window_ms))
+        if self.max_window_ms is not None:
+            next_width = min(next_width, float(self.max_window_ms))
+        return next_width
@@ -0,0 +1,584 @@
+"""
+thingsboardlink 实时订阅模块
+
+本模块提供基于 ThingsBoard WebSocket 接口（/api/ws/plugins/telemetry）的遥测和属性订阅功能。
+单个 WebSocket 连接可承载多个设备、多个数据键的订阅，更新通过回调函数或异步迭代器交付，
+连接断开后自动重连并重新发送所有订阅命令。
+
+需要安装可选依赖 aiohttp：pip install thingsboardlink[async]
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - 可选依赖
+    aiohttp = None
+
+from .models import AttributeScope, TelemetryData
+from .exceptions import ValidationError, ConfigurationError, TimeoutError
+
+
+@dataclass
+class SubscriptionUpdate:
+    """
+    订阅更新
+
+    Attributes:
+        subscription_id: 订阅 ID（即订阅命令的 cmdId）
+        device_id: 设备 ID
+        kind: 订阅类型（TIMESERIES 或 ATTRIBUTES）
+        data: 更新数据 {键: [{"ts": ..., "value": ...}, ...]}
+        received_at: 接收时间（Unix 时间戳，秒）
+    """
+    subscription_id: int
+    device_id: str
+    kind: str
+    data: Dict[str, List[Dict[str, Any]]]
+    received_at: float = field(default_factory=time.time)
+
+    def latest_values(self) -> Dict[str, Any]:
+        """获取每个键的最新值 {键: 值}"""
+        result = {}
+        for key, points in self.data.items():
+            if points:
+                result[key] = max(points, key=lambda point: point.get("ts", 0)).get("value")
+        return result
+
+    def to_telemetry_data(self) -> List[TelemetryData]:
+        """转换为 TelemetryData 列表"""
+        return [TelemetryData.from_dict(key, point)
+                for key, points in self.data.items() for point in points]
+
+
+class Subscription:
+    """
+    单个订阅
+
+    由 TelemetrySubscriber.subscribe() / subscribe_attributes() 创建，调用 unsubscribe() 取消订阅。
+    """
+
+    def __init__(self,
+                 subscriber: "TelemetrySubscriber",
+                 subscription_id: int,
+                 device_id: str,
+                 kind: str,
+                 keys: Optional[List[str]],
+                 scope: str,
+                 callback: Optional[Callable[[SubscriptionUpdate], None]]):
+        self.subscriber = subscriber
+        self.subscription_id = subscription_id
+        self.device_id = device_id
+        self.kind = kind
+        self.keys = keys
+        self.scope = scope
+        self.callback = callback
+
+    def to_command(self, unsubscribe: bool = False) -> Dict[str, Any]:
+        """构建订阅命令"""
+        command = {
+            "entityType": "DEVICE",
+            "entityId": self.device_id,
+            "scope": self.scope,
+            "cmdId": self.subscription_id
+        }
+        if self.keys:
+            command["keys"] = ",".join(self.keys)
+        if unsubscribe:
+            command["unsubscribe"] = True
+        return command
+
+    def unsubscribe(self):
+        """取消订阅"""
+        self.subscriber.unsubscribe(self)
+
+    def __repr__(self) -> str:
+        return (f"Subscription(id={self.subscription_id}, device_id={self.device_id!r}, "
+                f"kind={self.kind!r}, keys={self.keys!r})")
+
+
+# 队列结束标记
+_STOP = object()
+
+
+class TelemetrySubscriber:
+    """
+    WebSocket 遥测订阅客户端
+
+    复用 ThingsBoardClient 或 AsyncThingsBoardClient 的 JWT 令牌建立 WebSocket 连接。
+    既可在事件循环中使用（await start() / async for update in subscriber），
+    也可通过 start_background() 在后台线程中运行并以回调方式接收更新。
+    """
+
+    WS_PATH = "/api/ws/plugins/telemetry"
+
+    def __init__(self,
+                 client,
+                 reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0,
+                 heartbeat: Optional[float] = 30.0,
+                 queue_size: int = 10000,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        初始化订阅客户端
+
+        Args:
+            client: ThingsBoardClient 或 AsyncThingsBoardClient 实例
+            reconnect_delay: 首次重连等待时间（秒），之后指数增长
+            max_reconnect_delay: 最大重连等待时间（秒）
+            heartbeat: WebSocket ping 间隔（秒），为空时不发送
+            queue_size: 异步迭代器队列容量，队列满时丢弃最早的更新，为 0 时不入队
+            on_error: 连接错误或回调异常时的回调
+
+        Raises:
+            ConfigurationError: 未安装 aiohttp 时抛出
+        """
+        if aiohttp is None:
+            raise ConfigurationError(
+                message="订阅客户端需要安装 aiohttp: pip install thingsboardlink[async]",
+                config_key="aiohttp",
+                expected_value="aiohttp>=3.8.0"
+            )
+
+        self.client = client
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self.on_error = on_error
+
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._subscriptions_lock = threading.Lock()
+        self._cmd_ids = itertools.count(1)
+
+        # 以下对象均在事件循环中创建
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ws = None
+        self._connected: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._stopping = False
+
+        # 后台线程模式
+        self._thread: Optional[threading.Thread] = None
+
+        # 统计信息
+        self.connects = 0
+        self.updates_received = 0
+        self.updates_dropped = 0
+        self.last_error: Optional[Exception] = None
+
+    @property
+    def ws_url(self) -> str:
+        """WebSocket 地址（不含令牌）"""
+        base_url = self.client.base_url
+        if base_url.startswith("https://"):
+            base_url = "wss://" + base_url[len("https://"):]
+        elif base_url.startswith("http://"):
+            base_url = "ws://" + base_url[len("http://"):]
+        return base_url + self.WS_PATH
+
+    @property
+    def is_connected(self) -> bool:
+        """WebSocket 是否已连接"""
+        return self._ws is not None and not self._ws.closed
+
+    def subscribe(self,
+                  device_id: str,
+                  keys: Optional[List[str]] = None,
+                  callback: Optional[Callable[[SubscriptionUpdate], None]] = None) -> Subscription:
+        """
+        订阅设备最新遥测数据
+
+        Args:
+            device_id: 设备 ID
+            keys: 数据键列表，为空则订阅所有键
+            callback: 更新回调（在事件循环线程中调用）
+
+        Returns:
+            Subscription: 订阅对象
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        return self._add_subscription(device_id, "TIMESERIES", keys, "LATEST_TELEMETRY", callback)
+
+    def subscribe_attributes(self,
+                             device_id: str,
+                             keys: Optional[List[str]] = None,
+                             scope: Optional[AttributeScope] = None,
+                             callback: Optional[Callable[[SubscriptionUpdate], None]] = None) -> Subscription:
+        """
+        订阅设备属性
+
+        Args:
+            device_id: 设备 ID
+            keys: 属性键列表，为空则订阅所有键
+            scope: 属性范围，为空时订阅客户端属性
+            callback: 更新回调（在事件循环线程中调用）
+
+        Returns:
+            Subscription: 订阅对象
+
+        Raises:
+            ValidationError: 参数验证失败时抛出
+        """
+        scope = scope or AttributeScope.CLIENT_SCOPE
+        if not isinstance(scope, AttributeScope):
+            raise ValidationError(
+                field_name="scope",
+                expected_type="AttributeScope 枚举",
+                actual_value=type(scope).__name__,
+                message="scope 必须是 AttributeScope 枚举类型"
+            )
+        return self._add_subscription(device_id, "ATTRIBUTES", keys, scope.value, callback)
+
+    def _add_subscription(self,
+                          device_id: str,
+                          kind: str,
+                          keys: Optional[List[str]],
+                          scope: str,
+                          callback: Optional[Callable[[SubscriptionUpdate], None]]) -> Subscription:
+        """注册订阅，已连接时立即发送订阅命令"""
+        if not device_id or not device_id.strip():
+            raise ValidationError(
+                field_name="device_id",
+                expected_type="非空字符串",
+                actual_value=device_id,
+                message="设备 ID 不能为空"
+            )
+
+        subscription = Subscription(
+            subscriber=self,
+            subscription_id=next(self._cmd_ids),
+            device_id=device_id.strip(),
+            kind=kind,
+            keys=list(keys) if keys else None,
+            scope=scope,
+            callback=callback
+        )
+
+        with self._subscriptions_lock:
+            self._subscriptions[subscription.subscription_id] = subscription
+
+        self._schedule_send([subscription], unsubscribe=False)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        取消订阅
+
+        Args:
+            subscription: 订阅对象
+        """
+        with self._subscriptions_lock:
+            removed = self._subscriptions.pop(subscription.subscription_id, None)
+
+        if removed is not None:
+            self._schedule_send([removed], unsubscribe=True)
+
+    @property
+    def subscriptions(self) -> List[Subscription]:
+        """当前所有订阅"""
+        with self._subscriptions_lock:
+            return list(self._subscriptions.values())
+
+    def _schedule_send(self, subscriptions: List[Subscription], unsubscribe: bool):
+        """在事件循环中发送订阅命令（可从任意线程调用，未连接时由重连流程统一发送）"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self.is_connected:
+            return
+
+        coroutine = self._send_commands(subscriptions, unsubscribe)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            loop.create_task(coroutine)
+        else:
+            asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    async def _send_commands(self, subscriptions: List[Subscription], unsubscribe: bool = False):
+        """发送订阅或取消订阅命令"""
+        ws = self._ws
+        if ws is None or ws.closed or not subscriptions:
+            return
+
+        payload = {"tsSubCmds": [], "historyCmds": [], "attrSubCmds": []}
+        for subscription in subscriptions:
+            target = "tsSubCmds" if subscription.kind == "TIMESERIES" else "attrSubCmds"
+            payload[target].append(subscription.to_command(unsubscribe=unsubscribe))
+
+        try:
+            await ws.send_str(json.dumps(payload))
+        except Exception as e:
+            # 连接已断开，重连后会重新发送所有订阅
+            self._report_error(e)
+
+    async def start(self, wait_connected: bool = True, timeout: Optional[float] = 10.0):
+        """
+        启动订阅客户端（须在事件循环中调用）
+
+        Args:
+            wait_connected: 是否等待首次连接成功
+            timeout: 等待首次连接的超时时间（秒）
+
+        Raises:
+            TimeoutError: 等待连接超时时抛出
+        """
+        if self._task is not None and not self._task.done():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._connected = asyncio.Event()
+        self._queue = asyncio.Queue(maxsize=self.queue_size) if self.queue_size > 0 else None
+        self._task = self._loop.create_task(self._run())
+
+        if wait_connected:
+            try:
+                await asyncio.wait_for(self._connected.wait(), timeout)
+            except asyncio.TimeoutError:
+                # 停止重连循环：async with 入口失败时不会调用 __aexit__，调用方无法再清理
+                await self.stop()
+                raise TimeoutError(
+                    message="WebSocket 连接超时",
+                    timeout_seconds=timeout,
+                    operation="subscribe"
+                )
+
+    async def stop(self):
+        """停止订阅客户端并关闭连接"""
+        self._stopping = True
+
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._queue is not None:
+            self._put_update(_STOP)
+
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器退出"""
+        await self.stop()
+
+    def __aiter__(self):
+        """异步迭代订阅更新"""
+        return self.updates()
+
+    async def updates(self) -> AsyncIterator[SubscriptionUpdate]:
+        """
+        异步迭代所有订阅的更新，stop() 后结束
+
+        Yields:
+            SubscriptionUpdate: 订阅更新
+        """
+        if self._queue is None:
+            return
+
+        while True:
+            update = await self._queue.get()
+            if update is _STOP:
+                return
+            yield update
+
+    def start_background(self, timeout: Optional[float] = 10.0):
+        """
+        在后台线程的事件循环中启动订阅客户端，更新通过回调交付
+
+        Args:
+            timeout: 等待首次连接的超时时间（秒）
+
+        Raises:
+            TimeoutError: 等待连接超时时抛出
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def _run_loop():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=_run_loop, name="thingsboardlink-subscriber", daemon=True)
+        self._thread.start()
+        started.wait()
+
+        future = asyncio.run_coroutine_threadsafe(self.start(timeout=timeout), loop)
+        try:
+            future.result()
+        except Exception:
+            self.stop_background()
+            raise
+
+    def stop_background(self, timeout: Optional[float] = 10.0):
+        """
+        停止后台线程中的订阅客户端
+
+        Args:
+            timeout: 等待后台线程退出的超时时间（秒）
+        """
+        thread = self._thread
+        loop = self._loop
+        if thread is None or loop is None:
+            return
+
+        if not loop.is_closed():
+            future = asyncio.run_coroutine_threadsafe(self.stop(), loop)
+            try:
+                future.result(timeout)
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+
+        thread.join(timeout)
+        self._thread = None
+
+    async def _get_token(self) -> Optional[str]:
+        """确保客户端已认证并返回 JWT 令牌（兼容同步和异步客户端）"""
+        ensure = self.client._ensure_authenticated
+        if asyncio.iscoroutinefunction(ensure):
+            await ensure()
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, ensure)
+        return self.client._jwt_token
+
+    async def _run(self):
+        """连接、发送订阅并接收消息；连接断开后按指数退避重连"""
+        delay = self.reconnect_delay
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=getattr(self.client, "timeout", 30.0))
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while not self._stopping:
+                try:
+                    token = await self._get_token()
+                    async with session.ws_connect(
+                        self.ws_url,
+                        params={"token": token} if token else None,
+                        heartbeat=self.heartbeat,
+                        ssl=None if getattr(self.client, "verify_ssl", True) else False
+                    ) as ws:
+                        self._ws = ws
+                        self.connects += 1
+                        delay = self.reconnect_delay
+
+                        await self._send_commands(self.subscriptions)
+                        self._connected.set()
+
+                        async for message in ws:
+                            if message.type == aiohttp.WSMsgType.TEXT:
+                                self._handle_message(message.data)
+                            elif message.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                                break
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if isinstance(e, aiohttp.WSServerHandshakeError) and e.status == 401:
+                        # 令牌已被服务端拒绝，使下次连接前重新认证
+                        self.client._token_expires_at = None
+                    self._report_error(e)
+                finally:
+                    self._ws = None
+                    if self._connected is not None:
+                        self._connected.clear()
+
+                if self._stopping:
+                    break
+
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _handle_message(self, raw: str):
+        """解析服务端消息并分发给回调和队列"""
+        try:
+            message = json.loads(raw)
+        except ValueError as e:
+            self._report_error(e)
+            return
+
+        subscription_id = message.get("subscriptionId")
+        with self._subscriptions_lock:
+            subscription = self._subscriptions.get(subscription_id)
+        if subscription is None:
+            return
+
+        if message.get("errorCode"):
+            self._report_error(ValidationError(
+                field_name="subscription",
+                message=f"订阅 {subscription_id} 失败: {message.get('errorMsg')}"
+            ))
+            return
+
+        data = {}
+        for key, points in (message.get("data") or {}).items():
+            values = [{"ts": point[0], "value": point[1]}
+                      for point in points or [] if isinstance(point, (list, tuple)) and len(point) >= 2]
+            if values:
+                data[key] = values
+
+        if not data:
+            return
+
+        update = SubscriptionUpdate(
+            subscription_id=subscription_id,
+            device_id=subscription.device_id,
+            kind=subscription.kind,
+            data=data
+        )
+        self.updates_received += 1
+
+        if subscription.callback is not None:
+            try:
+                subscription.callback(update)
+            except Exception as e:
+                self._report_error(e)
+
+        if self._queue is not None:
+            self._put_update(update)
+
+    def _put_update(self, update: Any):
+        """放入队列，队列满时丢弃最早的更新"""
+        while True:
+            try:
+                self._queue.put_nowait(update)
+                return
+            except asyncio.QueueFull:
+                try:
+                    dropped = self._queue.get_nowait()
+                    if dropped is not _STOP:
+                        self.updates_dropped += 1
+                except asyncio.QueueEmpty:
+                    pass
+
+    def _report_error(self, error: Exception):
+        """记录错误并通知错误回调"""
+        self.last_error = error
+        if self.on_error is not None:
+            try:
+                self.on_error(error)
+            except Exception:
+                pass
@@ -0,0 +1,580 @@
+"""
+thingsboardlink 测试辅助模块
+
+本模块提供用于本地测试的 ThingsBoard 替身服务，无需连接真实的 ThingsBoard 实例。
+
+FakeThingsBoardServer 在后台线程中运行一个 aiohttp 服务，实现：
+登录与令牌刷新接口（/api/auth/login、/api/auth/token）以及
+WebSocket 遥测订阅接口（/api/ws/plugins/telemetry）。需要安装可选依赖 aiohttp。
+
+FakeMqttBroker 是仅依赖标准库的最小 MQTT 3.1.1 服务端，记录收到的所有 PUBLISH 消息，
+用于测试 MQTT 传输。
+"""
+
+import asyncio
+import base64
+import json
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+try:
+    from aiohttp import web, WSMsgType
+except ImportError:  # pragma: no cover - 可选依赖
+    web = None
+    WSMsgType = None
+
+from .exceptions import ConfigurationError
+
+
+def make_fake_jwt(subject: str = "tenant@thingsboard.org", expires_in: float = 3600.0) -> str:
+    """
+    生成未签名的测试 JWT 令牌
+
+    Args:
+        subject: 令牌主体
+        expires_in: 有效期（秒）
+
+    Returns:
+        str: JWT 令牌
+    """
+    def _segment(data: Dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+    header = _segment({"alg": "none", "typ": "JWT"})
+    payload = _segment({"sub": subject, "iat": int(time.time()), "exp": int(time.time() + expires_in)})
+    return f"{header}.{payload}.test"
+
+
+class FakeThingsBoardServer:
+    """
+    ThingsBoard 替身服务
+
+    用法：
+        server = FakeThingsBoardServer()
+        base_url = server.start()
+        client = ThingsBoardClient(base_url, "user", "pass")
+        ...
+        server.publish_telemetry(device_id, {"temperature": 25.0})
+        server.stop()
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 token_ttl: float = 3600.0,
+                 username: Optional[str] = None,
+                 password: Optional[str] = None):
+        """
+        初始化替身服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，为 0 时随机分配
+            token_ttl: 签发令牌的有效期（秒）
+            username: 允许登录的用户名，为空时接受任意用户名
+            password: 允许登录的密码，为空时接受任意密码
+
+        Raises:
+            ConfigurationError: 未安装 aiohttp 时抛出
+        """
+        if web is None:
+            raise ConfigurationError(
+                message="替身服务需要安装 aiohttp: pip install thingsboardlink[async]",
+                config_key="aiohttp",
+                expected_value="aiohttp>=3.8.0"
+            )
+
+        self.host = host
+        self.port = port
+        self.token_ttl = token_ttl
+        self.username = username
+        self.password = password
+
+        self.issued_tokens: List[str] = []
+        self.login_count = 0
+        self.refresh_count = 0
+        self.ws_connect_count = 0
+
+        # 当前 WebSocket 连接及其订阅 {ws: {cmdId: 订阅命令}}
+        self._connections: Dict[Any, Dict[int, Dict[str, Any]]] = {}
+        self.received_commands: List[Dict[str, Any]] = []
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """服务基础 URL"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """
+        在后台线程中启动服务
+
+        Returns:
+            str: 服务基础 URL
+        """
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        def _run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            try:
+                loop.run_until_complete(self._start_site())
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                loop.close()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self._runner.cleanup())
+            loop.close()
+
+        self._thread = threading.Thread(target=_run, name="thingsboardlink-fake-server", daemon=True)
+        self._thread.start()
+        started.wait()
+
+        if errors:
+            raise errors[0]
+        return self.base_url
+
+    def stop(self):
+        """停止服务"""
+        if self._loop is None or self._thread is None:
+            return
+
+        self._call(self._close_connections())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._thread = None
+        self._loop = None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.stop()
+
+    def subscriptions(self) -> List[Dict[str, Any]]:
+        """当前所有连接上的订阅命令"""
+        return self._call(self._list_subscriptions())
+
+    def publish_telemetry(self, device_id: str, values: Dict[str, Any], ts: Optional[int] = None) -> int:
+        """
+        向订阅了该设备遥测数据的连接推送更新
+
+        Args:
+            device_id: 设备 ID
+            values: 键值对数据
+            ts: 时间戳（毫秒），为空时使用当前时间
+
+        Returns:
+            int: 推送的消息数量
+        """
+        return self._call(self._publish(device_id, values, ts, "LATEST_TELEMETRY"))
+
+    def publish_attributes(self, device_id: str, values: Dict[str, Any], scope: str = "CLIENT_SCOPE",
+                           ts: Optional[int] = None) -> int:
+        """
+        向订阅了该设备属性的连接推送更新
+
+        Args:
+            device_id: 设备 ID
+            values: 键值对数据
+            scope: 属性范围
+            ts: 时间戳（毫秒），为空时使用当前时间
+
+        Returns:
+            int: 推送的消息数量
+        """
+        return self._call(self._publish(device_id, values, ts, scope))
+
+    def drop_connections(self):
+        """断开所有 WebSocket 连接（用于测试重连）"""
+        self._call(self._close_connections())
+
+    def _call(self, coroutine):
+        """在服务事件循环中执行协程并等待结果"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(10)
+
+    async def _start_site(self):
+        app = web.Application()
+        app.router.add_post("/api/auth/login", self._handle_login)
+        app.router.add_post("/api/auth/token", self._handle_refresh)
+        app.router.add_post("/api/auth/logout", self._handle_logout)
+        app.router.add_get("/api/ws/plugins/telemetry", self._handle_ws)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def _issue_tokens(self) -> Dict[str, str]:
+        token = make_fake_jwt(expires_in=self.token_ttl)
+        self.issued_tokens.append(token)
+        return {"token": token, "refreshToken": f"refresh-{len(self.issued_tokens)}"}
+
+    async def _handle_login(self, request):
+        body = await request.json()
+        if ((self.username is not None and body.get("username") != self.username) or
+                (self.password is not None and body.get("password") != self.password)):
+            return web.json_response({"status": 401, "message": "Authentication failed"}, status=401)
+
+        self.login_count += 1
+        return web.json_response(self._issue_tokens())
+
+    async def _handle_refresh(self, request):
+        body = await request.json()
+        if not str(body.get("refreshToken", "")).startswith("refresh-"):
+            return web.json_response({"status": 401, "message": "Invalid refresh token"}, status=401)
+
+        self.refresh_count += 1
+        return web.json_response(self._issue_tokens())
+
+    async def _handle_logout(self, request):
+        return web.Response(status=200)
+
+    async def _handle_ws(self, request):
+        if request.query.get("token") not in self.issued_tokens:
+            return web.json_response({"status": 401, "message": "Invalid token"}, status=401)
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        self.ws_connect_count += 1
+        self._connections[ws] = {}
+
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+
+                payload = json.loads(message.data)
+                self.received_commands.append(payload)
+
+                for command in payload.get("tsSubCmds", []) + payload.get("attrSubCmds", []):
+                    cmd_id = command.get("cmdId")
+                    if command.get("unsubscribe"):
+                        self._connections[ws].pop(cmd_id, None)
+                    else:
+                        self._connections[ws][cmd_id] = command
+        finally:
+            self._connections.pop(ws, None)
+
+        return ws
+
+    async def _list_subscriptions(self) -> List[Dict[str, Any]]:
+        return [command for commands in self._connections.values() for command in commands.values()]
+
+    async def _publish(self, device_id: str, values: Dict[str, Any], ts: Optional[int], scope: str) -> int:
+        ts = ts if ts is not None else int(time.time() * 1000)
+        sent = 0
+
+        for ws, commands in list(self._connections.items()):
+            for cmd_id, command in list(commands.items()):
+                if command.get("entityId") != device_id or command.get("scope") != scope:
+                    continue
+
+                keys = command.get("keys")
+                wanted = set(keys.split(",")) if keys else None
+                data = {key: [[ts, str(value)]] for key, value in values.items()
+                        if wanted is None or key in wanted}
+                if not data:
+                    continue
+
+                await ws.send_str(json.dumps({
+                    "subscriptionId": cmd_id,
+                    "errorCode": 0,
+                    "errorMsg": None,
+                    "data": data,
+                    "latestValues": {key: ts for key in data}
+                }))
+                sent += 1
+
+        return sent
+
+    async def _close_connections(self):
+        for ws in list(self._connections):
+            await ws.close()
+
+
+@dataclass
+class MqttMessage:
+    """
+    替身 MQTT 服务端收到的消息
+
+    Attributes:
+        client_id: 客户端 ID
+        username: 用户名（ThingsBoard 中为访问令牌）
+        topic: 主题
+        payload: 原始负载
+        qos: 服务质量等级
+        received_at: 接收时间（Unix 时间戳，秒）
+    """
+    client_id: str
+    username: Optional[str]
+    topic: str
+    payload: bytes
+    qos: int
+    received_at: float = field(default_factory=time.time)
+
+    def json(self) -> Any:
+        """解析 JSON 负载"""
+        return json.loads(self.payload)
+
+
+class FakeMqttBroker:
+    """
+    MQTT 替身服务端
+
+    支持 MQTT 3.1.1 的 CONNECT、PUBLISH（QoS 0/1/2）、SUBSCRIBE、PINGREQ 和 DISCONNECT，
+    不转发消息，仅记录收到的 PUBLISH。可以限制允许的访问令牌、延迟确认以测试在途窗口，
+    或断开所有连接以测试重连。
+
+    用法：
+        with FakeMqttBroker() as broker:
+            publisher = MqttGatewayPublisher("127.0.0.1", "token", port=broker.port)
+            ...
+            broker.wait_for_messages(1)
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 access_tokens: Optional[List[str]] = None,
+                 ack_delay: float = 0.0):
+        """
+        初始化 MQTT 替身服务端
+
+        Args:
+            host: 监听地址
+            port: 监听端口，为 0 时随机分配
+            access_tokens: 允许连接的访问令牌（用户名），为空时接受任意令牌
+            ack_delay: 发送 PUBACK/PUBREC 前的延迟（秒）
+        """
+        self.host = host
+        self.port = port
+        self.access_tokens = set(access_tokens) if access_tokens is not None else None
+        self.ack_delay = ack_delay
+
+        self.messages: List[MqttMessage] = []
+        self.connect_count = 0
+        self._messages_changed = threading.Condition()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._writers = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """
+        在后台线程中启动服务端
+
+        Returns:
+            int: 监听端口
+        """
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        def _run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            try:
+                self._server = loop.run_until_complete(
+                    asyncio.start_server(self._handle_client, self.host, self.port)
+                )
+                self.port = self._server.sockets[0].getsockname()[1]
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                loop.close()
+                return
+            started.set()
+            loop.run_forever()
+            self._server.close()
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+        self._thread = threading.Thread(target=_run, name="thingsboardlink-fake-mqtt", daemon=True)
+        self._thread.start()
+        started.wait()
+
+        if errors:
+            raise errors[0]
+        return self.port
+
+    def stop(self):
+        """停止服务端"""
+        if self._loop is None or self._thread is None:
+            return
+
+        self.drop_connections()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._thread = None
+        self._loop = None
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.stop()
+
+    def drop_connections(self):
+        """断开所有客户端连接（用于测试重连）"""
+        def _close_all():
+            for writer in list(self._writers):
+                writer.close()
+
+        self._loop.call_soon_threadsafe(_close_all)
+
+    def messages_on(self, topic: str) -> List[MqttMessage]:
+        """获取指定主题上收到的消息"""
+        with self._messages_changed:
+            return [message for message in self.messages if message.topic == topic]
+
+    def wait_for_messages(self, count: int, timeout: float = 5.0, topic: Optional[str] = None) -> bool:
+        """
+        等待收到指定数量的消息
+
+        Args:
+            count: 消息数量
+            timeout: 最长等待时间（秒）
+            topic: 只统计指定主题的消息，可选
+
+        Returns:
+            bool: 是否在超时前收到足够的消息
+        """
+        def _received() -> int:
+            return sum(1 for message in self.messages if topic is None or message.topic == topic)
+
+        with self._messages_changed:
+            return self._messages_changed.wait_for(lambda: _received() >= count, timeout)
+
+    @staticmethod
+    async def _read_packet(reader: asyncio.StreamReader):
+        """读取一个 MQTT 控制报文，返回 (首字节, 报文体)"""
+        header = await reader.readexactly(1)
+        multiplier = 1
+        length = 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        body = await reader.readexactly(length) if length else b""
+        return header[0], body
+
+    @staticmethod
+    def _read_string(data: bytes, offset: int):
+        """读取带 2 字节长度前缀的字符串"""
+        length = struct.unpack_from("!H", data, offset)[0]
+        start = offset + 2
+        return data[start:start + length], start + length
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        client_id = ""
+        username = None
+
+        try:
+            packet_type, body = await self._read_packet(reader)
+            if packet_type >> 4 != 1:
+                return
+
+            # CONNECT：协议名、协议级别、连接标志、保持连接时间，然后是客户端 ID 等负载
+            _, offset = self._read_string(body, 0)
+            flags = body[offset + 1]
+            offset += 4
+            raw_client_id, offset = self._read_string(body, offset)
+            client_id = raw_client_id.decode("utf-8")
+            if flags & 0x04:
+                _, offset = self._read_string(body, offset)
+                _, offset = self._read_string(body, offset)
+            if flags & 0x80:
+                raw_username, offset = self._read_string(body, offset)
+                username = raw_username.decode("utf-8")
+
+            if self.access_tokens is not None and username not in self.access_tokens:
+                # 返回码 5：未授权
+                writer.write(b"\x20\x02\x00\x05")
+                await writer.drain()
+                return
+
+            writer.write(b"\x20\x02\x00\x00")
+            await writer.drain()
+            self.connect_count += 1
+
+            while True:
+                packet_type, body = await self._read_packet(reader)
+                kind = packet_type >> 4
+
+                if kind == 3:  # PUBLISH
+                    qos = (packet_type >> 1) & 0x03
+                    topic, offset = self._read_string(body, 0)
+                    packet_id = None
+                    if qos > 0:
+                        packet_id = struct.unpack_from("!H", body, offset)[0]
+                        offset += 2
+
+                    with self._messages_changed:
+                        self.messages.append(MqttMessage(
+                            client_id=client_id,
+                            username=username,
+                            topic=topic.decode("utf-8"),
+                            payload=body[offset:],
+                            qos=qos
+                        ))
+                        self._messages_changed.notify_all()
+
+                    if qos > 0:
+                        if self.ack_delay > 0:
+                            await asyncio.sleep(self.ack_delay)
+                        # QoS 1 回复 PUBACK，QoS 2 回复 PUBREC
+                        writer.write(struct.pack("!BBH", 0x40 if qos == 1 else 0x50, 2, packet_id))
+                        await writer.drain()
+
+                elif kind == 6:  # PUBREL
+                    packet_id = struct.unpack_from("!H", body, 0)[0]
+                    writer.write(struct.pack("!BBH", 0x70, 2, packet_id))
+                    await writer.drain()
+
+                elif kind == 8:  # SUBSCRIBE
+                    packet_id = struct.unpack_from("!H", body, 0)[0]
+                    offset = 2
+                    granted = []
+                    while offset < len(body):
+                        _, offset = self._read_string(body, offset)
+                        granted.append(min(body[offset], 1))
+                        offset += 1
+                    writer.write(bytes([0x90, 2 + len(granted)]) + struct.pack("!H", packet_id) + bytes(granted))
+                    await writer.drain()
+
+                elif kind == 12:  # PINGREQ
+                    writer.write(b"\xd0\x00")
+                    await writer.drain()
+
+                elif kind == 14:  # DISCONNECT
+                    return
+
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
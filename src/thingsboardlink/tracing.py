@@ -0,0 +1,243 @@
+"""
+thingsboardlink 链路追踪模块
+
+本模块为服务方法和 HTTP 请求提供可选的链路追踪（兼容 OpenTelemetry）：
+
+- 服务方法（如 TelemetryService.get_timeseries_telemetry、RpcService.send_two_way_rpc）各打开一个 span；
+- 客户端的 request() 在当前 span 下打开子 span，记录 HTTP 方法、端点模板、状态码和重试次数。
+
+追踪器可以是 OpenTelemetry 的 Tracer，也可以是任何提供兼容 start_as_current_span() 的对象。
+未设置追踪器时，每个埋点只多一次全局变量判断，开销可以忽略。
+"""
+import contextvars
+import functools
+import inspect
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from .exceptions import ConfigurationError
+from .instrumentation import templatize_endpoint
+
+# 当前追踪器，为空时所有埋点直接调用原函数
+_tracer = None
+
+# OpenTelemetry 的 SpanKind.CLIENT（未安装 opentelemetry-api 时为空）
+_client_kind = None
+
+
+def set_tracer(tracer: Any):
+    """
+    设置追踪器
+
+    Args:
+        tracer: OpenTelemetry Tracer 或兼容对象，为空时关闭追踪
+
+    Raises:
+        ConfigurationError: 追踪器不提供 start_as_current_span() 时抛出
+    """
+    global _tracer, _client_kind
+
+    if tracer is not None and not callable(getattr(tracer, "start_as_current_span", None)):
+        raise ConfigurationError(
+            message="追踪器必须提供 start_as_current_span() 方法",
+            config_key="tracer",
+            expected_value="opentelemetry.trace.Tracer"
+        )
+
+    try:
+        from opentelemetry.trace import SpanKind
+        _client_kind = SpanKind.CLIENT
+    except ImportError:
+        _client_kind = None
+    _tracer = tracer
+
+
+def get_tracer() -> Any:
+    """获取当前追踪器，未启用追踪时返回 None"""
+    return _tracer
+
+
+def enable_tracing(tracer_provider: Any = None) -> Any:
+    """
+    使用 OpenTelemetry 启用链路追踪
+
+    Args:
+        tracer_provider: TracerProvider，为空时使用全局 TracerProvider
+
+    Returns:
+        Any: 创建的 Tracer
+
+    Raises:
+        ConfigurationError: 未安装 opentelemetry-api 时抛出
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        raise ConfigurationError(
+            message="该功能需要安装 opentelemetry-api: pip install thingsboardlink[tracing]",
+            config_key="opentelemetry",
+            expected_value="opentelemetry-api>=1.0.0"
+        ) from None
+
+    from . import __version__
+
+    tracer = trace.get_tracer("thingsboardlink", __version__, tracer_provider)
+    set_tracer(tracer)
+    return tracer
+
+
+def disable_tracing():
+    """关闭链路追踪"""
+    set_tracer(None)
+
+
+def _device_id_getter(func: Callable) -> Optional[Callable]:
+    """根据函数签名生成从调用参数中取出 device_id 的函数，没有该参数时返回 None"""
+    try:
+        parameters = list(inspect.signature(func).parameters)
+    except (TypeError, ValueError):
+        return None
+    if "device_id" not in parameters:
+        return None
+
+    index = parameters.index("device_id")
+
+    def get_device_id(args, kwargs):
+        if "device_id" in kwargs:
+            return kwargs["device_id"]
+        return args[index] if index < len(args) else None
+
+    return get_device_id
+
+
+def traced(name: str) -> Callable:
+    """
+    为函数添加链路追踪的装饰器
+
+    调用时打开名为 name 的 span；函数有 device_id 参数时记录为 thingsboardlink.device_id 属性。
+    支持普通函数和协程函数。
+
+    Args:
+        name: span 名称
+
+    Returns:
+        Callable: 装饰器
+    """
+
+    def decorator(func: Callable) -> Callable:
+        get_device_id = _device_id_getter(func)
+
+        def attributes(args, kwargs) -> Optional[Dict[str, Any]]:
+            if get_device_id is None:
+                return None
+            device_id = get_device_id(args, kwargs)
+            return None if device_id is None else {"thingsboardlink.device_id": str(device_id)}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                tracer = _tracer
+                if tracer is None:
+                    return await func(*args, **kwargs)
+                with tracer.start_as_current_span(name, attributes=attributes(args, kwargs)):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                tracer = _tracer
+                if tracer is None:
+                    return func(*args, **kwargs)
+                with tracer.start_as_current_span(name, attributes=attributes(args, kwargs)):
+                    return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def untraced(func: Callable) -> Callable:
+    """
+    标记服务方法不由 trace_service 自动添加 span
+
+    用于返回生成器的普通方法（如先校验参数再返回内部生成器）：span 会在返回生成器时立即结束，
+    迭代期间发出的请求无法挂在其下。
+
+    Args:
+        func: 服务方法
+
+    Returns:
+        Callable: 原函数
+    """
+    func._thingsboardlink_untraced = True
+    return func
+
+
+def trace_service(cls: type) -> type:
+    """
+    为服务类的公共方法添加链路追踪的类装饰器
+
+    span 名称为 "类名.方法名"。生成器方法和以 untraced 标记的方法不包装
+    （span 会在返回生成器时立即结束），其中发出的 HTTP 请求仍有各自的 span。
+
+    Args:
+        cls: 服务类
+
+    Returns:
+        type: 原类
+    """
+    for attr_name, value in list(vars(cls).items()):
+        if attr_name.startswith("_") or not inspect.isfunction(value):
+            continue
+        if inspect.isgeneratorfunction(value) or inspect.isasyncgenfunction(value):
+            continue
+        if getattr(value, "_thingsboardlink_untraced", False):
+            continue
+        setattr(cls, attr_name, traced(f"{cls.__name__}.{attr_name}")(value))
+    return cls
+
+
+def propagate_context(func: Callable) -> Callable:
+    """
+    使提交到线程池的函数在当前追踪上下文中执行，子 span 挂在调用方的 span 下
+
+    每次提交都需单独调用（同一个上下文副本不能在多个线程中同时使用）。
+    未启用追踪时原样返回 func。
+
+    Args:
+        func: 提交到线程池的函数
+
+    Returns:
+        Callable: 包装后的函数
+    """
+    if _tracer is None:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def request_span(tracer: Any, method: str, endpoint: str, base_url: str):
+    """
+    打开 HTTP 请求的 span（客户端 request() 使用）
+
+    span 名称为 "方法 端点模板"，不记录完整 URL（设备 API 的路径中包含设备令牌）。
+    """
+    method = method.upper()
+    template = templatize_endpoint(endpoint)
+    server = urlparse(base_url)
+    attributes = {
+        "http.request.method": method,
+        "url.template": template,
+        "server.address": server.hostname or ""
+    }
+    if server.port is not None:
+        attributes["server.port"] = server.port
+
+    if _client_kind is not None:
+        return tracer.start_as_current_span(f"{method} {template}", kind=_client_kind, attributes=attributes)
+    return tracer.start_as_current_span(f"{method} {template}", attributes=attributes)
+
+
+def record_response(span: Any, status_code: int, resend_count: int):
+    """在请求 span 上记录响应状态码和重试次数"""
+    span.set_attribute("http.response.status_code", status_code)
+    if resend_count:
+        span.set_attribute("http.request.resend_count", resend_count)